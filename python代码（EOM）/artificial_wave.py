@@ -0,0 +1,184 @@
+# 人工地震波生成（频域迭代拟合目标反应谱）
+#
+# 对应 C# ArtificialWaveCalculations.GenerateArtificialWaves：三段式包络 × 高斯白噪声作为初始波，
+# 每次迭代按 目标谱/计算谱 的比值在频域缩放幅值，再乘包络并做高通滤波（基线校正）。
+# 与 C# 逐条、逐周期计算不同，这里同一批的多条波放在二维数组中一起做实数 FFT 与反应谱递推
+# （频谱与时程工作数组每批只分配一次，迭代中原位写入），
+# 多批之间用进程池并行；每条波使用由 seed 派生的独立随机数发生器，结果与分批方式和进程数无关。
+
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from spectrum_core import (
+    get_alpha_max, get_Tg, calculate_chinese_spectrum_batch, calculate_us_spectrum_batch
+)
+from response_spectrum import response_spectrum
+
+
+def default_target_periods(t_min=0.02, t_max=6.0, t_step=0.02):
+    """目标谱周期点（与 C# WaveGenerationInput 的 TMin / TMax / TStep 默认值一致）"""
+    return t_min + t_step * np.arange(int(round((t_max - t_min) / t_step)) + 1)
+
+
+def chinese_target_spectrum(intensity, site_category, earthquake_group, damping=0.05, periods=None):
+    if periods is None:
+        periods = default_target_periods()
+    alpha_max = get_alpha_max(intensity)
+    Tg = get_Tg(site_category, earthquake_group)
+    periods, alpha = calculate_chinese_spectrum_batch(alpha_max, Tg, damping, periods=periods)
+    return periods, alpha[0]
+
+
+def us_target_spectrum(Ss, S1, site_class, TL, R, damping=0.05, periods=None):
+    if periods is None:
+        periods = default_target_periods()
+    periods, Sa, _, _, _, _ = calculate_us_spectrum_batch(Ss, S1, site_class, TL, R, damping, periods=periods)
+    return periods, Sa[0]
+
+
+def get_envelope(time, t1, t2, c_decay):
+    """三段式非平稳包络：上升段 (t/t1)²，平稳段 1，衰减段 exp(-c(t-t2))"""
+    time = np.asarray(time, dtype=float)
+    return np.where(time < t1, (time / t1) ** 2,
+                    np.where(time <= t2, 1.0, np.exp(-c_decay * (time - t2))))
+
+
+def highpass_gain(n_fft, dt, cutoff, order=4):
+    """
+    零相位 Butterworth 高通滤波器在 rfft 频点上的幅值增益
+
+    等价于对 order 阶双线性变换 Butterworth 滤波器做正反两次滤波（C# 中的 ButterworthHighPass），
+    幅值为 |H|² = ν^(2n) / (ν^(2n) + νc^(2n))，ν = tan(π f dt)
+    """
+    freqs = np.fft.rfftfreq(n_fft, dt)
+    nu = np.tan(np.pi * np.minimum(freqs * dt, 0.5 - 1e-12))
+    nu_c = np.tan(np.pi * cutoff * dt)
+    ratio = (nu / nu_c) ** (2 * order)
+    return ratio / (1 + ratio)
+
+
+def _generate_batch(args):
+    (seeds, target_periods, target_sa, dt, n_pts, n_iterations, t1, t2, c_decay, damping, cutoff) = args
+    time = np.arange(n_pts) * dt
+    envelope = get_envelope(time, t1, t2, c_decay)
+    acc = np.stack([np.random.default_rng(s).standard_normal(n_pts) for s in seeds]) * envelope
+
+    # 频点对应的周期及高通增益只计算一次；高通滤波补零到 2 倍长度以避免循环卷积的首尾混叠
+    freqs = np.fft.rfftfreq(n_pts, dt)
+    with np.errstate(divide='ignore'):
+        freq_periods = np.where(freqs > 1e-6, 1.0 / freqs, np.inf)
+    n_fft = 2 * n_pts
+    hp_gain = highpass_gain(n_fft, dt, cutoff) if cutoff else None
+    # 迭代中的频谱与时程工作数组只分配一次，FFT 结果通过 out= 写回
+    ratio_interp = np.empty((len(seeds), len(freqs)))
+    spectrum = np.empty((len(seeds), len(freqs)), dtype=complex)
+    if hp_gain is not None:
+        padded_spectrum = np.empty((len(seeds), len(hp_gain)), dtype=complex)
+        padded = np.empty((len(seeds), n_fft))
+
+    for _ in range(n_iterations):
+        current = response_spectrum(acc, dt, target_periods, damping)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = np.where(current > 1e-6, target_sa / current, 1.0)
+        for i in range(len(seeds)):
+            ratio_interp[i] = np.interp(freq_periods, target_periods, ratio[i], left=1.0, right=1.0)
+        ratio_interp[:, freqs < 1e-6] = 0.0
+
+        np.fft.rfft(acc, axis=-1, out=spectrum)
+        spectrum *= ratio_interp
+        np.fft.irfft(spectrum, n=n_pts, axis=-1, out=acc)
+        acc *= envelope
+
+        if hp_gain is not None:
+            np.fft.rfft(acc, n=n_fft, axis=-1, out=padded_spectrum)
+            padded_spectrum *= hp_gain
+            np.fft.irfft(padded_spectrum, n=n_fft, axis=-1, out=padded)
+            acc[:] = padded[:, :n_pts]
+
+    spectra = response_spectrum(acc, dt, target_periods, damping)
+    return acc, spectra
+
+
+def generate_artificial_waves(target_periods, target_sa, dt=0.01, t_total=30.0, n_waves=3, n_iterations=5,
+                              t1=3.0, t2=15.0, c_decay=0.2, damping=0.05, highpass=0.05,
+                              seed=None, workers=None, batch_size=4, progress=None):
+    """
+    生成拟合目标反应谱的人工地震波
+
+    参数:
+        target_periods, target_sa: 目标反应谱（可取 chinese_target_spectrum / us_target_spectrum 的结果）
+        dt, t_total: 时间步长与总时长 (s)
+        n_waves, n_iterations: 波数量与迭代次数
+        t1, t2, c_decay: 包络线参数
+        damping: 计算反应谱所用阻尼比
+        highpass: 高通滤波截止频率 (Hz)，0 或 None 表示不滤波
+        seed: 随机种子，相同 seed 得到相同结果
+        workers: 进程数，默认全部 CPU 核心；为 1 时在当前进程内计算
+        batch_size: 每个进程任务中一起计算的波数
+        progress: 可选回调 progress(已完成波数, n_waves)，每批完成后调用；回调抛出异常时中止计算
+
+    返回:
+        dict: time, waves (波数, 步数), target_periods, target_spectrum,
+              spectra (波数, 周期数), mean_spectrum, process
+    """
+    target_periods = np.asarray(target_periods, dtype=float)
+    target_sa = np.asarray(target_sa, dtype=float)
+    n_pts = int(t_total / dt)
+    seeds = np.random.SeedSequence(seed).spawn(n_waves)
+
+    process = ["=== 人工地震波生成 ===",
+               f"波数量: {n_waves}", f"时间步长: {dt} s", f"总时长: {t_total} s", f"迭代次数: {n_iterations}",
+               f"目标反应谱周期范围: {target_periods.min():.2f}-{target_periods.max():.2f} s"]
+
+    tasks = [(seeds[i:i + batch_size], target_periods, target_sa, dt, n_pts, n_iterations,
+              t1, t2, c_decay, damping, highpass)
+             for i in range(0, n_waves, batch_size)]
+    if workers == 1 or len(tasks) == 1:
+        results = []
+        for t in tasks:
+            results.append(_generate_batch(t))
+            if progress is not None:
+                progress(sum(len(r[0]) for r in results), n_waves)
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers or os.cpu_count(), len(tasks))) as pool:
+            futures = [pool.submit(_generate_batch, t) for t in tasks]
+            try:
+                done = 0
+                for future in as_completed(futures):
+                    done += len(future.result()[0])
+                    if progress is not None:
+                        progress(done, n_waves)
+            except BaseException:
+                pool.shutdown(wait=False, cancel_futures=True)
+                raise
+            results = [f.result() for f in futures]
+
+    waves = np.concatenate([r[0] for r in results])
+    spectra = np.concatenate([r[1] for r in results])
+    for i, wave in enumerate(waves):
+        process.append(f"第 {i + 1}/{n_waves} 条波 峰值加速度: {np.abs(wave).max():.4f} g")
+    process.append("=== 生成完成 ===")
+
+    return {
+        'time': np.arange(n_pts) * dt,
+        'waves': waves,
+        'target_periods': target_periods,
+        'target_spectrum': target_sa,
+        'spectra': spectra,
+        'mean_spectrum': spectra.mean(axis=0),
+        'process': process,
+    }
+
+
+def save_waves_csv(time, waves, directory):
+    """按 C# SaveWaveToCsv 的格式保存为 ArtificialWave_001.csv ...，返回文件路径列表"""
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for i, wave in enumerate(waves):
+        path = os.path.join(directory, f"ArtificialWave_{i + 1:03d}.csv")
+        np.savetxt(path, np.column_stack([time, wave]), fmt=['%.4f', '%.6f'], delimiter=',',
+                   header="Time(s),Acceleration(g)", comments='')
+        paths.append(path)
+    return paths
@@ -0,0 +1,323 @@
+# 性能基准：反应谱、场地系数、风速转换与界面重绘的热点路径
+#
+# 每项基准取多轮计时的最小值与中位数（单次调用耗时），结果追加到 JSON Lines 历史文件，
+# 并与上一次记录比较，耗时增加超过阈值的项标记为 "慢"。
+#
+# 用法示例:
+#   python benchmark.py                       # 全部基准，写入 benchmark_history.jsonl
+#   python benchmark.py -k us --no-gui        # 只跑名称含 "us" 的计算基准
+#   python benchmark.py --history ci.jsonl --threshold 1.3 --fail-on-regression
+#
+# 界面基准使用 Qt 的 offscreen 平台，不需要显示器；未安装 PyQt6 时自动跳过。
+
+import os
+import sys
+import json
+import time
+import timeit
+import argparse
+import itertools
+import platform
+import statistics
+import subprocess
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_HISTORY = os.path.join(HERE, 'benchmark_history.jsonl')
+
+BENCHMARKS = []
+
+
+def benchmark(name, group='core'):
+    """登记基准：被装饰的函数返回一个无参可调用对象，计时只针对该对象"""
+    def decorator(setup):
+        BENCHMARKS.append((name, group, setup))
+        return setup
+    return decorator
+
+
+# ==========================================
+# 单次调用
+# ==========================================
+
+@benchmark('chinese_spectrum')
+def _chinese_spectrum():
+    from spectrum_core import calculate_chinese_spectrum
+    return lambda: calculate_chinese_spectrum(0.08, 0.35, 0.05)
+
+
+@benchmark('us_spectrum')
+def _us_spectrum():
+    from spectrum_core import calculate_us_spectrum
+    return lambda: calculate_us_spectrum(0.51, 0.18, 'D', 24.0, 5.0, 0.05)
+
+
+@benchmark('get_Fa_Fv')
+def _get_Fa_Fv():
+    from spectrum_core import get_Fa_Fv
+    return lambda: get_Fa_Fv(0.51, 0.18, 'D')
+
+
+@benchmark('wind_conversion')
+def _wind_conversion():
+    from spectrum_core import convert_wind_speed_to_chinese
+    return lambda: convert_wind_speed_to_chinese(115.0, 'mph', 10.0, '3s', '700y')
+
+
+# ==========================================
+# 批量（反应谱 1000 个场景，查表与风速转换 10000 个）
+# ==========================================
+
+BATCH_SIZE = 10000
+
+
+def _scenarios(n=BATCH_SIZE, seed=0):
+    from spectrum_core import US_SITE_CLASSES
+    rng = np.random.default_rng(seed)
+    return {
+        'alpha_max': rng.choice([0.04, 0.08, 0.12, 0.16, 0.24, 0.32], n),
+        'Tg': rng.choice([0.20, 0.25, 0.35, 0.45, 0.65, 0.90], n),
+        'damping': rng.uniform(0.02, 0.10, n),
+        'Ss': rng.uniform(0.1, 2.0, n),
+        'S1': rng.uniform(0.05, 0.8, n),
+        'site_class': rng.choice(US_SITE_CLASSES, n),
+        'TL': rng.choice([4.0, 6.0, 8.0, 12.0], n),
+        'R': rng.choice([3.0, 5.0, 8.0], n),
+        'wind_speed': rng.uniform(80, 200, n),
+    }
+
+
+@benchmark('chinese_spectrum_batch', 'batch')
+def _chinese_spectrum_batch():
+    from spectrum_core import calculate_chinese_spectrum_batch
+    s = _scenarios(1000)
+    return lambda: calculate_chinese_spectrum_batch(s['alpha_max'], s['Tg'], s['damping'])
+
+
+@benchmark('us_spectrum_batch', 'batch')
+def _us_spectrum_batch():
+    from spectrum_core import calculate_us_spectrum_batch
+    s = _scenarios(1000)
+    return lambda: calculate_us_spectrum_batch(s['Ss'], s['S1'], s['site_class'], s['TL'], s['R'], s['damping'])
+
+
+@benchmark('get_Fa_Fv_batch', 'batch')
+def _get_Fa_Fv_batch():
+    from spectrum_core import get_Fa_Fv_batch
+    s = _scenarios()
+    return lambda: get_Fa_Fv_batch(s['Ss'], s['S1'], s['site_class'])
+
+
+@benchmark('comparison_metrics_batch', 'batch')
+def _comparison_metrics_batch():
+    from spectrum_metrics import comparison_metrics
+    s = _scenarios(1000)
+    return lambda: comparison_metrics(s['alpha_max'], s['Tg'], s['Ss'], s['S1'], s['site_class'], s['TL'], s['R'],
+                                      s['damping'])
+
+
+@benchmark('record_selection_20000', 'batch')
+def _record_selection():
+    import tempfile
+    from spectrum_core import calculate_chinese_spectrum
+    from record_selection import DEFAULT_PERIODS, SpectraDatabase, select_records
+    rng = np.random.default_rng(0)
+    periods, target = calculate_chinese_spectrum(0.50, 0.35, 0.05, periods=DEFAULT_PERIODS)
+    n = 20000
+    # 临时目录随返回的可调用对象一起释放，运行结束后自动删除
+    tmp = tempfile.TemporaryDirectory(prefix='benchmark_spectra_')
+    directory = tmp.name
+    log_spectra = np.log(target) + rng.normal(0, 0.5, (n, 1))
+    log_spectra = log_spectra + np.cumsum(rng.normal(0, 0.05, (n, len(periods))), axis=1)
+    log_spectra.astype(np.float32).tofile(os.path.join(directory, 'log_spectra.bin'))
+    np.savez(os.path.join(directory, 'spectra_index.npz'), names=np.array([f"rec{i}" for i in range(n)]),
+             dt=np.full(n, 0.01), periods=periods, damping=np.array(0.05), magnitude=rng.uniform(5, 8, n),
+             distance=rng.uniform(0, 200, n), vs30=rng.uniform(150, 800, n))
+    db = SpectraDatabase(directory)
+
+    def run(tmp=tmp):
+        return select_records(db, periods, target, k=11, period_range=(0.1, 3.0), magnitude=(6.0, 8.0))
+    return run
+
+
+@benchmark('wind_conversion_batch', 'batch')
+def _wind_conversion_batch():
+    from spectrum_core import convert_wind_speed_batch
+    s = _scenarios()
+    return lambda: convert_wind_speed_batch(s['wind_speed'])
+
+
+# ==========================================
+# 界面重绘（offscreen）
+# ==========================================
+
+_app = None
+
+
+def _qt_app():
+    global _app
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt6.QtWidgets import QApplication
+    _app = QApplication.instance() or QApplication(sys.argv[:1])
+    return _app
+
+
+def _spectrum_interface():
+    _qt_app()
+    from spectrum_comparison_PyQt6 import SpectrumInterface
+    w = SpectrumInterface()
+    w.resize(1400, 750)
+    w.show()
+    _app.processEvents()
+    w.update_chart()
+    w.canvas.draw()
+    _app.processEvents()
+    return w
+
+
+@benchmark('update_chart_blit', 'gui')
+def _update_chart_blit():
+    # 小幅改动 Ss，纵轴范围不变，走 blit 路径；每次调用前清空缓存，包含计算耗时
+    w = _spectrum_interface()
+    values = itertools.cycle([0.50, 0.51])
+
+    def run():
+        w.us_cache.clear()
+        w.us_ss_spin.blockSignals(True)
+        w.us_ss_spin.setValue(next(values))
+        w.us_ss_spin.blockSignals(False)
+        w.update_chart()
+    return run
+
+
+@benchmark('update_chart_full', 'gui')
+def _update_chart_full():
+    # Ss 在两个相差较大的值之间切换，每次都触发纵轴调整与整图重绘
+    w = _spectrum_interface()
+    values = itertools.cycle([0.3, 2.0])
+
+    def run():
+        w.us_ss_spin.blockSignals(True)
+        w.us_ss_spin.setValue(next(values))
+        w.us_ss_spin.blockSignals(False)
+        w.update_chart()
+    return run
+
+
+@benchmark('convert_wind_speed_ui', 'gui')
+def _convert_wind_speed_ui():
+    _qt_app()
+    from spectrum_comparison_PyQt6 import WindConversionInterface
+    w = WindConversionInterface()
+    w.show()
+    _app.processEvents()
+    return w.convert_wind_speed
+
+
+# ==========================================
+# 计时与历史记录
+# ==========================================
+
+def measure(func, repeat=7, min_time=0.2):
+    """返回单次调用耗时（秒）的 (最小值, 中位数, 每轮调用次数)"""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    number = max(1, int(number * min_time / 0.2))
+    times = [t / number for t in timer.repeat(repeat, number)]
+    return min(times), statistics.median(times), number
+
+
+def _git_revision():
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=HERE,
+                             capture_output=True, text=True, timeout=10)
+        rev = out.stdout.strip() or None
+        if rev:
+            dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=HERE,
+                                   capture_output=True, text=True, timeout=30).stdout.strip()
+            rev += '-dirty' if dirty else ''
+        return rev
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def run_benchmarks(pattern=None, groups=None, repeat=7, min_time=0.2):
+    results = {}
+    for name, group, setup in BENCHMARKS:
+        if (groups and group not in groups) or (pattern and pattern not in name):
+            continue
+        try:
+            func = setup()
+        except ImportError as e:
+            print(f"{name:<26} 跳过（{e}）")
+            continue
+        best, median, number = measure(func, repeat, min_time)
+        results[name] = {'group': group, 'best_us': best * 1e6, 'median_us': median * 1e6, 'number': number}
+        print(f"{name:<26} {best * 1e6:12.1f} us  (中位数 {median * 1e6:.1f} us, {number} 次/轮)")
+    return results
+
+
+def compare(results, previous, threshold):
+    """与上一次记录比较，返回变慢的项 [(名称, 倍数)]"""
+    regressions = []
+    if not previous:
+        return regressions
+    print(f"\n与上次记录比较 ({previous.get('revision')}, {previous.get('timestamp')}):")
+    for name, item in results.items():
+        old = previous['results'].get(name)
+        if old is None:
+            continue
+        ratio = item['best_us'] / old['best_us']
+        flag = '  慢' if ratio > threshold else ('  快' if ratio < 1 / threshold else '')
+        print(f"{name:<26} {old['best_us']:12.1f} -> {item['best_us']:12.1f} us  x{ratio:.2f}{flag}")
+        if ratio > threshold:
+            regressions.append((name, ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="热点路径性能基准")
+    parser.add_argument('-k', dest='pattern', help="只运行名称包含该字符串的基准")
+    parser.add_argument('--no-gui', action='store_true', help="跳过界面基准")
+    parser.add_argument('--repeat', type=int, default=7, help="计时轮数")
+    parser.add_argument('--min-time', type=float, default=0.2, help="每轮最短时长 (s)")
+    parser.add_argument('--history', default=DEFAULT_HISTORY, help="历史记录文件 (JSON Lines)")
+    parser.add_argument('--no-save', action='store_true', help="不写入历史记录")
+    parser.add_argument('--threshold', type=float, default=1.2, help="判定变慢的耗时倍数")
+    parser.add_argument('--fail-on-regression', action='store_true', help="有变慢项时以返回码 1 退出")
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, HERE)
+    groups = {'core', 'batch'} if args.no_gui else None
+    results = run_benchmarks(args.pattern, groups, args.repeat, args.min_time)
+
+    history = load_history(args.history)
+    regressions = compare(results, history[-1] if history else None, args.threshold)
+
+    record = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'revision': _git_revision(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': f"{platform.system()} {platform.machine()}",
+        'cpu_count': os.cpu_count(),
+        'results': results,
+    }
+    if not args.no_save and results:
+        with open(args.history, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
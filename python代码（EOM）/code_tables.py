@@ -0,0 +1,206 @@
+# 规范表格数据与查询注册表
+#
+# 表格以纯数据形式写在本文件中，CodeTableRegistry 首次使用时编译为排序好的 NumPy 数组并缓存，
+# 之后的查询用 searchsorted 对整组 Ss / S1 一次完成线性插值。增加新版规范只需在数据字典中
+# 添加一项（或调用 REGISTRY.register_site_coefficients）。
+#
+# 说明：ASCE 7-22 取消了 Fa / Fv 表（SMS、SM1 直接取自 USGS 多周期设计谱数据库），
+# 因此这里收录的是仍使用场地系数表的 ASCE 7-16 与 ASCE 7-10。
+# 表中 nan 表示规范要求做场地反应分析（ASCE 7-16 第 11.4.8 条 / ASCE 7-10 第 11.4.7 条），
+# 查询结果为 nan。
+
+import bisect
+
+import numpy as np
+
+nan = float('nan')
+
+# 场地系数表：x 为 Ss 或 S1 的表列值（升序），其余键为场地类别
+SITE_COEFFICIENT_TABLES = {
+    'ASCE 7-16': {
+        'Fa': {
+            'x': [0.25, 0.5, 0.75, 1.0, 1.25, 1.50],
+            'A': [0.8, 0.8, 0.8, 0.8, 0.8, 0.8],
+            'B': [0.9, 0.9, 0.9, 0.9, 0.9, 0.9],
+            'C': [1.3, 1.3, 1.2, 1.2, 1.2, 1.2],
+            'D': [1.6, 1.4, 1.2, 1.1, 1.0, 1.0],
+            'E': [2.4, 1.7, 1.3, nan, nan, nan],
+            'F': [nan, nan, nan, nan, nan, nan],
+        },
+        'Fv': {
+            'x': [0.1, 0.2, 0.3, 0.4, 0.5, 0.6],
+            'A': [0.8, 0.8, 0.8, 0.8, 0.8, 0.8],
+            'B': [0.8, 0.8, 0.8, 0.8, 0.8, 0.8],
+            'C': [1.5, 1.5, 1.5, 1.5, 1.5, 1.4],
+            'D': [2.4, 2.2, 2.0, 1.9, 1.8, 1.7],
+            'E': [4.2, nan, nan, nan, nan, nan],
+            'F': [nan, nan, nan, nan, nan, nan],
+        },
+    },
+    'ASCE 7-10': {
+        'Fa': {
+            'x': [0.25, 0.5, 0.75, 1.0, 1.25],
+            'A': [0.8, 0.8, 0.8, 0.8, 0.8],
+            'B': [1.0, 1.0, 1.0, 1.0, 1.0],
+            'C': [1.2, 1.2, 1.1, 1.0, 1.0],
+            'D': [1.6, 1.4, 1.2, 1.1, 1.0],
+            'E': [2.5, 1.7, 1.2, 0.9, 0.9],
+            'F': [nan, nan, nan, nan, nan],
+        },
+        'Fv': {
+            'x': [0.1, 0.2, 0.3, 0.4, 0.5],
+            'A': [0.8, 0.8, 0.8, 0.8, 0.8],
+            'B': [1.0, 1.0, 1.0, 1.0, 1.0],
+            'C': [1.7, 1.6, 1.5, 1.4, 1.3],
+            'D': [2.4, 2.0, 1.8, 1.6, 1.5],
+            'E': [3.5, 3.2, 2.8, 2.4, 2.4],
+            'F': [nan, nan, nan, nan, nan],
+        },
+    },
+}
+
+# GB50011-2010 表 5.1.4-1（水平地震影响系数最大值）与表 5.1.4-2（特征周期）
+GB50011_TABLES = {
+    'GB50011-2010': {
+        'alpha_max': {
+            # 多遇地震（界面使用）、设防地震、罕遇地震
+            'frequent': {"6度(0.05g)": 0.04, "7度(0.10g)": 0.08, "7度(0.15g)": 0.12,
+                         "8度(0.20g)": 0.16, "8度(0.30g)": 0.24, "9度(0.40g)": 0.32},
+            'fortification': {"6度(0.05g)": 0.12, "7度(0.10g)": 0.23, "7度(0.15g)": 0.34,
+                              "8度(0.20g)": 0.45, "8度(0.30g)": 0.68, "9度(0.40g)": 0.90},
+            'rare': {"6度(0.05g)": 0.28, "7度(0.10g)": 0.50, "7度(0.15g)": 0.72,
+                     "8度(0.20g)": 0.90, "8度(0.30g)": 1.20, "9度(0.40g)": 1.40},
+        },
+        'Tg': {
+            "第一组": {"I0": 0.20, "I1": 0.25, "II": 0.35, "III": 0.45, "IV": 0.65},
+            "第二组": {"I0": 0.25, "I1": 0.30, "II": 0.40, "III": 0.55, "IV": 0.75},
+            "第三组": {"I0": 0.30, "I1": 0.35, "II": 0.45, "III": 0.65, "IV": 0.90},
+        },
+    },
+}
+
+
+class SiteCoefficientTable:
+    """编译后的单个场地系数表（Fa 或 Fv）：x 为升序表列值，values 形状为 (场地类别数, len(x))"""
+
+    def __init__(self, data):
+        order = np.argsort(data['x'])
+        self.x = np.asarray(data['x'], dtype=float)[order]
+        self.site_classes = sorted(k for k in data if k != 'x')
+        self.values = np.array([np.asarray(data[c], dtype=float)[order] for c in self.site_classes])
+        self._index = {c: i for i, c in enumerate(self.site_classes)}
+        # 标量查询用的 Python 列表，避免为单个值创建数组
+        self._x_list = self.x.tolist()
+        self._rows = {c: self.values[i].tolist() for c, i in self._index.items()}
+
+    def class_index(self, site_class):
+        site_class = np.asarray(site_class, dtype=str)
+        uniq, inverse = np.unique(site_class, return_inverse=True)
+        try:
+            idx = np.array([self._index[c] for c in uniq], dtype=np.intp)
+        except KeyError as e:
+            raise KeyError(f"未知的场地类别: {e.args[0]}") from None
+        return idx[inverse.reshape(site_class.shape)]
+
+    def lookup(self, value, site_class):
+        """按表线性插值（表外取端值），value 与 site_class 可为可广播的数组"""
+        value = np.asarray(value, dtype=float)
+        row = self.class_index(site_class)
+        value, row = np.broadcast_arrays(value, row)
+        x = self.x
+        i = np.clip(np.searchsorted(x, value, side='right') - 1, 0, len(x) - 2)
+        x1, x2 = x[i], x[i + 1]
+        y1, y2 = self.values[row, i], self.values[row, i + 1]
+        with np.errstate(invalid='ignore'):
+            inner = y1 + (y2 - y1) * (value - x1) / (x2 - x1)
+        inner = np.where(value == x1, y1, inner)
+        return np.where(value <= x[0], self.values[row, 0],
+                        np.where(value >= x[-1], self.values[row, -1], inner))
+
+    def value_at(self, value, site_class):
+        """标量查询（与 lookup 结果一致）"""
+        try:
+            ys = self._rows[site_class]
+        except KeyError:
+            raise KeyError(f"未知的场地类别: {site_class}") from None
+        xs = self._x_list
+        if value <= xs[0]:
+            return ys[0]
+        if value >= xs[-1]:
+            return ys[-1]
+        i = bisect.bisect_right(xs, value) - 1
+        if value == xs[i]:
+            return ys[i]
+        return ys[i] + (ys[i + 1] - ys[i]) * (value - xs[i]) / (xs[i + 1] - xs[i])
+
+
+class CodeTableRegistry:
+    """按规范版本登记表格数据，首次查询时编译并缓存"""
+
+    def __init__(self, site_tables=None, gb_tables=None):
+        self._site_data = dict(site_tables or {})
+        self._gb_data = dict(gb_tables or {})
+        self._site_compiled = {}
+        self._gb_compiled = {}
+
+    def register_site_coefficients(self, edition, data):
+        self._site_data[edition] = data
+        self._site_compiled.pop(edition, None)
+
+    def register_gb_tables(self, edition, data):
+        self._gb_data[edition] = data
+        self._gb_compiled.pop(edition, None)
+
+    def site_editions(self):
+        return list(self._site_data)
+
+    def site_coefficients(self, edition='ASCE 7-16'):
+        """返回 (Fa 表, Fv 表) 两个 SiteCoefficientTable"""
+        compiled = self._site_compiled.get(edition)
+        if compiled is None:
+            try:
+                data = self._site_data[edition]
+            except KeyError:
+                raise KeyError(f"未登记的规范版本: {edition}") from None
+            compiled = (SiteCoefficientTable(data['Fa']), SiteCoefficientTable(data['Fv']))
+            self._site_compiled[edition] = compiled
+        return compiled
+
+    def gb_tables(self, edition='GB50011-2010'):
+        """返回编译后的 GB50011 表：alpha_max 各水准的 {烈度: 值} 以及 Tg 的 (分组, 场地) 数组"""
+        compiled = self._gb_compiled.get(edition)
+        if compiled is None:
+            data = self._gb_data[edition]
+            groups = list(data['Tg'])
+            sites = list(data['Tg'][groups[0]])
+            compiled = {
+                'alpha_max': data['alpha_max'],
+                'groups': groups,
+                'sites': sites,
+                'Tg': np.array([[data['Tg'][g][s] for s in sites] for g in groups]),
+                'Tg_dict': data['Tg'],
+            }
+            self._gb_compiled[edition] = compiled
+        return compiled
+
+    def alpha_max(self, intensity, level='frequent', edition='GB50011-2010', default=np.nan):
+        """烈度 -> alpha_max，intensity 可为字符串数组；未知烈度取 default"""
+        table = self.gb_tables(edition)['alpha_max'][level]
+        intensity = np.asarray(intensity, dtype=str)
+        uniq, inverse = np.unique(intensity, return_inverse=True)
+        return np.array([table.get(k, default) for k in uniq], dtype=float)[inverse.reshape(intensity.shape)]
+
+    def Tg(self, site_category, earthquake_group, edition='GB50011-2010', default=np.nan):
+        """(场地类别, 地震分组) -> Tg，参数可为可广播的字符串数组；未知组合取 default"""
+        tables = self.gb_tables(edition)
+        sites = {s: i for i, s in enumerate(tables['sites'])}
+        groups = {g: i for i, g in enumerate(tables['groups'])}
+        site_category, earthquake_group = np.broadcast_arrays(np.asarray(site_category, dtype=str),
+                                                              np.asarray(earthquake_group, dtype=str))
+        s_idx = np.vectorize(lambda s: sites.get(s, -1), otypes=[np.intp])(site_category)
+        g_idx = np.vectorize(lambda g: groups.get(g, -1), otypes=[np.intp])(earthquake_group)
+        known = (s_idx >= 0) & (g_idx >= 0)
+        return np.where(known, tables['Tg'][np.maximum(g_idx, 0), np.maximum(s_idx, 0)], default)
+
+
+REGISTRY = CodeTableRegistry(SITE_COEFFICIENT_TABLES, GB50011_TABLES)
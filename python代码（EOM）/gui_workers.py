@@ -0,0 +1,145 @@
+# 界面后台任务：在 QThreadPool 中执行耗时计算，进度与结果通过信号回到界面线程
+#
+# 任务按"通道"管理（如 'waves'、'records'）：同一通道提交新任务时自动取消旧任务，
+# 旧任务此后的进度与结果都被丢弃，界面只会收到最新一次输入对应的结果。
+#
+# 任务函数以关键字参数 progress 接收进度回调 progress(done, total)；
+# 任务被取消后再调用该回调会抛出 JobCancelled，从而在下一个进度点中止计算。
+# 计算本身若使用进程池（如 generate_artificial_waves、response_spectra），工作线程只负责等待与转发进度。
+#
+# 用法:
+#   runner = JobRunner(self)
+#   runner.submit('waves', generate_artificial_waves, periods, target,
+#                 on_result=self.show_waves, on_progress=self.set_progress)
+#   runner.cancel('waves')
+
+import itertools
+import threading
+import traceback
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+class JobCancelled(Exception):
+    """任务已被取消（由进度回调抛出）"""
+
+
+class CancelToken:
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def check(self):
+        if self._event.is_set():
+            raise JobCancelled()
+
+
+class _JobSignals(QObject):
+    progress = pyqtSignal(int, int, int)    # job_id, done, total
+    finished = pyqtSignal(int, object)      # job_id, result
+    failed = pyqtSignal(int, str)           # job_id, traceback
+
+
+class _Job(QRunnable):
+    def __init__(self, job_id, token, signals, fn, args, kwargs):
+        super().__init__()
+        self.job_id = job_id
+        self.token = token
+        self.signals = signals
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+
+    def _progress(self, done, total):
+        self.token.check()
+        self.signals.progress.emit(self.job_id, int(done), int(total))
+
+    def run(self):
+        try:
+            self.token.check()
+            result = self.fn(*self.args, progress=self._progress, **self.kwargs)
+        except JobCancelled:
+            return
+        except Exception:
+            if not self.token.cancelled:
+                self.signals.failed.emit(self.job_id, traceback.format_exc())
+            return
+        if not self.token.cancelled:
+            self.signals.finished.emit(self.job_id, result)
+
+
+class JobRunner(QObject):
+    """按通道管理后台任务，同一通道只保留最新提交的任务"""
+
+    def __init__(self, parent=None, pool=None):
+        super().__init__(parent)
+        self.pool = pool or QThreadPool.globalInstance()
+        self._ids = itertools.count(1)
+        self._current = {}      # channel -> (job_id, token, on_result, on_progress, on_error)
+        self._signals = _JobSignals()
+        self._signals.progress.connect(self._on_progress)
+        self._signals.finished.connect(self._on_finished)
+        self._signals.failed.connect(self._on_failed)
+
+    def submit(self, channel, fn, *args, on_result=None, on_progress=None, on_error=None, **kwargs):
+        """
+        在线程池中执行 fn(*args, progress=..., **kwargs)，返回任务编号
+
+        参数:
+            channel: 通道名，同一通道的旧任务被取消
+            on_result: 完成回调 on_result(result)
+            on_progress: 进度回调 on_progress(done, total)
+            on_error: 出错回调 on_error(traceback 文本)
+        """
+        self.cancel(channel)
+        job_id = next(self._ids)
+        token = CancelToken()
+        self._current[channel] = (job_id, token, on_result, on_progress, on_error)
+        self.pool.start(_Job(job_id, token, self._signals, fn, args, kwargs))
+        return job_id
+
+    def cancel(self, channel):
+        """取消通道中正在执行的任务，其后续进度与结果均被丢弃"""
+        entry = self._current.pop(channel, None)
+        if entry is not None:
+            entry[1].cancel()
+
+    def cancel_all(self):
+        for channel in list(self._current):
+            self.cancel(channel)
+
+    def is_running(self, channel):
+        return channel in self._current
+
+    def _lookup(self, job_id):
+        for channel, entry in self._current.items():
+            if entry[0] == job_id:
+                return channel, entry
+        return None, None
+
+    def _on_progress(self, job_id, done, total):
+        _, entry = self._lookup(job_id)
+        if entry is not None and entry[3] is not None:
+            entry[3](done, total)
+
+    def _on_finished(self, job_id, result):
+        channel, entry = self._lookup(job_id)
+        if entry is None:
+            return
+        del self._current[channel]
+        if entry[2] is not None:
+            entry[2](result)
+
+    def _on_failed(self, job_id, message):
+        channel, entry = self._lookup(job_id)
+        if entry is None:
+            return
+        del self._current[channel]
+        if entry[4] is not None:
+            entry[4](message)
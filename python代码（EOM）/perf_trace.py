@@ -0,0 +1,145 @@
+# 热点路径的分阶段计时（可选，默认关闭）
+#
+# 用法:
+#   trace = perf_trace.start('update_chart')
+#   ...; trace.mark('params')        # 记录自上一次 mark 以来的耗时，同名阶段累加
+#   ...; trace.mark('draw')
+#   trace.finish()                    # 写日志、通知监听者（界面上的耗时显示）
+#
+# 关闭时 start() 返回一个所有方法都为空操作的对象，开销只有几次方法调用。
+# 开启方式：环境变量 SPECTRUM_PERF=1（或调用 enable()）；
+# SPECTRUM_PROFILE=文件名 同时用 cProfile 剖析被计时的代码段，程序退出时写出统计（pstats 格式）。
+# 计时结果通过 logging 的 "spectrum.perf" 记录器以 DEBUG 级别输出。
+
+import os
+import atexit
+import logging
+import weakref
+import cProfile
+from time import perf_counter
+
+logger = logging.getLogger('spectrum.perf')
+
+_enabled = False
+_profiler = None
+_profile_path = None
+# 监听者的引用：绑定方法用弱引用，界面对象释放后自动注销
+_listeners = []
+
+
+class _NullTrace:
+    __slots__ = ()
+
+    def mark(self, phase):
+        pass
+
+    def finish(self):
+        return None
+
+
+_NULL_TRACE = _NullTrace()
+
+
+class PhaseTrace:
+    """一次调用的分阶段计时，phases 为 {阶段: 秒}（按首次出现顺序）"""
+
+    __slots__ = ('name', 'phases', '_start', '_last')
+
+    def __init__(self, name):
+        self.name = name
+        self.phases = {}
+        if _profiler is not None:
+            _profiler.enable()
+        self._start = self._last = perf_counter()
+
+    def mark(self, phase):
+        now = perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + (now - self._last)
+        self._last = now
+
+    def finish(self):
+        total = perf_counter() - self._start
+        if _profiler is not None:
+            _profiler.disable()
+        logger.debug("%s %.2f ms (%s)", self.name, total * 1e3,
+                     ", ".join(f"{k} {v * 1e3:.2f}" for k, v in self.phases.items()))
+        for ref in list(_listeners):
+            callback = ref()
+            if callback is None:
+                _listeners.remove(ref)
+            else:
+                callback(self.name, total, self.phases)
+        return total
+
+
+def start(name):
+    """开始一次计时；未开启时返回空操作对象"""
+    return PhaseTrace(name) if _enabled else _NULL_TRACE
+
+
+def is_enabled():
+    return _enabled
+
+
+def enable(on=True):
+    global _enabled
+    _enabled = on
+    if on and not logger.handlers and not logging.getLogger().handlers:
+        logging.basicConfig(format='%(asctime)s %(name)s %(message)s')
+    if on:
+        logger.setLevel(logging.DEBUG)
+
+
+def enable_profiling(path=None):
+    """开启 cProfile（同时开启计时）；path 不为空时在程序退出时写出统计"""
+    global _profiler, _profile_path
+    enable(True)
+    if _profiler is None:
+        _profiler = cProfile.Profile()
+        atexit.register(dump_profile)
+    _profile_path = path
+
+
+def disable_profiling():
+    global _profiler
+    dump_profile()
+    _profiler = None
+
+
+def dump_profile(path=None):
+    """写出 cProfile 统计（可用 python -m pstats 或 snakeviz 查看），未开启剖析时不做任何事"""
+    path = path or _profile_path
+    if _profiler is not None and path:
+        _profiler.dump_stats(path)
+    return path
+
+
+def _strong_ref(callback):
+    return lambda: callback
+
+
+def add_listener(callback):
+    """
+    登记回调 callback(name, total_seconds, phases)，每次 finish 时调用
+
+    绑定方法只保存弱引用（不会因此让界面对象一直存活），对象释放后自动注销
+    """
+    ref = weakref.WeakMethod(callback) if hasattr(callback, '__self__') else _strong_ref(callback)
+    _listeners.append(ref)
+
+
+def remove_listener(callback):
+    for ref in list(_listeners):
+        if ref() in (None, callback):
+            _listeners.remove(ref)
+
+
+def format_phases(name, total, phases):
+    """单行文字，用于界面上的耗时显示"""
+    return f"{name}: {total * 1e3:.1f} ms  (" + " | ".join(f"{k} {v * 1e3:.1f}" for k, v in phases.items()) + ")"
+
+
+if os.environ.get('SPECTRUM_PROFILE'):
+    enable_profiling(os.environ['SPECTRUM_PROFILE'])
+elif os.environ.get('SPECTRUM_PERF', '') not in ('', '0'):
+    enable(True)
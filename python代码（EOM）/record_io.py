@@ -0,0 +1,204 @@
+# 地震动记录读取：PEER AT2、CSV 与纯数据列文件
+#
+# 文本数据由 NumPy 的 C 解析器直接读入连续的浮点数组（np.fromfile / np.loadtxt），不逐行构造 Python 列表。
+# 大型记录库可先用 build_record_store 转存为一个连续的二进制文件 + 索引，之后以 memmap 方式按需读取；
+# iter_records / iter_record_chunks / stream_response_spectra 均为生成器，内存占用只与单块大小有关。
+#
+# 记录统一表示为 (name, dt, acc) 元组，acc 为一维加速度数组（单位与源文件相同，AT2 为 g）。
+
+import os
+import re
+
+import numpy as np
+
+from response_spectrum import response_spectra
+
+_AT2_NPTS_DT = re.compile(r'NPTS\s*=\s*(\d+)\s*,?\s*DT\s*=\s*([-+.\dEe]+)', re.IGNORECASE)
+_NUMBER = re.compile(r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[Ee][-+]?\d+)?')
+
+
+def read_at2(path):
+    """
+    读取 PEER NGA 格式的 .AT2 文件
+
+    返回:
+        (acc, dt, header)，header 为前 4 行文件头
+    """
+    with open(path, 'rb') as f:
+        header = [f.readline().decode('latin-1').rstrip() for _ in range(4)]
+        match = _AT2_NPTS_DT.search(header[3])
+        if match:
+            npts, dt = int(match.group(1)), float(match.group(2))
+        else:
+            # 旧格式: "  7998   0.0050   NPTS, DT"
+            numbers = _NUMBER.findall(header[3])
+            npts, dt = int(float(numbers[0])), float(numbers[1])
+        acc = np.fromfile(f, sep=' ')
+    if acc.size < npts:
+        raise ValueError(f"{path}: 数据点数 {acc.size} 少于文件头 NPTS={npts}")
+    return acc[:npts], dt, header
+
+
+def _has_text_header(path, delimiter):
+    with open(path, encoding='utf-8-sig', errors='replace') as f:
+        first = f.readline().strip()
+    try:
+        [float(v) for v in (first.split(delimiter) if delimiter else first.split())]
+        return False
+    except ValueError:
+        return True
+
+
+def read_csv_record(path, dt=None, column=-1):
+    """
+    读取 CSV 加速度记录（可带表头），如 save_waves_csv 输出的 "Time(s),Acceleration(g)"
+
+    参数:
+        dt: 时间步长；为 None 时取第一列（时间）的步长
+        column: 加速度所在列
+    """
+    skip = 1 if _has_text_header(path, ',') else 0
+    data = np.loadtxt(path, delimiter=',', skiprows=skip, ndmin=2, encoding='utf-8-sig')
+    if dt is None:
+        if data.shape[1] < 2:
+            raise ValueError(f"{path}: 只有一列数据，需要指定 dt")
+        dt = float(data[1, 0] - data[0, 0])
+    return np.ascontiguousarray(data[:, column]), dt
+
+
+def read_columns(path, dt=None, column=-1, skiprows=0):
+    """
+    读取空白分隔的数据列文件
+
+    dt 为 None 时视第一列为时间；给定 dt 且 column 为 None 时，
+    全部数值按顺序展平（单列文件或每行多个数值的续行格式）
+    """
+    if skiprows == 0 and _has_text_header(path, None):
+        skiprows = 1
+    if dt is not None and column is None:
+        with open(path, 'rb') as f:
+            for _ in range(skiprows):
+                f.readline()
+            return np.fromfile(f, sep=' '), dt
+    data = np.loadtxt(path, skiprows=skiprows, ndmin=2)
+    if dt is None:
+        if data.shape[1] < 2:
+            raise ValueError(f"{path}: 只有一列数据，需要指定 dt")
+        dt = float(data[1, 0] - data[0, 0])
+    return np.ascontiguousarray(data[:, column]), dt
+
+
+def read_record(path, dt=None):
+    """按扩展名读取一条记录，返回 (name, dt, acc)"""
+    name = os.path.splitext(os.path.basename(path))[0]
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.at2':
+        acc, dt, _ = read_at2(path)
+    elif ext == '.csv':
+        acc, dt = read_csv_record(path, dt)
+    else:
+        acc, dt = read_columns(path, dt, column=None if dt is not None else -1)
+    return name, dt, acc
+
+
+def find_records(directory, extensions=('.at2', '.csv', '.txt', '.dat')):
+    """递归列出目录下的记录文件（生成器）"""
+    for root, _, files in os.walk(directory):
+        for fn in sorted(files):
+            if os.path.splitext(fn)[1].lower() in extensions:
+                yield os.path.join(root, fn)
+
+
+def iter_records(paths, dt=None, skip_errors=False):
+    """逐个读取记录的生成器；skip_errors 为 True 时跳过无法解析的文件"""
+    for path in paths:
+        try:
+            yield read_record(path, dt)
+        except (OSError, ValueError):
+            if not skip_errors:
+                raise
+
+
+def iter_record_chunks(records, max_bytes=256 * 2**20):
+    """把记录流切成总数据量不超过 max_bytes 的块（至少一条），逐块产出列表"""
+    chunk = []
+    size = 0
+    for record in records:
+        nbytes = record[2].nbytes
+        if chunk and size + nbytes > max_bytes:
+            yield chunk
+            chunk, size = [], 0
+        chunk.append(record)
+        size += nbytes
+    if chunk:
+        yield chunk
+
+
+def build_record_store(records, directory, dtype='float32', progress=None):
+    """
+    将记录流转存为连续二进制文件 data.bin 与索引 index.npz，供 RecordStore 以 memmap 方式读取
+
+    参数:
+        records: (name, dt, acc) 的可迭代对象，如 iter_records(find_records(...))
+        dtype: 存储精度
+        progress: 可选回调 progress(已写入条数)
+    """
+    os.makedirs(directory, exist_ok=True)
+    names, dts, offsets, lengths = [], [], [], []
+    offset = 0
+    with open(os.path.join(directory, 'data.bin'), 'wb') as f:
+        for count, (name, dt, acc) in enumerate(records, 1):
+            np.asarray(acc, dtype=dtype).tofile(f)
+            names.append(name)
+            dts.append(dt)
+            offsets.append(offset)
+            lengths.append(len(acc))
+            offset += len(acc)
+            if progress is not None:
+                progress(count)
+    np.savez(os.path.join(directory, 'index.npz'), names=np.array(names, dtype=str), dt=np.array(dts),
+             offset=np.array(offsets, dtype=np.int64), length=np.array(lengths, dtype=np.int64),
+             dtype=np.array(np.dtype(dtype).str))
+    return RecordStore(directory)
+
+
+class RecordStore:
+    """build_record_store 生成的记录库：数据以 memmap 打开，按索引切片时不复制、不解析文本"""
+
+    def __init__(self, directory):
+        index = np.load(os.path.join(directory, 'index.npz'))
+        self.names = index['names']
+        self.dt = index['dt']
+        self.offset = index['offset']
+        self.length = index['length']
+        path = os.path.join(directory, 'data.bin')
+        self.data = (np.memmap(path, dtype=str(index['dtype']), mode='r')
+                     if os.path.getsize(path) else np.empty(0, dtype=str(index['dtype'])))
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getitem__(self, i):
+        start = self.offset[i]
+        return str(self.names[i]), float(self.dt[i]), self.data[start:start + self.length[i]]
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+def stream_response_spectra(records, periods, damping=0.05, kind='sa', max_bytes=256 * 2**20, workers=None):
+    """
+    按块计算记录流的反应谱（生成器），每块产出 (names, dts, spectra)
+
+    参数:
+        records: (name, dt, acc) 的可迭代对象（iter_records 或 RecordStore）
+        periods, damping, kind: 同 response_spectrum.response_spectrum
+        max_bytes: 每块加速度数据量上限
+        workers: 进程数，默认全部 CPU 核心
+    """
+    for chunk in iter_record_chunks(records, max_bytes):
+        names = [r[0] for r in chunk]
+        dts = [r[1] for r in chunk]
+        spectra = response_spectra([r[2] for r in chunk], dts, periods, damping, kind, workers=workers)
+        yield names, dts, spectra
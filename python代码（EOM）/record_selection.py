@@ -0,0 +1,334 @@
+# 地震动记录选取与调幅：按规范目标谱从本地记录库中选出一组记录
+#
+# build_spectra_database 把记录库（record_io.RecordStore 或 iter_records 的记录流）的反应谱预先算好，
+# 以 ln Sa 的形式写入连续二进制矩阵 log_spectra.bin（记录数 × 周期数，float32），索引 spectra_index.npz
+# 保存记录名、周期、阻尼比与震级、距离、Vs30 等元数据；SpectraDatabase 以 memmap 打开矩阵，不读入内存。
+#
+# 对一个新的目标谱，全部记录的最优调幅系数与拟合误差一次矩阵运算得到（对数坐标下的加权最小二乘）：
+#   r = ln(目标) - ln(Sa)，ln s* = Σwr / Σw（限制在调幅范围内），误差² = Σw(r - ln s)² / Σw
+# 其中 Σwr、Σwr² 只需 L·w、L·(w ln目标)、L²·w 三次矩阵-向量乘积（L 为 ln Sa 矩阵），按行分块计算。
+# 选组时先按单条误差取候选池，再逐条加入使整组几何平均谱与目标谱误差最小的记录。
+#
+# 用法:
+#   import record_io as rio
+#   from record_selection import build_spectra_database, SpectraDatabase, select_records
+#   db = build_spectra_database(rio.RecordStore('nga_store'), 'nga_spectra', metadata=read_metadata_csv('flatfile.csv'))
+#   periods, target = calculate_chinese_spectrum(0.90, 0.45, 0.05)     # 罕遇地震 alpha_max
+#   res = select_records(SpectraDatabase('nga_spectra'), periods, target, k=11, period_range=(0.1, 3.0),
+#                        magnitude=(6.0, 8.0), vs30=(180, 360))
+#   res['names'], res['scale_factors']
+
+import os
+import csv
+import sys
+import argparse
+import multiprocessing
+
+import numpy as np
+
+from record_io import stream_response_spectra
+
+# 数据库默认周期点：0.01 ~ 10 s 对数等距 100 个
+DEFAULT_PERIODS = np.geomspace(0.01, 10.0, 100)
+
+# 元数据字段及 CSV 中可识别的列名（不区分大小写）
+METADATA_COLUMNS = {
+    'magnitude': ('magnitude', 'mw', 'm', 'earthquake magnitude'),
+    'distance': ('distance', 'rrup', 'rrup (km)', 'rjb', 'rjb (km)', 'closest distance'),
+    'vs30': ('vs30', 'vs30 (m/s)', 'vs30 (m/s) selected for analysis'),
+}
+
+# 分块打分时每块的行数
+_SCORE_BLOCK_ROWS = 65536
+
+
+def read_metadata_csv(path, name_column='name'):
+    """
+    读取记录元数据表，返回 {记录名: {'magnitude': ..., 'distance': ..., 'vs30': ...}}
+
+    列名按 METADATA_COLUMNS 识别（如 PEER 汇总表的 "Earthquake Magnitude"、"Rrup"），记录名列默认为 name
+    """
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.DictReader(f)
+        lower = {c.strip().lower(): c for c in reader.fieldnames}
+        columns = {key: next((lower[a] for a in aliases if a in lower), None)
+                   for key, aliases in METADATA_COLUMNS.items()}
+        name_key = lower.get(name_column.lower(), name_column)
+        metadata = {}
+        for row in reader:
+            name = os.path.splitext(os.path.basename(row[name_key].strip()))[0]
+            metadata[name] = {key: float(row[col]) if col and row[col] not in (None, '') else np.nan
+                              for key, col in columns.items()}
+    return metadata
+
+
+def build_spectra_database(records, directory, periods=None, damping=0.05, metadata=None,
+                           max_bytes=256 * 2**20, workers=None, progress=None):
+    """
+    计算记录库的反应谱并写入 directory（log_spectra.bin + spectra_index.npz）
+
+    参数:
+        records: (name, dt, acc) 的可迭代对象（record_io.RecordStore 或 iter_records）
+        periods: 周期点，默认 DEFAULT_PERIODS
+        damping: 阻尼比
+        metadata: {记录名: {'magnitude', 'distance', 'vs30'}}（如 read_metadata_csv 的结果），缺失项为 nan
+        max_bytes, workers: 同 record_io.stream_response_spectra
+        progress: 可选回调 progress(已完成条数)
+    """
+    periods = DEFAULT_PERIODS if periods is None else np.asarray(periods, dtype=float)
+    metadata = metadata or {}
+    os.makedirs(directory, exist_ok=True)
+    names, dts = [], []
+    with open(os.path.join(directory, 'log_spectra.bin'), 'wb') as f:
+        for chunk_names, chunk_dts, spectra in stream_response_spectra(records, periods, damping,
+                                                                       max_bytes=max_bytes, workers=workers):
+            with np.errstate(divide='ignore'):
+                np.log(spectra).astype(np.float32).tofile(f)
+            names.extend(chunk_names)
+            dts.extend(chunk_dts)
+            if progress is not None:
+                progress(len(names))
+    fields = {key: np.array([metadata.get(n, {}).get(key, np.nan) for n in names], dtype=float)
+              for key in METADATA_COLUMNS}
+    np.savez(os.path.join(directory, 'spectra_index.npz'), names=np.array(names, dtype=str), dt=np.array(dts),
+             periods=periods, damping=np.array(damping), **fields)
+    return SpectraDatabase(directory)
+
+
+class SpectraDatabase:
+    """build_spectra_database 生成的反应谱库：ln Sa 矩阵以 memmap 打开，元数据为内存中的数组"""
+
+    def __init__(self, directory):
+        index = np.load(os.path.join(directory, 'spectra_index.npz'))
+        self.names = index['names']
+        self.dt = index['dt']
+        self.periods = index['periods']
+        self.damping = float(index['damping'])
+        self.magnitude = index['magnitude']
+        self.distance = index['distance']
+        self.vs30 = index['vs30']
+        path = os.path.join(directory, 'log_spectra.bin')
+        shape = (len(self.names), len(self.periods))
+        self.log_spectra = (np.memmap(path, dtype=np.float32, mode='r', shape=shape)
+                            if len(self.names) else np.empty(shape, dtype=np.float32))
+
+    def __len__(self):
+        return len(self.names)
+
+    def spectrum(self, i):
+        """第 i 条记录的反应谱（与源记录同单位）"""
+        return np.exp(np.asarray(self.log_spectra[i], dtype=float))
+
+    def filter(self, magnitude=None, distance=None, vs30=None):
+        """按元数据范围 (下限, 上限) 筛选，返回布尔数组；给定范围时元数据缺失的记录被排除"""
+        mask = np.ones(len(self), dtype=bool)
+        for values, bounds in ((self.magnitude, magnitude), (self.distance, distance), (self.vs30, vs30)):
+            if bounds is not None:
+                lo, hi = bounds
+                mask &= (values >= lo) & (values <= hi)
+        return mask
+
+
+def target_on_periods(periods, target_periods, target):
+    """目标谱按对数坐标插值到 periods 上，超出目标谱周期范围处为 nan"""
+    target_periods = np.asarray(target_periods, dtype=float)
+    target = np.asarray(target, dtype=float)
+    valid = (target_periods > 0) & (target > 0)
+    log_t = np.interp(np.log(periods), np.log(target_periods[valid]), np.log(target[valid]))
+    inside = (periods >= target_periods[valid].min()) & (periods <= target_periods[valid].max())
+    return np.where(inside, np.exp(log_t), np.nan)
+
+
+def _weights(periods, target, period_range, weights):
+    w = np.ones_like(periods) if weights is None else np.broadcast_to(np.asarray(weights, dtype=float),
+                                                                       periods.shape).copy()
+    if period_range is not None:
+        w = np.where((periods >= period_range[0]) & (periods <= period_range[1]), w, 0.0)
+    return np.where(np.isfinite(target), w, 0.0)
+
+
+def score_records(db, target_periods, target, period_range=None, weights=None, scale_range=(0.25, 4.0), mask=None):
+    """
+    全部记录对目标谱的最优调幅系数与拟合误差
+
+    参数:
+        db: SpectraDatabase
+        target_periods, target: 目标谱（如 calculate_chinese_spectrum / calculate_us_spectrum 的结果），单位与记录一致
+        period_range: 参与拟合的周期范围 (T1, T2)，默认目标谱与数据库周期的重叠部分
+        weights: 数据库各周期点的权重
+        scale_range: 调幅系数的允许范围
+        mask: 参与打分的记录（布尔数组，如 db.filter(...)），其余记录误差为 inf
+
+    返回:
+        dict: scale（调幅系数）, misfit（对数误差的加权均方根）, target（插值到数据库周期上的目标谱）, weights
+    """
+    periods = db.periods
+    target_db = target_on_periods(periods, target_periods, target)
+    w = _weights(periods, target_db, period_range, weights)
+    w_sum = w.sum()
+    if w_sum <= 0:
+        raise ValueError("目标谱与数据库周期没有重叠（或 period_range 内没有周期点）")
+    log_t = np.log(np.where(w > 0, target_db, 1.0))
+    wt = w * log_t
+    tt = wt @ log_t
+    log_lo, log_hi = np.log(scale_range)
+
+    n = len(db)
+    rows = np.arange(n) if mask is None else np.flatnonzero(mask)
+    scale = np.full(n, np.nan)
+    misfit = np.full(n, np.inf)
+    active = w > 0
+    for start in range(0, len(rows), _SCORE_BLOCK_ROWS):
+        block = rows[start:start + _SCORE_BLOCK_ROWS]
+        L = np.asarray(db.log_spectra[block][:, active], dtype=float)
+        wa = w[active]
+        ok = np.isfinite(L).all(axis=1)
+        L = np.where(ok[:, np.newaxis], L, 0.0)
+        # Σw r = Σw lnT - L·w，Σw r² = Σw lnT² - 2 L·(w lnT) + L²·w
+        sum_r = wt.sum() - L @ wa
+        sum_rr = tt - 2 * (L @ wt[active]) + (L * L) @ wa
+        log_s = np.clip(sum_r / w_sum, log_lo, log_hi)
+        value = (sum_rr - 2 * log_s * sum_r + log_s ** 2 * w_sum) / w_sum
+        scale[block] = np.where(ok, np.exp(log_s), np.nan)
+        misfit[block] = np.where(ok, np.sqrt(np.maximum(value, 0.0)), np.inf)
+    return {'scale': scale, 'misfit': misfit, 'target': target_db, 'weights': w}
+
+
+def select_records(db, target_periods, target, k=11, period_range=None, weights=None, scale_range=(0.25, 4.0),
+                   magnitude=None, distance=None, vs30=None, pool_size=None, min_ratio=None):
+    """
+    选出 k 条记录并调幅，使整组与目标谱最接近
+
+    参数:
+        k: 记录条数
+        magnitude, distance, vs30: 元数据范围 (下限, 上限)
+        pool_size: 候选池大小（按单条误差），默认 max(20k, 200)
+        min_ratio: 给定时（如 ASCE 7-16 第 16.2.3 条的 0.9），整组平均谱在拟合周期范围内低于 min_ratio × 目标谱时
+                   统一放大全部调幅系数
+        其余参数同 score_records
+
+    返回:
+        dict: indices, names, scale_factors, misfits（单条）, set_misfit（整组几何平均谱的对数误差）,
+              periods, target, mean_spectrum（调幅后算术平均谱）, min_ratio（平均谱/目标谱 在拟合范围内的最小值）,
+              magnitude, distance, vs30
+    """
+    mask = db.filter(magnitude, distance, vs30)
+    scores = score_records(db, target_periods, target, period_range, weights, scale_range, mask)
+    misfit = scores['misfit']
+    valid = np.flatnonzero(np.isfinite(misfit))
+    if len(valid) < k:
+        raise ValueError(f"满足条件的记录只有 {len(valid)} 条，少于 k = {k}")
+    pool_size = min(len(valid), pool_size or max(20 * k, 200))
+    pool = valid[np.argpartition(misfit[valid], pool_size - 1)[:pool_size]] if pool_size < len(valid) else valid
+
+    w = scores['weights']
+    active = w > 0
+    log_t = np.log(scores['target'][active])
+    wa = w[active] / w[active].sum()
+    pool = np.sort(pool)
+    scaled = np.asarray(db.log_spectra[pool][:, active], dtype=float)
+    scaled += np.log(scores['scale'][pool])[:, np.newaxis]
+
+    # 逐条加入：每一步对候选池中全部记录计算加入后几何平均谱的误差
+    chosen = []
+    total = np.zeros(active.sum())
+    available = np.ones(len(pool), dtype=bool)
+    for m in range(1, k + 1):
+        residual = (total + scaled) / m - log_t
+        cost = np.where(available, (residual ** 2) @ wa, np.inf)
+        j = int(np.argmin(cost))
+        chosen.append(j)
+        available[j] = False
+        total += scaled[j]
+    indices = pool[chosen]
+    scale_factors = scores['scale'][indices]
+
+    spectra = np.exp(np.asarray(db.log_spectra[indices], dtype=float))
+    mean_spectrum = (spectra * scale_factors[:, np.newaxis]).mean(axis=0)
+    ratio = (mean_spectrum / scores['target'])[active].min()
+    if min_ratio is not None and ratio < min_ratio:
+        scale_factors = scale_factors * (min_ratio / ratio)
+        mean_spectrum = mean_spectrum * (min_ratio / ratio)
+        ratio = min_ratio
+    set_log = (np.log(spectra[:, active]) + np.log(scale_factors)[:, np.newaxis]).mean(axis=0)
+    return {
+        'indices': indices, 'names': [str(db.names[i]) for i in indices], 'scale_factors': scale_factors,
+        'misfits': misfit[indices], 'set_misfit': float(np.sqrt(((set_log - log_t) ** 2) @ wa)),
+        'periods': db.periods, 'target': scores['target'], 'mean_spectrum': mean_spectrum, 'min_ratio': float(ratio),
+        'magnitude': db.magnitude[indices], 'distance': db.distance[indices], 'vs30': db.vs30[indices],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="地震动记录库反应谱预计算与按规范目标谱选波")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('build', help="由记录目录或 record_io 记录库生成反应谱库")
+    p.add_argument('records', help="记录文件目录，或 build_record_store 生成的目录（含 index.npz）")
+    p.add_argument('-o', '--output', required=True, help="反应谱库目录")
+    p.add_argument('--metadata', help="元数据 CSV（记录名列 name，以及震级、距离、Vs30 列）")
+    p.add_argument('--damping', type=float, default=0.05, help="阻尼比")
+    p.add_argument('--workers', type=int, default=None, help="进程数，默认全部 CPU 核心")
+
+    p = sub.add_parser('select', help="按中国或美国规范目标谱选波")
+    p.add_argument('database', help="反应谱库目录")
+    p.add_argument('--code', default='china', choices=['china', 'us'], help="目标谱规范")
+    p.add_argument('--alpha-max', type=float, default=0.50, help="中国规范 alpha_max（罕遇地震 7 度 0.10g 为 0.50）")
+    p.add_argument('--tg', type=float, default=0.35, help="中国规范 Tg (s)")
+    p.add_argument('--ss', type=float, default=0.51, help="美国规范 Ss (g)")
+    p.add_argument('--s1', type=float, default=0.18, help="美国规范 S1 (g)")
+    p.add_argument('--site-class', default='D', help="美国规范场地类别")
+    p.add_argument('--tl', type=float, default=24.0, help="美国规范 TL (s)")
+    p.add_argument('-k', type=int, default=11, help="记录条数")
+    p.add_argument('--period-range', type=float, nargs=2, metavar=('T1', 'T2'), help="拟合周期范围 (s)")
+    p.add_argument('--magnitude', type=float, nargs=2, metavar=('MIN', 'MAX'))
+    p.add_argument('--distance', type=float, nargs=2, metavar=('MIN', 'MAX'))
+    p.add_argument('--vs30', type=float, nargs=2, metavar=('MIN', 'MAX'))
+    p.add_argument('--min-ratio', type=float, default=None, help="整组平均谱不低于目标谱的比例（如 0.9）")
+    p.add_argument('-o', '--output', help="选波结果 CSV，缺省输出到标准输出")
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        import record_io as rio
+        if os.path.exists(os.path.join(args.records, 'index.npz')):
+            records = rio.RecordStore(args.records)
+        else:
+            records = rio.iter_records(rio.find_records(args.records), skip_errors=True)
+        metadata = read_metadata_csv(args.metadata) if args.metadata else None
+
+        def progress(done):
+            sys.stderr.write(f"\r{done}")
+            sys.stderr.flush()
+        db = build_spectra_database(records, args.output, damping=args.damping, metadata=metadata,
+                                    workers=args.workers, progress=progress)
+        sys.stderr.write(f"\n反应谱库: {len(db)} 条记录 -> {args.output}\n")
+        return
+
+    from spectrum_core import calculate_chinese_spectrum, calculate_us_spectrum
+    db = SpectraDatabase(args.database)
+    periods = db.periods
+    if args.code == 'china':
+        periods, target = calculate_chinese_spectrum(args.alpha_max, args.tg, db.damping, periods=periods)
+    else:
+        # 选波采用弹性谱（R = 1）
+        periods, target = calculate_us_spectrum(args.ss, args.s1, args.site_class, args.tl, 1.0, db.damping,
+                                                periods=periods)[:2]
+    res = select_records(db, periods, target, args.k, args.period_range, magnitude=args.magnitude,
+                         distance=args.distance, vs30=args.vs30, min_ratio=args.min_ratio)
+    out = open(args.output, 'w', newline='', encoding='utf-8-sig') if args.output else sys.stdout
+    try:
+        writer = csv.writer(out)
+        writer.writerow(['name', 'scale_factor', 'misfit', 'magnitude', 'distance', 'vs30'])
+        for i in range(len(res['names'])):
+            writer.writerow([res['names'][i], f"{res['scale_factors'][i]:.4f}", f"{res['misfits'][i]:.4f}",
+                             res['magnitude'][i], res['distance'][i], res['vs30'][i]])
+    finally:
+        if args.output:
+            out.close()
+    sys.stderr.write(f"整组误差 {res['set_misfit']:.4f}，平均谱/目标谱最小值 {res['min_ratio']:.3f}\n")
+
+
+if __name__ == '__main__':
+    # 打包为 exe 时子进程不会重复执行命令行入口
+    multiprocessing.freeze_support()
+    main()
@@ -0,0 +1,200 @@
+# 地震动记录的弹性反应谱（Nigam-Jennings 分段线性精确解）
+#
+# 对应 C# ArtificialWaveCalculations.CalculateResponseSpectrum，但对全部 周期 × 阻尼比
+# 的单自由度体系同时递推，并可在多条记录间批量、多进程计算。
+#
+# 单自由度方程 ü + 2ζωu̇ + ω²u = -ag(t)，ag 在每个时间步内线性变化时状态转移是精确的：
+#   [u, v]_{i+1} = A [u, v]_i + B0 ag_i + B1 ag_{i+1}
+# 所求响应 y = C [u, v] 满足二阶递推（Cayley-Hamilton）：
+#   y_k = tr(A) y_{k-1} - det(A) y_{k-2} + n2 ag_k + n1 ag_{k-1} + n0 ag_{k-2}
+# 因此每个时间步只需对全部振子做几次数组运算。
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# 周期小于该值时直接取峰值加速度（与 C# 版本一致）
+PGA_PERIOD = 0.001
+
+# 每个时间块预先计算的激励项 (块长, 记录数, 振子数) 的内存上限
+_FORCING_BLOCK_BYTES = 32 * 2**20
+
+
+def nigam_jennings_coefficients(periods, damping, dt):
+    """
+    Nigam-Jennings 状态转移系数
+
+    参数:
+        periods, damping: 可广播的周期 (s) 与阻尼比数组（0 <= damping < 1）
+        dt: 时间步长 (s)
+
+    返回:
+        (A, B0, B1)，形状分别为 (..., 2, 2)、(..., 2)、(..., 2)
+    """
+    T, z = np.broadcast_arrays(np.asarray(periods, dtype=float), np.asarray(damping, dtype=float))
+    w = 2 * np.pi / T
+    sq = np.sqrt(1 - z ** 2)
+    wd = w * sq
+    E = np.exp(-z * w * dt)
+    S = np.sin(wd * dt)
+    Cc = np.cos(wd * dt)
+    w2 = w ** 2
+    w3 = w ** 3
+
+    A = np.empty(T.shape + (2, 2))
+    A[..., 0, 0] = E * (z / sq * S + Cc)
+    A[..., 0, 1] = E * S / wd
+    A[..., 1, 0] = -w / sq * E * S
+    A[..., 1, 1] = E * (Cc - z / sq * S)
+
+    k1 = (2 * z ** 2 - 1) / (w2 * dt)
+    k2 = 2 * z / (w3 * dt)
+    B0 = np.empty(T.shape + (2,))
+    B1 = np.empty(T.shape + (2,))
+    B0[..., 0] = E * ((k1 + z / w) * S / wd + (k2 + 1 / w2) * Cc) - k2
+    B1[..., 0] = -E * (k1 * S / wd + k2 * Cc) - 1 / w2 + k2
+    B0[..., 1] = (E * ((k1 + z / w) * (Cc - z / sq * S) - (k2 + 1 / w2) * (wd * S + z * w * Cc))
+                  + 1 / (w2 * dt))
+    B1[..., 1] = -E * (k1 * (Cc - z / sq * S) - k2 * (wd * S + z * w * Cc)) - 1 / (w2 * dt)
+    return A, B0, B1
+
+
+def _output_vector(periods, damping, kind):
+    # y = C [u, v]：'sa' 为绝对加速度，'sd'/'psa' 为相对位移（psa 最后乘 ω²），'sv' 为相对速度
+    T, z = np.broadcast_arrays(np.asarray(periods, dtype=float), np.asarray(damping, dtype=float))
+    w = 2 * np.pi / T
+    C = np.zeros(T.shape + (2,))
+    if kind == 'sa':
+        C[..., 0] = -w ** 2
+        C[..., 1] = -2 * z * w
+    elif kind in ('sd', 'psa'):
+        C[..., 0] = 1.0
+    elif kind == 'sv':
+        C[..., 1] = 1.0
+    else:
+        raise ValueError(f"未知的反应谱类型: {kind}")
+    return C
+
+
+def _peak_response(acc, dt, periods, damping, kind):
+    # acc: (记录数, 步数)；periods, damping: 展平后的振子参数 (K,)
+    n_rec, n_pts = acc.shape
+    A, B0, B1 = nigam_jennings_coefficients(periods, damping, dt)
+    C = _output_vector(periods, damping, kind)
+    tr = A[:, 0, 0] + A[:, 1, 1]
+    det = A[:, 0, 0] * A[:, 1, 1] - A[:, 0, 1] * A[:, 1, 0]
+    CA = np.einsum('ki,kij->kj', C, A)
+    n2 = np.einsum('ki,ki->k', C, B1)
+    n1 = np.einsum('ki,ki->k', CA, B1) + np.einsum('ki,ki->k', C, B0) - tr * n2
+    n0 = np.einsum('ki,ki->k', CA, B0) - tr * np.einsum('ki,ki->k', C, B0)
+
+    # y_0 = 0（静止初始条件），y_1 = C (B0 ag_0 + B1 ag_1)
+    y_prev = np.zeros((n_rec, len(periods)))
+    peak = np.zeros_like(y_prev)
+    if n_pts < 2:
+        return peak
+    y = acc[:, 0:1] * np.einsum('ki,ki->k', C, B0) + acc[:, 1:2] * n2
+    np.abs(y, out=peak)
+
+    block = max(1, _FORCING_BLOCK_BYTES // (8 * n_rec * len(periods)))
+    tmp = np.empty_like(y)
+    for start in range(2, n_pts, block):
+        stop = min(start + block, n_pts)
+        a0 = acc[:, start - 2:stop - 2].T[:, :, np.newaxis]
+        a1 = acc[:, start - 1:stop - 1].T[:, :, np.newaxis]
+        a2 = acc[:, start:stop].T[:, :, np.newaxis]
+        forcing = a2 * n2 + a1 * n1 + a0 * n0
+        for j in range(stop - start):
+            # y_new = tr*y - det*y_prev + f，复用 y_prev 的内存存放新值
+            np.multiply(y_prev, -det, out=y_prev)
+            np.multiply(y, tr, out=tmp)
+            y_prev += tmp
+            y_prev += forcing[j]
+            y, y_prev = y_prev, y
+            np.abs(y, out=tmp)
+            np.maximum(peak, tmp, out=peak)
+    return peak
+
+
+def response_spectrum(acc, dt, periods, damping=0.05, kind='sa'):
+    """
+    计算一条或多条等长加速度记录的弹性反应谱
+
+    参数:
+        acc: 加速度时程，形状 (步数,) 或 (记录数, 步数)，单位任意（结果单位相同）
+        dt: 时间步长 (s)
+        periods: 周期数组 (s)，小于 0.001 s 时取峰值加速度
+        damping: 阻尼比，标量或数组（0 <= damping < 1）
+        kind: 'sa' 绝对加速度（与 C# 版本一致）、'psa' 拟加速度、'sv' 相对速度、'sd' 相对位移
+
+    返回:
+        反应谱数组，形状为 acc 的记录维 + damping 的形状 + (周期数,)
+    """
+    acc = np.asarray(acc, dtype=float)
+    periods = np.atleast_1d(np.asarray(periods, dtype=float))
+    damping = np.asarray(damping, dtype=float)
+    records = np.atleast_2d(acc)
+
+    T, z = (x.ravel() for x in np.broadcast_arrays(periods, damping[..., np.newaxis]))
+    result = np.empty((records.shape[0], T.size))
+    short = T < PGA_PERIOD
+    if np.any(short):
+        result[:, short] = np.abs(records).max(axis=1, keepdims=True)
+    if not np.all(short):
+        peak = _peak_response(records, dt, T[~short], z[~short], kind)
+        if kind == 'psa':
+            peak *= (2 * np.pi / T[~short]) ** 2
+        result[:, ~short] = peak
+    return result.reshape(acc.shape[:-1] + damping.shape + periods.shape)
+
+
+def _spectra_batch(args):
+    records, dt, periods, damping, kind = args
+    # 等长记录合并为二维数组一起递推（传入时已按长度降序排列）
+    lengths = np.array([len(r) for r in records])
+    out = []
+    for length in np.unique(lengths)[::-1]:
+        group = [np.asarray(r, dtype=float) for r, n in zip(records, lengths) if n == length]
+        out.append(response_spectrum(np.stack(group), dt, periods, damping, kind))
+    return np.concatenate(out)
+
+
+def response_spectra(records, dt, periods, damping=0.05, kind='sa', workers=None, batch_size=16):
+    """
+    多条（可不等长、不同步长）记录的反应谱，按批分配到进程池并行计算
+
+    参数:
+        records: 加速度时程序列
+        dt: 时间步长，标量或与 records 等长的序列
+        periods, damping, kind: 同 response_spectrum
+        workers: 进程数，默认全部 CPU 核心；为 1 时在当前进程内计算
+        batch_size: 每批记录数，同批内等长记录一起做向量化递推
+
+    返回:
+        数组，形状 (记录数,) + damping 的形状 + (周期数,)，顺序与 records 一致
+    """
+    records = list(records)
+    dts = np.broadcast_to(np.asarray(dt, dtype=float), (len(records),))
+    # 同一批内要求步长相同；按 (步长, 长度) 排序使等长记录尽量落在同一批
+    order = sorted(range(len(records)), key=lambda i: (dts[i], -len(records[i])))
+    tasks = []
+    index = []
+    for start in range(0, len(order), batch_size):
+        chunk = order[start:start + batch_size]
+        for step in np.unique(dts[chunk]):
+            sub = [i for i in chunk if dts[i] == step]
+            sub.sort(key=lambda i: -len(records[i]))
+            tasks.append(([records[i] for i in sub], float(step), periods, damping, kind))
+            index.extend(sub)
+
+    if workers == 1 or len(tasks) == 1:
+        results = [_spectra_batch(t) for t in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            results = list(pool.map(_spectra_batch, tasks))
+
+    stacked = np.concatenate(results)
+    out = np.empty_like(stacked)
+    out[np.asarray(index)] = stacked
+    return out
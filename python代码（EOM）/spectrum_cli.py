@@ -0,0 +1,340 @@
+# 命令行批量计算：读取 JSON / CSV 场景文件，输出反应谱或风速转换结果
+#
+# 不导入 PyQt6 / matplotlib，可在 CI 与无界面的计算节点上运行。
+#
+# 用法示例:
+#   python spectrum_cli.py spectrum scenarios.csv -o results.npz
+#   python spectrum_cli.py wind sites.json -o results.csv
+#   python spectrum_cli.py base-shear buildings.csv -o ratios.csv
+#   python spectrum_cli.py metrics sites.csv -o metrics.csv --bands 0-0.5,0.5-1,1-3,3-6
+#
+# 场景文件中缺省的字段取界面默认值（见 SPECTRUM_DEFAULTS / WIND_DEFAULTS）。
+# 输出格式由 -o 的扩展名决定：.json（默认，输出到标准输出）、.csv（汇总表）、.npz（含全部曲线）。
+
+import os
+import sys
+import csv
+import json
+import math
+import argparse
+
+SPECTRUM_DEFAULTS = {
+    'damping': 0.05,
+    'intensity': "7度(0.10g)", 'site_category': "II", 'group': "第一组",
+    'Ss': 0.51, 'S1': 0.18, 'site_class': 'D', 'TL': 24.0, 'R': 5.0,
+}
+
+# 底部剪力对比：每栋建筑的基本周期 T1、重要性系数 Ie 与等效总重力荷载系数（GB50011 第 5.2.1 条，多质点取 0.85）
+BASE_SHEAR_DEFAULTS = dict(SPECTRUM_DEFAULTS, T1=1.0, Ie=1.0, geq_factor=0.85)
+
+# 对比指标：周期段内的底部剪力系数比同样需要 Ie 与 geq_factor
+METRICS_DEFAULTS = dict(SPECTRUM_DEFAULTS, Ie=1.0, geq_factor=0.85)
+
+# 对比指标中按周期段给出的字段（表格中每个周期段一列）
+BAND_METRICS = ['max_deviation', 'max_deviation_period', 'mean_deviation', 'mean_abs_deviation',
+                'china_intensity', 'us_intensity', 'intensity_difference', 'intensity_ratio', 'base_shear_ratio']
+
+WIND_DEFAULTS = {
+    'wind_speed': 115.0, 'unit': 'mph', 'height': 10.0, 'time': '3s', 'return_period': '700y',
+}
+
+
+def read_scenarios(path, defaults):
+    """读取场景文件（JSON 列表 / {"scenarios": [...]} 或带表头的 CSV），'-' 表示从标准输入读取 JSON"""
+    if path == '-':
+        data = json.load(sys.stdin)
+    elif path.lower().endswith('.csv'):
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            data = [{k: v for k, v in row.items() if v not in (None, '')} for row in csv.DictReader(f)]
+    else:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get('scenarios', [data])
+    return normalize_scenarios(data, defaults)
+
+
+def normalize_scenarios(data, defaults):
+    """场景字典列表补齐缺省字段，并把缺省值为浮点数的字段转为 float（CSV 与查询字符串中为文本）"""
+    rows = []
+    for item in data:
+        row = dict(defaults)
+        row.update(item)
+        for key, value in defaults.items():
+            if isinstance(value, float):
+                row[key] = float(row[key])
+        rows.append(row)
+    return rows
+
+
+def _chinese_parameters(rows):
+    # 场景中直接给出的 alpha_max / Tg 优先，否则按烈度、场地类别与分组查表
+    import numpy as np
+    from spectrum_core import get_alpha_max, get_Tg
+
+    alpha_max = np.array([float(r['alpha_max']) if 'alpha_max' in r else get_alpha_max(r['intensity']) for r in rows])
+    Tg = np.array([float(r['Tg']) if 'Tg' in r else get_Tg(r['site_category'], r['group']) for r in rows])
+    return alpha_max, Tg
+
+
+def compute_spectra(rows, grid='linear', t_min=0.01, t_max=6.0, num=600, tol=1e-3, periods=None):
+    """
+    对全部场景一次性批量计算中美反应谱，返回 (periods, china, us, summary)
+
+    grid 为 'linear' / 'log'（num 个点）或 'adaptive'（按 tol 加密），三者都包含全部场景的规范拐点；
+    给定 periods 时直接使用该周期数组（各场景结果与同批其他场景无关）
+    """
+    import numpy as np
+    from spectrum_core import (
+        calculate_chinese_spectrum_batch, calculate_us_spectrum_batch,
+        make_period_grid, chinese_period_grid, us_period_grid, chinese_corner_periods, us_corner_periods
+    )
+
+    alpha_max, Tg = _chinese_parameters(rows)
+    damping = np.array([r['damping'] for r in rows])
+    us_params = ([r['Ss'] for r in rows], [r['S1'] for r in rows], [r['site_class'] for r in rows],
+                 [r['TL'] for r in rows])
+    if periods is not None:
+        periods = np.asarray(periods, dtype=float)
+    elif grid == 'adaptive':
+        periods = np.union1d(chinese_period_grid(Tg, t_min, t_max, tol),
+                             us_period_grid(*us_params, t_min, t_max, tol))
+    else:
+        breakpoints = np.concatenate([chinese_corner_periods(Tg), *us_corner_periods(*us_params)])
+        periods = make_period_grid(t_min, t_max, num, grid, breakpoints)
+    periods, china = calculate_chinese_spectrum_batch(alpha_max, Tg, damping, periods=periods)
+    _, us, SDS, SD1, Fa, Fv = calculate_us_spectrum_batch(
+        [r['Ss'] for r in rows], [r['S1'] for r in rows], [r['site_class'] for r in rows],
+        [r['TL'] for r in rows], [r['R'] for r in rows], damping, periods=periods)
+
+    summary = []
+    for i, row in enumerate(rows):
+        item = dict(row)
+        item.update(alpha_max=alpha_max[i], Tg=Tg[i], Fa=Fa[i], Fv=Fv[i], SDS=SDS[i], SD1=SD1[i],
+                    china_peak=china[i].max(), us_peak=us[i].max())
+        summary.append({k: v.item() if hasattr(v, 'item') else v for k, v in item.items()})
+    return periods, china, us, summary
+
+
+def compute_base_shear(rows):
+    """
+    在各建筑的基本周期 T1 处直接计算中美规范谱值与底部剪力系数（一次向量化计算，不生成整条曲线）
+
+    返回字段数组的字典:
+        alpha1: T1 处中国规范地震影响系数；china_coefficient = geq_factor * alpha1 (FEk / GE)
+        Sa: T1 处美国规范谱值（与反应谱曲线同口径，已除以 R 与 B）；Cs: ASCE 7-16 第 12.8.1.1 条地震反应系数
+        spectrum_ratio = alpha1 / Sa，base_shear_ratio = china_coefficient / Cs
+    """
+    import numpy as np
+    from spectrum_core import chinese_spectrum_at, us_spectrum_at, us_seismic_response_coefficient
+
+    def column(key):
+        return np.array([r[key] for r in rows])
+
+    alpha_max, Tg = _chinese_parameters(rows)
+    T1 = column('T1')
+    damping = column('damping')
+    alpha1 = chinese_spectrum_at(T1, alpha_max, Tg, damping)
+    Sa, SDS, SD1, Fa, Fv = us_spectrum_at(T1, column('Ss'), column('S1'), column('site_class'),
+                                          column('TL'), column('R'), damping)
+    Cs = us_seismic_response_coefficient(T1, SDS, SD1, column('S1'), column('TL'), column('R'), column('Ie'))
+    china_coefficient = column('geq_factor') * alpha1
+    with np.errstate(divide='ignore', invalid='ignore'):
+        spectrum_ratio = alpha1 / Sa
+        base_shear_ratio = china_coefficient / Cs
+    return {'alpha_max': alpha_max, 'Tg': Tg, 'alpha1': alpha1, 'china_coefficient': china_coefficient,
+            'Fa': Fa, 'Fv': Fv, 'SDS': SDS, 'SD1': SD1, 'Sa': Sa, 'Cs': Cs,
+            'spectrum_ratio': spectrum_ratio, 'base_shear_ratio': base_shear_ratio}
+
+
+def compute_metrics(rows, bands=None, t_max=6.0):
+    """对全部场景一次计算中美反应谱对比指标（见 spectrum_metrics.comparison_metrics），返回其结果字典"""
+    import numpy as np
+    from spectrum_metrics import comparison_metrics, DEFAULT_BANDS
+
+    def column(key):
+        return np.array([r[key] for r in rows])
+
+    alpha_max, Tg = _chinese_parameters(rows)
+    return comparison_metrics(alpha_max, Tg, column('Ss'), column('S1'), column('site_class'), column('TL'),
+                              column('R'), column('damping'), bands=bands or DEFAULT_BANDS,
+                              Ie=column('Ie'), geq_factor=column('geq_factor'), t_max=t_max)
+
+
+def base_shear_results(rows, fields):
+    """compute_base_shear 的结果按场景拆分为字典列表（含输入字段）"""
+    results = []
+    for i, row in enumerate(rows):
+        item = dict(row)
+        item.update({k: v[i].item() for k, v in fields.items()})
+        results.append(item)
+    return results
+
+
+def metrics_results(rows, fields, as_table=False):
+    """compute_metrics 的结果按场景拆分为字典列表，周期段指标展开为 <指标>_<周期段> 字段；as_table 时交点写成一个字符串"""
+    band_names = [f"{a:g}-{b:g}s" for a, b in fields['bands']]
+    results = []
+    for i, row in enumerate(rows):
+        item = dict(row)
+        item.update({k: fields[k][i].item() for k in ('SDS', 'SD1', 'Fa', 'Fv', 'n_crossings')})
+        crossings = [t.item() for t in fields['crossings'][i] if t == t]
+        item['crossings'] = ' '.join(f"{t:.6g}" for t in crossings) if as_table else crossings
+        for key in BAND_METRICS:
+            for j, name in enumerate(band_names):
+                item[f"{key}_{name}"] = fields[key][i, j].item()
+        results.append(item)
+    return results
+
+
+def parse_bands(text):
+    """'0-0.5,0.5-1,1-3' -> [(0.0, 0.5), (0.5, 1.0), (1.0, 3.0)]"""
+    return [tuple(float(x) for x in item.split('-')) for item in text.split(',') if item.strip()]
+
+
+def convert_winds(rows, with_process=False):
+    """批量风速转换；转换过程文字只在 with_process 为 True 时逐行生成"""
+    from spectrum_core import convert_wind_speed_batch, wind_conversion_process
+
+    res = convert_wind_speed_batch([r['wind_speed'] for r in rows], [r['unit'] for r in rows],
+                                   [r['height'] for r in rows], [r['time'] for r in rows],
+                                   [r['return_period'] for r in rows])
+    results = []
+    for i, row in enumerate(rows):
+        item = dict(row)
+        item['v_10m'] = res['wind_speed_50y_10m_10min'][i].item()
+        item['w0'] = res['basic_wind_pressure'][i].item()
+        if with_process:
+            item['process'] = wind_conversion_process(res, i)
+        results.append(item)
+    return results
+
+
+def write_table(path, rows):
+    fields = list(dict.fromkeys(k for row in rows for k in row))
+    with open(path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({k: '\n'.join(v) if isinstance(v, list) else v for k, v in row.items()})
+
+
+def json_safe(value):
+    """nan / inf 不是合法 JSON（如 E 类场地高 Ss/S1 时 Fa、Fv 无定义），输出为 null"""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {k: json_safe(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [json_safe(v) for v in value]
+    return value
+
+
+def write_json(path, data):
+    data = json_safe(data)
+    if path is None:
+        json.dump(data, sys.stdout, ensure_ascii=False, indent=2, allow_nan=False)
+        sys.stdout.write('\n')
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2, allow_nan=False)
+
+
+def cmd_spectrum(args):
+    rows = read_scenarios(args.input, SPECTRUM_DEFAULTS)
+    periods, china, us, summary = compute_spectra(rows, args.grid, args.t_min, args.t_max, args.num, args.tol)
+    ext = os.path.splitext(args.output or '')[1].lower()
+    if ext == '.npz':
+        import numpy as np
+        fields = ['alpha_max', 'Tg', 'Fa', 'Fv', 'SDS', 'SD1']
+        np.savez(args.output, periods=periods, china=china, us=us,
+                 **{k: np.array([s[k] for s in summary]) for k in fields})
+    elif ext == '.csv':
+        write_table(args.output, summary)
+    else:
+        for i, item in enumerate(summary):
+            item['china'] = china[i].tolist()
+            item['us'] = us[i].tolist()
+        write_json(args.output, {'periods': periods.tolist(), 'scenarios': summary})
+
+
+def cmd_wind(args):
+    rows = read_scenarios(args.input, WIND_DEFAULTS)
+    results = convert_winds(rows, with_process=args.process)
+    if args.output and args.output.lower().endswith('.csv'):
+        write_table(args.output, results)
+    else:
+        write_json(args.output, results)
+
+
+def cmd_base_shear(args):
+    rows = read_scenarios(args.input, BASE_SHEAR_DEFAULTS)
+    fields = compute_base_shear(rows)
+    if args.output and args.output.lower().endswith('.npz'):
+        import numpy as np
+        np.savez(args.output, **fields)
+        return
+    results = base_shear_results(rows, fields)
+    if args.output and args.output.lower().endswith('.csv'):
+        write_table(args.output, results)
+    else:
+        write_json(args.output, results)
+
+
+def cmd_metrics(args):
+    rows = read_scenarios(args.input, METRICS_DEFAULTS)
+    fields = compute_metrics(rows, parse_bands(args.bands) if args.bands else None, args.t_max)
+    if args.output and args.output.lower().endswith('.npz'):
+        import numpy as np
+        np.savez(args.output, **fields)
+        return
+    as_table = bool(args.output) and args.output.lower().endswith('.csv')
+    results = metrics_results(rows, fields, as_table)
+    if as_table:
+        write_table(args.output, results)
+    else:
+        write_json(args.output, results)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="中美规范参数转换（命令行批量计算）")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('spectrum', help="批量计算中美反应谱")
+    p.add_argument('input', help="场景文件 (.json / .csv)，'-' 表示标准输入")
+    p.add_argument('-o', '--output', help="输出文件 (.json / .csv / .npz)，缺省输出 JSON 到标准输出")
+    p.add_argument('--grid', default='linear', choices=['linear', 'log', 'adaptive'],
+                   help="周期网格：等距 / 对数 / 按精度自适应（均包含规范拐点）")
+    p.add_argument('--t-min', type=float, default=0.01, help="最小周期 (s)")
+    p.add_argument('--t-max', type=float, default=6.0, help="最大周期 (s)，可超过 6 s 以包含 TL 之后的下降段")
+    p.add_argument('--num', type=int, default=600, help="linear / log 网格点数")
+    p.add_argument('--tol', type=float, default=1e-3, help="adaptive 网格的线性插值相对误差")
+    p.set_defaults(func=cmd_spectrum)
+
+    p = sub.add_parser('base-shear', help="按各建筑基本周期 T1 计算中美底部剪力系数之比")
+    p.add_argument('input', help="建筑列表文件 (.json / .csv)，'-' 表示标准输入")
+    p.add_argument('-o', '--output', help="输出文件 (.json / .csv / .npz)，缺省输出 JSON 到标准输出")
+    p.set_defaults(func=cmd_base_shear)
+
+    p = sub.add_parser('metrics', help="中美反应谱对比指标（交点周期、分段偏差、谱强度与底部剪力系数比）")
+    p.add_argument('input', help="场景文件 (.json / .csv)，字段同 spectrum，另可加 Ie、geq_factor")
+    p.add_argument('-o', '--output', help="输出文件 (.json / .csv / .npz，npz 含比值曲线)，缺省输出 JSON 到标准输出")
+    p.add_argument('--bands', help="周期段，如 0-0.5,0.5-1,1-3,3-6（默认即此）")
+    p.add_argument('--t-max', type=float, default=6.0, help="求交点的最大周期 (s)")
+    p.set_defaults(func=cmd_metrics)
+
+    p = sub.add_parser('wind', help="批量风速转换 (ASCE7 -> GB50009)")
+    p.add_argument('input', help="场景文件 (.json / .csv)，'-' 表示标准输入")
+    p.add_argument('-o', '--output', help="输出文件 (.json / .csv)，缺省输出 JSON 到标准输出")
+    p.add_argument('--process', action='store_true', help="同时输出转换过程文字")
+    p.set_defaults(func=cmd_wind)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -8,214 +8,104 @@
 # - PyQt6-Frameless-Window==0.7.5
 
 import sys
+import logging
+import multiprocessing
 import numpy as np
 import matplotlib
-import matplotlib.pyplot as plt
+import matplotlib.style
 from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg
 from matplotlib.figure import Figure
+from matplotlib.collections import LineCollection, PolyCollection
 
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtWidgets import QApplication, QWidget, QHBoxLayout, QVBoxLayout, QFrame
 
 # 引入 Fluent Widgets 组件
 # PyQt-Fluent-Widgets
 from qfluentwidgets import (
     FluentWindow, SubtitleLabel, BodyLabel, StrongBodyLabel,
-    ComboBox, DoubleSpinBox, PrimaryPushButton,
+    ComboBox, DoubleSpinBox, SpinBox, PrimaryPushButton, PushButton, ProgressBar, LineEdit, CheckBox,
     CardWidget, ScrollArea, setTheme, Theme, InfoBar, InfoBarPosition,
     FluentIcon as FIF, TextEdit
 )
 
+# 核心计算（无界面依赖）
+from spectrum_core import (
+    INTENSITIES, SITE_CATEGORIES, EARTHQUAKE_GROUPS, US_SITE_CLASSES,
+    get_alpha_max, get_Tg, chinese_damping_factors, us_damping_factor,
+    calculate_chinese_spectrum, calculate_chinese_spectrum_batch,
+    get_Fa_Fv, get_Fa_Fv_batch,
+    calculate_us_spectrum, calculate_us_spectrum_batch,
+    chinese_period_grid, us_period_grid,
+    convert_wind_speed_to_chinese, SpectrumCache
+)
+# 后台任务（人工波 artificial_wave、反向匹配 spectrum_match 与不确定性包络 spectrum_uncertainty 在首次使用时才导入）
+from gui_workers import JobRunner
+# 分阶段计时（SPECTRUM_PERF=1 开启，SPECTRUM_PROFILE=文件名 同时开启 cProfile）
+import perf_trace
+
+logger = logging.getLogger('spectrum')
+
 # ==========================================
-# 1. 核心计算逻辑 (保持原样不变)
+# 1. 核心计算逻辑 (已移至 spectrum_core.py)
 # ==========================================
 
-# 设置matplotlib支持中文
-plt.rcParams['font.sans-serif'] = ['SimHei', 'Microsoft YaHei', 'Arial Unicode MS']
-plt.rcParams['axes.unicode_minus'] = False
-
-def get_alpha_max(intensity):
-    alpha_max_table = {
-        "6度(0.05g)": 0.04, "7度(0.10g)": 0.08, "7度(0.15g)": 0.12,
-        "8度(0.20g)": 0.16, "8度(0.30g)": 0.24, "9度(0.40g)": 0.32
-    }
-    return alpha_max_table.get(intensity, 0.08)
-
-def get_Tg(site_category, earthquake_group):
-    Tg_table = {
-        "第一组": {"I0": 0.20, "I1": 0.25, "II": 0.35, "III": 0.45, "IV": 0.65},
-        "第二组": {"I0": 0.25, "I1": 0.30, "II": 0.40, "III": 0.55, "IV": 0.75},
-        "第三组": {"I0": 0.30, "I1": 0.35, "II": 0.45, "III": 0.65, "IV": 0.90}
-    }
-    return Tg_table.get(earthquake_group, {}).get(site_category, 0.35)
-
-def calculate_chinese_spectrum(alpha_max, Tg, damping=0.05):
-    gamma = 0.9 + (0.05 - damping) / (0.3 + 6 * damping)
-    eta1 = 0.02 + (0.05 - damping) / (4 + 32 * damping)
-    if eta1 < 0: eta1 = 0
-    eta2 = 1 + (0.05 - damping) / (0.08 + 1.6 * damping)
-    if eta2 < 0.55: eta2 = 0.55
-    
-    periods = np.linspace(0.01, 6.0, 600)
-    alpha = np.zeros_like(periods)
-    
-    for i, T in enumerate(periods):
-        if T < 0.1:
-            alpha[i] = (0.45 * alpha_max) + (eta2 - 0.45) * alpha_max * (T / 0.1)
-        elif T < Tg:
-            alpha[i] = eta2 * alpha_max
-        elif T < 5 * Tg:
-            alpha[i] = eta2 * alpha_max * (Tg / T) ** gamma
-        else:
-            alpha[i] = (eta2 * 0.2 ** gamma - eta1 * (T - 5 * Tg)) * alpha_max
-    return periods, alpha
-
-def get_Fa_Fv(Ss, S1, site_class):
-    Fa_table = {
-        'A': {0.25: 0.8, 0.5: 0.8, 0.75: 0.8, 1.0: 0.8, 1.25: 0.8, 1.50: 0.8},
-        'B': {0.25: 0.9, 0.5: 0.9, 0.75: 0.9, 1.0: 0.9, 1.25: 0.9, 1.50: 0.9},
-        'C': {0.25: 1.3, 0.5: 1.3, 0.75: 1.2, 1.0: 1.2, 1.25: 1.2, 1.50: 1.2},
-        'D': {0.25: 1.6, 0.5: 1.4, 0.75: 1.2, 1.0: 1.1, 1.25: 1.0, 1.50: 1.0}
-    }
-    Fv_table = {
-        'A': {0.1: 0.8, 0.2: 0.8, 0.3: 0.8, 0.4: 0.8, 0.5: 0.8, 0.6: 0.8},
-        'B': {0.1: 0.8, 0.2: 0.8, 0.3: 0.8, 0.4: 0.8, 0.5: 0.8, 0.6: 0.8},
-        'C': {0.1: 1.5, 0.2: 1.5, 0.3: 1.5, 0.4: 1.5, 0.5: 1.5, 0.6: 1.4},
-        'D': {0.1: 2.4, 0.2: 2.2, 0.3: 2.0, 0.4: 1.9, 0.5: 1.8, 0.6: 1.7}
-    }
-    def interpolate_value(table, value):
-        keys = sorted(table.keys())
-        if value <= keys[0]: return table[keys[0]]
-        elif value >= keys[-1]: return table[keys[-1]]
-        else:
-            for i in range(len(keys) - 1):
-                if keys[i] <= value < keys[i + 1]:
-                    x1, y1 = keys[i], table[keys[i]]
-                    x2, y2 = keys[i + 1], table[keys[i + 1]]
-                    return y1 + (y2 - y1) * (value - x1) / (x2 - x1)
-    Fa = interpolate_value(Fa_table[site_class], Ss)
-    Fv = interpolate_value(Fv_table[site_class], S1)
-    return Fa, Fv
-
-def calculate_us_spectrum(Ss, S1, site_class, TL, R, damping=0.05):
-    Fa, Fv = get_Fa_Fv(Ss, S1, site_class)
-    SMS = Fa * Ss
-    SM1 = Fv * S1
-    SDS = (2/3) * SMS
-    SD1 = (2/3) * SM1
-    T0 = 0.2 * (SD1 / SDS) if SDS != 0 else 0
-    Ts = SD1 / SDS if SDS != 0 else 0
-    periods = np.linspace(0.01, 6.0, 600)
-    Sa = np.zeros_like(periods)
-
-    # 周期调整系数
-    if damping <= 0.02:
-        B = 0.8
-    elif damping <= 0.05:
-        B = 0.8 + 0.2 * (damping - 0.02) / 0.03
-    elif damping <= 0.10:
-        B = 1.0 + 0.2 * (damping - 0.05) / 0.05
-    elif damping <= 0.20:
-        B = 1.2 + 0.3 * (damping - 0.10) / 0.10
-    else:
-        B = 1.5
-
-    for i, T in enumerate(periods):
-        if T < T0: sa = SDS * (0.4 + 0.6 * T / T0)
-        elif T0 <= T < Ts: sa = SDS
-        elif Ts <= T < TL: sa = SD1 / T
-        else: sa = SD1 * TL / (T**2)
-        Sa[i] = sa / R / B
-
-
-    return periods, Sa, SDS, SD1, Fa, Fv
-
-
-def convert_wind_speed_to_chinese(wind_speed, input_unit, input_height, input_time, return_period):
-    """
-    将ASCE7风速转换为中国GB50009基本风压
-    
-    参数:
-        wind_speed: 输入风速值
-        input_unit: 输入单位 ('mph' 或 'm/s')
-        input_height: 测量高度
-        input_time: 测量时距 ('3s', '10s', '60s', '10min', '1h')
-        return_period: 重现期 ('300y', '700y', '1700y', '3000y')
-    
-    返回:
-        dict: 包含转换结果和详细过程的字典
-    """
-    process = []
-    
-    # 1. 单位转换：mph -> m/s
-    if input_unit == 'mph':
-        wind_speed_ms = wind_speed * 0.44704
-        process.append(f"单位转换: {wind_speed:.2f} mph = {wind_speed_ms:.2f} m/s")
-    else:
-        wind_speed_ms = wind_speed
-        process.append(f"风速: {wind_speed_ms:.2f} m/s")
-    
-    # 2. 重现期转换系数
-    return_period_factors = {
-        '300y': 1.179,
-        '700y': 1.264,
-        '1700y': 1.352,
-        '3000y': 1.409
-    }
-    rp_factor = return_period_factors.get(return_period, 1.26)
-    v_50 = wind_speed_ms / rp_factor
-    process.append(f"重现期转换 ({return_period} -> 50y): {wind_speed_ms:.2f} / {rp_factor:.2f} = {v_50:.2f} m/s")
-    
-    # 3. 时距转换系数（基于Durst曲线）
-    time_factors = {
-        '3s': 1.52,
-        '10s': 1.43,
-        '60s': 1.27,
-        '10min': 1.06,
-        '1h': 1.00
-    }
-    # 计算到1小时平均风速
-    v_1h = v_50 / time_factors.get(input_time, 1.52)
-    # 转换到10分钟平均风速
-    v_10min = v_1h * time_factors['10min']
-    process.append(f"时距转换 ({input_time} -> 10min): {v_50:.2f} / {time_factors.get(input_time, 1.52):.2f} * 1.06 = {v_10min:.2f} m/s")
-    
-    # 4. 高度转换到10m（使用幂律公式，假设Exposure C/B类地貌）
-    # 幂律指数：B类约0.16，C类约0.14
-    alpha = 0.15  # 取中间值
-    if input_height != 10:
-        v_10m = v_10min * (10 / input_height) ** alpha
-        process.append(f"高度转换 ({input_height}m -> 10m): {v_10min:.2f} * (10/{input_height})^{alpha:.2f} = {v_10m:.2f} m/s")
-    else:
-        v_10m = v_10min
-        process.append(f"高度已是10m，无需转换: {v_10m:.2f} m/s")
-    
-    # 5. 计算基本风压（中国规范）
-    # w0 = 0.5 * rho * v^2
-    rho = 1.25  # 空气密度 kg/m³
-    w0 = 0.5 * rho * v_10m ** 2 / 1000  # 转换为kN/m²
-    process.append(f"基本风压计算: w0 = 0.5 * {rho} * {v_10m:.2f}² / 1000 = {w0:.3f} kN/m²")
-    
-    return {
-        'wind_speed_50y_10m_10min': v_10m,
-        'basic_wind_pressure': w0,
-        'process': process
-    }
+# 绘图样式与中文字体只在导入时设置一次（bmh 样式，比默认好看）
+matplotlib.style.use('bmh')
+matplotlib.rcParams['font.sans-serif'] = ['SimHei', 'Microsoft YaHei', 'Arial Unicode MS']
+matplotlib.rcParams['axes.unicode_minus'] = False
+
+# 绘图用自适应周期网格的插值精度（包含全部规范拐点，点数远少于 600 个等距点）
+PLOT_TOLERANCE = 1e-4
 
 
+def _with_neighbours(values, current):
+    """离散分布：当前类别权重 0.5，列表中相邻的类别均分其余权重（无相邻类别时只取当前类别）"""
+    i = values.index(current)
+    neighbours = [values[j] for j in (i - 1, i + 1) if 0 <= j < len(values)]
+    if not neighbours:
+        return {current: 1.0}
+    return dict({current: 0.5}, **{v: 0.5 / len(neighbours) for v in neighbours})
+
 # ==========================================
 # 2. 自定义Matplotlib控件
 # ==========================================
 class MplCanvas(FigureCanvasQTAgg):
     def __init__(self, parent=None, width=5, height=4, dpi=100):
-        # 使用更美观的样式
-        plt.style.use('bmh') # 使用 bmh 样式，比默认好看
         self.fig = Figure(figsize=(width, height), dpi=dpi)
         self.ax = self.fig.add_subplot(111)
         # 调整背景色与Fluent UI融合
         self.fig.patch.set_facecolor('#f9f9f9') 
         self.ax.set_facecolor('#ffffff')
         super().__init__(self.fig)
+        
+        # 动态图元（animated=True）不参与整图绘制，由缓存背景 + blit 快速刷新
+        self.animated_artists = []
+        self._background = None
+        self.mpl_connect('draw_event', self._on_draw)
+
+    def add_animated(self, artist):
+        artist.set_animated(True)
+        self.animated_artists.append(artist)
+        return artist
+
+    def _on_draw(self, event):
+        # 每次整图绘制（含窗口缩放）后重新缓存不含动态图元的背景
+        self._background = self.copy_from_bbox(self.fig.bbox)
+        self._draw_animated()
+
+    def _draw_animated(self):
+        for artist in self.animated_artists:
+            self.fig.draw_artist(artist)
+
+    def blit_update(self):
+        """只重绘动态图元；背景尚未缓存时退回整图绘制"""
+        if self._background is None:
+            self.draw()
+            return
+        self.restore_region(self._background)
+        self._draw_animated()
+        self.blit(self.ax.bbox)
 
 
 # ==========================================
@@ -227,6 +117,29 @@ class SpectrumInterface(QWidget):
         # 【关键修复】设置对象名称，addSubInterface 需要它
         self.setObjectName("SpectrumInterface")
         
+        # 中美两侧分别缓存，记录上次输入以便只重算变化的一侧
+        self.china_cache = SpectrumCache()
+        self.us_cache = SpectrumCache()
+        self._china_key = None
+        self._us_key = None
+        self._china_result = None
+        self._us_result = None
+        self._family_key = None
+        self._family_max = 0.0
+        
+        # 同一事件循环内多个控件同时变化时只刷新一次
+        self._update_timer = QTimer(self)
+        self._update_timer.setSingleShot(True)
+        self._update_timer.setInterval(0)
+        self._update_timer.timeout.connect(self.update_chart)
+        
+        # 耗时计算（人工波等）在线程池中执行；_wave_key 记录当前人工波对应的目标谱输入
+        self.runner = JobRunner(self)
+        self._wave_key = None
+        # 蒙特卡洛包络对应的 (中国, 美国) 输入，及其 84% 分位数的最大值（参与纵轴范围）
+        self._envelope_key = None
+        self._envelope_max = 0.0
+        
         # 主布局：左侧设置，右侧图表
         self.h_layout = QHBoxLayout(self)
         
@@ -240,6 +153,10 @@ class SpectrumInterface(QWidget):
         self.init_china_settings()
         self.setting_layout.addSpacing(10)
         self.init_us_settings()
+        self.setting_layout.addSpacing(10)
+        self.init_wave_settings()
+        self.setting_layout.addSpacing(10)
+        self.init_envelope_settings()
         self.setting_layout.addStretch(1) # 底部填充
         
         self.scroll_area.setWidget(self.setting_widget)
@@ -251,13 +168,70 @@ class SpectrumInterface(QWidget):
         self.canvas_layout = QVBoxLayout(self.canvas_widget)
         self.canvas = MplCanvas(self, width=8, height=6, dpi=100)
         self.canvas_layout.addWidget(self.canvas)
+        self.init_chart()
+        
+        # 计时开启时在图表下方显示各阶段耗时
+        self.lbl_latency = BodyLabel("")
+        self.lbl_latency.setVisible(perf_trace.is_enabled())
+        self.canvas_layout.addWidget(self.lbl_latency)
+        perf_trace.add_listener(self.show_latency)
         
         # 添加布局
         self.h_layout.addWidget(self.scroll_area)
         self.h_layout.addWidget(self.canvas_widget)
         
-        # 初始化图表
-        self.update_chart()
+        # 首次计算与绘图推迟到界面显示之后，窗口先出现
+        self._first_shown = False
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if not self._first_shown:
+            self._first_shown = True
+            self.schedule_update()
+
+    def init_chart(self):
+        # 坐标轴、图例等静态元素只创建一次，曲线作为动态图元通过 set_data 更新
+        ax = self.canvas.ax
+        self.china_line, = ax.plot([], [], label='China GB50011-2010', linewidth=2, color='#009faa')
+        self.us_line, = ax.plot([], [], label='US ASCE7-16', linewidth=2, color='#ff6b00')
+        # 人工波平均反应谱，生成完成前不进入图例
+        self.wave_line, = ax.plot([], [], label='_wave', linewidth=1.5, linestyle='--', color='#5b5b5b')
+        self.canvas.add_animated(self.china_line)
+        self.canvas.add_animated(self.us_line)
+        self.canvas.add_animated(self.wave_line)
+        
+        # 阻尼比族：每国规范一个 LineCollection，整族曲线作为一个图元绘制
+        self.china_family = LineCollection([], linewidths=1, linestyles='--', label='_china_family')
+        self.us_family = LineCollection([], linewidths=1, linestyles='--', label='_us_family')
+        for family in (self.china_family, self.us_family):
+            ax.add_collection(family, autolim=False)
+            self.canvas.add_animated(family)
+        
+        # 蒙特卡洛包络：16%~84% 分位数带与中位数曲线，计算完成前不进入图例
+        self.china_band = PolyCollection([], facecolors='#009faa', alpha=0.15, label='_china_band')
+        self.us_band = PolyCollection([], facecolors='#ff6b00', alpha=0.15, label='_us_band')
+        for band in (self.china_band, self.us_band):
+            ax.add_collection(band, autolim=False)
+            self.canvas.add_animated(band)
+        self.china_median_line, = ax.plot([], [], label='_china_median', linewidth=1.5, linestyle=':', color='#009faa')
+        self.us_median_line, = ax.plot([], [], label='_us_median', linewidth=1.5, linestyle=':', color='#ff6b00')
+        self.canvas.add_animated(self.china_median_line)
+        self.canvas.add_animated(self.us_median_line)
+        
+        ax.set_title("Response Spectrum Comparison", fontsize=12)
+        ax.set_xlabel("Period T (s)")
+        ax.set_ylabel("Spectral Acceleration (g)")
+        self.legend = ax.legend()
+        ax.grid(True, linestyle='--', alpha=0.6)
+        ax.set_xlim(0, 6)
+        ax.set_ylim(0, 1)
+
+    def schedule_update(self):
+        self._update_timer.start()
+
+    def show_latency(self, name, total, phases):
+        if name == 'update_chart':
+            self.lbl_latency.setText(perf_trace.format_phases(name, total, phases))
 
     def add_section_title(self, text):
         label = SubtitleLabel(text, self)
@@ -280,11 +254,32 @@ class SpectrumInterface(QWidget):
         self.damp_spin.setRange(0.01, 0.99)
         self.damp_spin.setSingleStep(0.01)
         self.damp_spin.setValue(0.05)
-        self.damp_spin.valueChanged.connect(self.update_chart)
+        self.damp_spin.valueChanged.connect(self.schedule_update)
         layout.addWidget(self.damp_spin)
         
+        # 阻尼比族：逗号分隔的多个阻尼比，两国规范各自一次批量计算、作为一组曲线绘制
+        self.family_cb = CheckBox("阻尼比族:")
+        self.family_cb.stateChanged.connect(self.schedule_update)
+        layout.addWidget(self.family_cb)
+        self.family_edit = LineEdit()
+        self.family_edit.setText("0.02, 0.05, 0.10, 0.20, 0.30")
+        self.family_edit.editingFinished.connect(self.schedule_update)
+        layout.addWidget(self.family_edit)
+        
         self.setting_layout.addWidget(card)
 
+    def family_dampings(self):
+        # 解析阻尼比族输入，忽略无法解析或超出 (0, 1) 的值
+        values = []
+        for item in self.family_edit.text().replace('，', ',').split(','):
+            try:
+                value = float(item)
+            except ValueError:
+                continue
+            if 0 < value < 1:
+                values.append(round(value, 4))
+        return tuple(sorted(set(values)))
+
     def init_china_settings(self):
         self.add_section_title("中国规范 (GB50011-2010)")
         
@@ -297,9 +292,9 @@ class SpectrumInterface(QWidget):
         row1 = QHBoxLayout()
         row1.addWidget(BodyLabel("设防烈度:"))
         self.china_intensity_cb = ComboBox()
-        self.china_intensity_cb.addItems(["6度(0.05g)", "7度(0.10g)", "7度(0.15g)", "8度(0.20g)", "8度(0.30g)", "9度(0.40g)"])
+        self.china_intensity_cb.addItems(INTENSITIES)
         self.china_intensity_cb.setCurrentText("7度(0.10g)")
-        self.china_intensity_cb.currentTextChanged.connect(self.update_chart)
+        self.china_intensity_cb.currentTextChanged.connect(self.schedule_update)
         row1.addWidget(self.china_intensity_cb)
         v_layout.addLayout(row1)
         
@@ -307,17 +302,17 @@ class SpectrumInterface(QWidget):
         row2 = QHBoxLayout()
         row2.addWidget(BodyLabel("场地类别:"))
         self.china_site_cb = ComboBox()
-        self.china_site_cb.addItems(["I0", "I1", "II", "III", "IV"])
+        self.china_site_cb.addItems(SITE_CATEGORIES)
         self.china_site_cb.setCurrentText("II")
-        self.china_site_cb.currentTextChanged.connect(self.update_chart)
+        self.china_site_cb.currentTextChanged.connect(self.schedule_update)
         row2.addWidget(self.china_site_cb)
         v_layout.addLayout(row2)
         
         row3 = QHBoxLayout()
         row3.addWidget(BodyLabel("地震分组:"))
         self.china_group_cb = ComboBox()
-        self.china_group_cb.addItems(["第一组", "第二组", "第三组"])
-        self.china_group_cb.currentTextChanged.connect(self.update_chart)
+        self.china_group_cb.addItems(EARTHQUAKE_GROUPS)
+        self.china_group_cb.currentTextChanged.connect(self.schedule_update)
         row3.addWidget(self.china_group_cb)
         v_layout.addLayout(row3)
         
@@ -336,8 +331,60 @@ class SpectrumInterface(QWidget):
         res_layout.addWidget(self.lbl_tg)
         v_layout.addLayout(res_layout)
         
+        # 4. 反向匹配：按当前美国规范谱选取最接近的烈度、场地类别与分组
+        match_layout = QHBoxLayout()
+        self.match_btn = PushButton("匹配美国规范谱")
+        self.match_btn.clicked.connect(self.match_us)
+        match_layout.addWidget(self.match_btn)
+        self.lbl_match = BodyLabel("")
+        match_layout.addWidget(self.lbl_match)
+        match_layout.addStretch()
+        v_layout.addLayout(match_layout)
+        
         self.setting_layout.addWidget(card)
 
+    def update_families(self, dampings, alpha_max, tg, ss, s1, us_site, tl, r):
+        # 全部阻尼比一次批量计算，周期网格与主曲线相同（拐点不随阻尼比变化）
+        # 返回图例是否重建：仅此时需要整图重绘，否则族曲线作为动态图元 blit 即可
+        self._family_max = 0.0
+        if not dampings:
+            self.china_family.set_segments([])
+            self.us_family.set_segments([])
+            labels = ('_china_family', '_us_family')
+        else:
+            c_periods, c_alpha = calculate_chinese_spectrum_batch(
+                alpha_max, tg, dampings, periods=chinese_period_grid(tg, tol=PLOT_TOLERANCE))
+            us_periods, us_sa = calculate_us_spectrum_batch(
+                ss, s1, us_site, tl, r, dampings, periods=us_period_grid(ss, s1, us_site, tl, tol=PLOT_TOLERANCE))[:2]
+            shades = np.linspace(0.35, 0.9, len(dampings))
+            self.china_family.set_segments([np.column_stack([c_periods, row]) for row in c_alpha])
+            self.china_family.set_color(matplotlib.colormaps['GnBu'](shades))
+            self.us_family.set_segments([np.column_stack([us_periods, row]) for row in us_sa])
+            self.us_family.set_color(matplotlib.colormaps['Oranges'](shades))
+            self._family_max = max(np.nanmax(c_alpha), np.nanmax(us_sa))
+            span = f"ζ={dampings[0]:g}~{dampings[-1]:g}" if len(dampings) > 1 else f"ζ={dampings[0]:g}"
+            labels = (f'China family ({span})', f'US family ({span})')
+        if (self.china_family.get_label(), self.us_family.get_label()) != labels:
+            self.china_family.set_label(labels[0])
+            self.us_family.set_label(labels[1])
+            self.legend = self.canvas.ax.legend()
+            return True
+        return False
+
+    def match_us(self):
+        from spectrum_match import match_us_spectrum
+        try:
+            res = match_us_spectrum(self.us_ss_spin.value(), self.us_s1_spin.value(), self.us_site_cb.currentText(),
+                                    self.us_tl_spin.value(), self.us_r_spin.value(), self.damp_spin.value())
+        except Exception:
+            logger.exception("Spectrum matching error")
+            return
+        # 三个下拉框的变化在同一事件循环内合并为一次刷新
+        self.china_intensity_cb.setCurrentText(res['intensity'])
+        self.china_site_cb.setCurrentText(res['site_category'])
+        self.china_group_cb.setCurrentText(res['group'])
+        self.lbl_match.setText(f"相对误差 {res['error']:.1%}")
+
     def init_us_settings(self):
         self.add_section_title("美国规范 (ASCE 7-16)")
         
@@ -351,13 +398,13 @@ class SpectrumInterface(QWidget):
         r1.addWidget(BodyLabel("Ss (g):"))
         self.us_ss_spin = DoubleSpinBox()
         self.us_ss_spin.setValue(0.51)
-        self.us_ss_spin.valueChanged.connect(self.update_chart)
+        self.us_ss_spin.valueChanged.connect(self.schedule_update)
         r1.addWidget(self.us_ss_spin)
         
         r1.addWidget(BodyLabel("S1 (g):"))
         self.us_s1_spin = DoubleSpinBox()
         self.us_s1_spin.setValue(0.18)
-        self.us_s1_spin.valueChanged.connect(self.update_chart)
+        self.us_s1_spin.valueChanged.connect(self.schedule_update)
         r1.addWidget(self.us_s1_spin)
         v_layout.addLayout(r1)
         
@@ -365,9 +412,9 @@ class SpectrumInterface(QWidget):
         r2 = QHBoxLayout()
         r2.addWidget(BodyLabel("Site Class:"))
         self.us_site_cb = ComboBox()
-        self.us_site_cb.addItems(['A', 'B', 'C', 'D'])
+        self.us_site_cb.addItems(US_SITE_CLASSES)
         self.us_site_cb.setCurrentText('D')
-        self.us_site_cb.currentTextChanged.connect(self.update_chart)
+        self.us_site_cb.currentTextChanged.connect(self.schedule_update)
         r2.addWidget(self.us_site_cb)
         v_layout.addLayout(r2)
         
@@ -376,13 +423,13 @@ class SpectrumInterface(QWidget):
         r3.addWidget(BodyLabel("TL (s):"))
         self.us_tl_spin = DoubleSpinBox()
         self.us_tl_spin.setValue(24.0)
-        self.us_tl_spin.valueChanged.connect(self.update_chart)
+        self.us_tl_spin.valueChanged.connect(self.schedule_update)
         r3.addWidget(self.us_tl_spin)
         
         r3.addWidget(BodyLabel("R:"))
         self.us_r_spin = DoubleSpinBox()
         self.us_r_spin.setValue(5.0)
-        self.us_r_spin.valueChanged.connect(self.update_chart)
+        self.us_r_spin.valueChanged.connect(self.schedule_update)
         r3.addWidget(self.us_r_spin)
         v_layout.addLayout(r3)
         
@@ -398,7 +445,236 @@ class SpectrumInterface(QWidget):
         
         self.setting_layout.addWidget(card)
 
+    def init_wave_settings(self):
+        self.add_section_title("人工地震波")
+        
+        card = CardWidget(self)
+        v_layout = QVBoxLayout(card)
+        v_layout.setContentsMargins(16, 16, 16, 16)
+        v_layout.setSpacing(15)
+        
+        r1 = QHBoxLayout()
+        r1.addWidget(BodyLabel("目标谱:"))
+        self.wave_target_cb = ComboBox()
+        self.wave_target_cb.addItems(["中国规范", "美国规范"])
+        r1.addWidget(self.wave_target_cb)
+        r1.addWidget(BodyLabel("波数:"))
+        self.wave_count_spin = SpinBox()
+        self.wave_count_spin.setRange(1, 100)
+        self.wave_count_spin.setValue(7)
+        r1.addWidget(self.wave_count_spin)
+        r1.addWidget(BodyLabel("迭代次数:"))
+        self.wave_iter_spin = SpinBox()
+        self.wave_iter_spin.setRange(1, 50)
+        self.wave_iter_spin.setValue(5)
+        r1.addWidget(self.wave_iter_spin)
+        v_layout.addLayout(r1)
+        
+        r2 = QHBoxLayout()
+        self.wave_start_btn = PrimaryPushButton("生成")
+        self.wave_start_btn.clicked.connect(self.start_waves)
+        r2.addWidget(self.wave_start_btn)
+        self.wave_cancel_btn = PushButton("取消")
+        self.wave_cancel_btn.clicked.connect(lambda: self.drop_waves("已取消"))
+        r2.addWidget(self.wave_cancel_btn)
+        v_layout.addLayout(r2)
+        
+        self.wave_progress = ProgressBar()
+        self.wave_progress.setRange(0, 100)
+        self.wave_progress.setValue(0)
+        v_layout.addWidget(self.wave_progress)
+        self.lbl_wave_status = BodyLabel("-")
+        v_layout.addWidget(self.lbl_wave_status)
+        
+        self.setting_layout.addWidget(card)
+
+    def start_waves(self):
+        from artificial_wave import (
+            default_target_periods, chinese_target_spectrum, us_target_spectrum, generate_artificial_waves
+        )
+        damp = self.damp_spin.value()
+        periods = default_target_periods()
+        if self.wave_target_cb.currentText() == "中国规范":
+            _, target = chinese_target_spectrum(self.china_intensity_cb.currentText(), self.china_site_cb.currentText(),
+                                                self.china_group_cb.currentText(), damp, periods)
+            self._wave_key = ('china', self._china_key)
+        else:
+            _, target = us_target_spectrum(self.us_ss_spin.value(), self.us_s1_spin.value(),
+                                           self.us_site_cb.currentText(), self.us_tl_spin.value(),
+                                           self.us_r_spin.value(), damp, periods)
+            self._wave_key = ('us', self._us_key)
+        
+        self.wave_progress.setValue(0)
+        self.lbl_wave_status.setText("生成中...")
+        self.runner.submit('waves', generate_artificial_waves, periods, target,
+                           n_waves=self.wave_count_spin.value(), n_iterations=self.wave_iter_spin.value(),
+                           damping=damp, on_result=self.show_waves, on_progress=self.show_wave_progress,
+                           on_error=self.show_wave_error)
+
+    def show_wave_progress(self, done, total):
+        self.wave_progress.setValue(int(100 * done / total))
+        self.lbl_wave_status.setText(f"生成中... {done}/{total}")
+
+    def show_wave_error(self, message):
+        logger.error("Artificial wave generation failed:\n%s", message)
+        self._wave_key = None
+        self.lbl_wave_status.setText("生成失败: " + message.strip().splitlines()[-1])
+
+    def show_waves(self, result):
+        n = len(result['waves'])
+        self.wave_progress.setValue(100)
+        self.lbl_wave_status.setText(f"完成：{n} 条波，峰值加速度最大 {abs(result['waves']).max():.3f} g")
+        self.wave_line.set_data(result['target_periods'], result['mean_spectrum'])
+        self.wave_line.set_label(f'Artificial waves mean (n={n})')
+        self.legend = self.canvas.ax.legend()
+        self.canvas.draw()
+
+    def drop_waves(self, status):
+        # 取消未完成的任务，并移除与当前输入不再对应的人工波曲线
+        self.runner.cancel('waves')
+        self._wave_key = None
+        self.wave_progress.setValue(0)
+        self.lbl_wave_status.setText(status)
+        if len(self.wave_line.get_xdata()):
+            self.wave_line.set_data([], [])
+            self.wave_line.set_label('_wave')
+            self.legend = self.canvas.ax.legend()
+            self.canvas.draw()
+
+    def init_envelope_settings(self):
+        self.add_section_title("不确定性包络 (蒙特卡洛)")
+        
+        card = CardWidget(self)
+        v_layout = QVBoxLayout(card)
+        v_layout.setContentsMargins(16, 16, 16, 16)
+        v_layout.setSpacing(15)
+        
+        # 以当前参数为中心：Ss、S1 取对数正态分布，阻尼比取均匀分布，场地类别可混入相邻类别
+        r1 = QHBoxLayout()
+        r1.addWidget(BodyLabel("样本数:"))
+        self.mc_count_spin = SpinBox()
+        self.mc_count_spin.setRange(1000, 1000000)
+        self.mc_count_spin.setSingleStep(10000)
+        self.mc_count_spin.setValue(20000)
+        r1.addWidget(self.mc_count_spin)
+        r1.addWidget(BodyLabel("Ss/S1 对数标准差:"))
+        self.mc_beta_spin = DoubleSpinBox()
+        self.mc_beta_spin.setRange(0.0, 1.0)
+        self.mc_beta_spin.setSingleStep(0.05)
+        self.mc_beta_spin.setValue(0.3)
+        r1.addWidget(self.mc_beta_spin)
+        r1.addWidget(BodyLabel("阻尼比 ±:"))
+        self.mc_damp_spin = DoubleSpinBox()
+        self.mc_damp_spin.setRange(0.0, 0.05)
+        self.mc_damp_spin.setSingleStep(0.005)
+        self.mc_damp_spin.setDecimals(3)
+        self.mc_damp_spin.setValue(0.01)
+        r1.addWidget(self.mc_damp_spin)
+        v_layout.addLayout(r1)
+        
+        self.mc_site_cb = CheckBox("场地类别混入相邻类别（当前 50%，相邻类别均分其余）")
+        self.mc_site_cb.setChecked(True)
+        v_layout.addWidget(self.mc_site_cb)
+        
+        r2 = QHBoxLayout()
+        self.mc_start_btn = PrimaryPushButton("计算包络")
+        self.mc_start_btn.clicked.connect(self.start_envelopes)
+        r2.addWidget(self.mc_start_btn)
+        self.mc_cancel_btn = PushButton("取消")
+        self.mc_cancel_btn.clicked.connect(lambda: self.drop_envelopes("已取消"))
+        r2.addWidget(self.mc_cancel_btn)
+        v_layout.addLayout(r2)
+        
+        self.mc_progress = ProgressBar()
+        self.mc_progress.setRange(0, 100)
+        self.mc_progress.setValue(0)
+        v_layout.addWidget(self.mc_progress)
+        self.lbl_mc_status = BodyLabel("-")
+        v_layout.addWidget(self.lbl_mc_status)
+        
+        self.setting_layout.addWidget(card)
+
+    def envelope_distributions(self):
+        damp = self.damp_spin.value()
+        spread = self.mc_damp_spin.value()
+        beta = self.mc_beta_spin.value()
+        dists = {
+            'damping': ('uniform', max(0.01, damp - spread), damp + spread) if spread > 0 else damp,
+            'intensity': self.china_intensity_cb.currentText(),
+            'site_category': self.china_site_cb.currentText(),
+            'group': self.china_group_cb.currentText(),
+            'Ss': ('lognormal', self.us_ss_spin.value(), beta),
+            'S1': ('lognormal', self.us_s1_spin.value(), beta),
+            'site_class': self.us_site_cb.currentText(),
+            'TL': self.us_tl_spin.value(),
+            'R': self.us_r_spin.value(),
+        }
+        if self.mc_site_cb.isChecked():
+            dists['site_category'] = _with_neighbours(SITE_CATEGORIES, dists['site_category'])
+            dists['site_class'] = _with_neighbours(US_SITE_CLASSES, dists['site_class'])
+        return dists
+
+    def start_envelopes(self):
+        from spectrum_uncertainty import monte_carlo_envelopes
+        self._envelope_key = (self._china_key, self._us_key)
+        self.mc_progress.setValue(0)
+        self.lbl_mc_status.setText("计算中...")
+        self.runner.submit('envelopes', monte_carlo_envelopes, self.mc_count_spin.value(),
+                           self.envelope_distributions(), on_result=self.show_envelopes,
+                           on_progress=self.show_envelope_progress, on_error=self.show_envelope_error)
+
+    def show_envelope_progress(self, done, total):
+        self.mc_progress.setValue(int(100 * done / total))
+        self.lbl_mc_status.setText(f"计算中... {done}/{total}")
+
+    def show_envelope_error(self, message):
+        logger.error("Monte Carlo envelope failed:\n%s", message)
+        self._envelope_key = None
+        self.lbl_mc_status.setText("计算失败: " + message.strip().splitlines()[-1])
+
+    def show_envelopes(self, result):
+        periods = result['periods']
+        for band, line, values, name in ((self.china_band, self.china_median_line, result['china'], 'China'),
+                                         (self.us_band, self.us_median_line, result['us'], 'US')):
+            lo, median, hi = values
+            ok = np.isfinite(lo) & np.isfinite(hi)
+            band.set_verts([np.column_stack([np.concatenate([periods[ok], periods[ok][::-1]]),
+                                             np.concatenate([lo[ok], hi[ok][::-1]])])])
+            band.set_label(f'{name} 16%~84%')
+            line.set_data(periods, median)
+            line.set_label(f'{name} median (MC)')
+        self._envelope_max = float(np.nanmax([np.nanmax(result['china'][2]), np.nanmax(result['us'][2])]))
+        
+        self.mc_progress.setValue(100)
+        status = f"完成：{result['n_samples']} 个样本"
+        if result['us_invalid']:
+            status += f"，其中 {result['us_invalid']} 个美国规范样本需场地反应分析（不计入）"
+        self.lbl_mc_status.setText(status)
+        top = self.canvas.ax.get_ylim()[1]
+        if self._envelope_max > top / 1.05:
+            self.canvas.ax.set_ylim(0, self._envelope_max * 1.25)
+        self.legend = self.canvas.ax.legend()
+        self.canvas.draw()
+
+    def drop_envelopes(self, status):
+        # 取消未完成的任务，并移除与当前输入不再对应的包络
+        self.runner.cancel('envelopes')
+        self._envelope_key = None
+        self._envelope_max = 0.0
+        self.mc_progress.setValue(0)
+        self.lbl_mc_status.setText(status)
+        if len(self.china_median_line.get_xdata()):
+            for band, line, name in ((self.china_band, self.china_median_line, 'china'),
+                                     (self.us_band, self.us_median_line, 'us')):
+                band.set_verts([])
+                band.set_label(f'_{name}_band')
+                line.set_data([], [])
+                line.set_label(f'_{name}_median')
+            self.legend = self.canvas.ax.legend()
+            self.canvas.draw()
+
     def update_chart(self):
+        trace = perf_trace.start('update_chart')
         try:
             # 1. 获取所有参数
             damp = self.damp_spin.value()
@@ -414,42 +690,96 @@ class SpectrumInterface(QWidget):
             tl = self.us_tl_spin.value()
             r = self.us_r_spin.value()
             us_site = self.us_site_cb.currentText()
+            trace.mark('params')
             
-            # 2. 计算中国
+            # 2. 计算中国（输入未变化时沿用上次结果）
             alpha_max = get_alpha_max(intensity)
             tg = get_Tg(site_cat, group)
-            c_periods, c_alpha = calculate_chinese_spectrum(alpha_max, tg, damp)
-            
-            # 更新中国标签
-            self.lbl_alpha.setText(f"Alpha Max: {alpha_max:.2f}")
-            self.lbl_tg.setText(f"Tg: {tg:.2f}s")
+            china_key = self.china_cache.make_key(alpha_max, tg, damp)
+            china_changed = china_key != self._china_key
+            if china_changed:
+                self._china_result = self.china_cache.get_or_compute(
+                    china_key, lambda: calculate_chinese_spectrum(
+                        alpha_max, tg, damp, periods=chinese_period_grid(tg, tol=PLOT_TOLERANCE)))
+                self._china_key = china_key
+                trace.mark('china')
+                
+                # 更新中国标签
+                self.lbl_alpha.setText(f"Alpha Max: {alpha_max:.2f}")
+                self.lbl_tg.setText(f"Tg: {tg:.2f}s")
+                trace.mark('labels')
+            c_periods, c_alpha = self._china_result
             
             # 3. 计算美国
-            us_periods, us_sa, sds, sd1, fa, fv = calculate_us_spectrum(ss, s1, us_site, tl, r, damp)
+            us_key = self.us_cache.make_key(ss, s1, us_site, tl, r, damp)
+            us_changed = us_key != self._us_key
+            if us_changed:
+                self._us_result = self.us_cache.get_or_compute(
+                    us_key, lambda: calculate_us_spectrum(
+                        ss, s1, us_site, tl, r, damp, periods=us_period_grid(ss, s1, us_site, tl, tol=PLOT_TOLERANCE)))
+                self._us_key = us_key
+                trace.mark('us')
+                
+                # 更新美国标签
+                _, _, sds, sd1, fa, fv = self._us_result
+                self.lbl_us_res1.setText(f"Fa: {fa:.2f}   Fv: {fv:.2f}")
+                self.lbl_us_res2.setText(f"SDS: {sds:.3f}g   SD1: {sd1:.3f}g")
+                trace.mark('labels')
+            us_periods, us_sa = self._us_result[:2]
             
-            # 更新美国标签
-            self.lbl_us_res1.setText(f"Fa: {fa:.2f}   Fv: {fv:.2f}")
-            self.lbl_us_res2.setText(f"SDS: {sds:.3f}g   SD1: {sd1:.3f}g")
+            # 阻尼比族（只依赖谱参数与阻尼比列表，与主曲线的阻尼比无关）
+            # 关闭时键为空元组，中美参数变化不再触发族曲线重算
+            dampings = self.family_dampings() if self.family_cb.isChecked() else ()
+            family_key = (china_key[:2], us_key[:5], dampings) if dampings else ()
+            family_changed = family_key != self._family_key
+            legend_changed = False
+            if family_changed:
+                self._family_key = family_key
+                legend_changed = self.update_families(dampings, alpha_max, tg, ss, s1, us_site, tl, r)
+                trace.mark('family')
             
-            # 4. 绘图
-            self.canvas.ax.clear()
-            self.canvas.ax.plot(c_periods, c_alpha, label='China GB50011-2010', linewidth=2, color='#009faa')
-            self.canvas.ax.plot(us_periods, us_sa, label=f'US ASCE7-16 (R={r})', linewidth=2, color='#ff6b00')
+            # 目标谱输入已变化：丢弃正在生成或已显示的人工波
+            if self._wave_key is not None and self._wave_key not in (('china', china_key), ('us', us_key)):
+                self.drop_waves("参数已变化，请重新生成")
+            if self._envelope_key is not None and self._envelope_key != (china_key, us_key):
+                self.drop_envelopes("参数已变化，请重新计算")
             
-            self.canvas.ax.set_title("Response Spectrum Comparison", fontsize=12)
-            self.canvas.ax.set_xlabel("Period T (s)")
-            self.canvas.ax.set_ylabel("Spectral Acceleration (g)")
-            self.canvas.ax.legend()
-            self.canvas.ax.grid(True, linestyle='--', alpha=0.6)
-            self.canvas.ax.set_xlim(0, 6)
+            if not (china_changed or us_changed or family_changed):
+                return
             
-            max_val = max(np.max(c_alpha), np.max(us_sa))
-            self.canvas.ax.set_ylim(0, max_val * 1.1)
+            # 4. 绘图：只更新曲线数据，坐标范围或图例变化时才整图重绘
+            full_redraw = legend_changed
+            if china_changed:
+                self.china_line.set_data(c_periods, c_alpha)
+            if us_changed:
+                self.us_line.set_data(us_periods, us_sa)
+                us_label = f'US ASCE7-16 (R={r})'
+                if self.us_line.get_label() != us_label:
+                    self.us_line.set_label(us_label)
+                    self.legend = self.canvas.ax.legend()
+                    full_redraw = True
             
-            self.canvas.draw()
+            # 纵轴上限留有余量，拖动数值时不必每次都重设坐标范围
+            max_val = max(np.max(c_alpha), np.max(us_sa), self._family_max, self._envelope_max)
+            top = self.canvas.ax.get_ylim()[1]
+            if max_val > top / 1.05:
+                self.canvas.ax.set_ylim(0, max_val * 1.25)
+                full_redraw = True
+            elif max_val * 1.1 < 0.7 * top:
+                self.canvas.ax.set_ylim(0, max_val * 1.1)
+                full_redraw = True
+            trace.mark('plot')
             
-        except Exception as e:
-            print(f"Calculation Error: {e}")
+            if full_redraw:
+                self.canvas.draw()
+            else:
+                self.canvas.blit_update()
+            trace.mark('draw')
+            
+        except Exception:
+            logger.exception("Calculation Error")
+        finally:
+            trace.finish()
 
 
 class WindConversionInterface(QWidget):
@@ -471,6 +801,7 @@ class WindConversionInterface(QWidget):
         self.scroll_area.setWidget(self.setting_widget)
         self.scroll_area.setWidgetResizable(True)
         self.v_layout.addWidget(self.scroll_area)
+        perf_trace.add_listener(self.show_latency)
     
     def add_section_title(self, text):
         label = SubtitleLabel(text, self)
@@ -555,9 +886,19 @@ class WindConversionInterface(QWidget):
         self.wind_process_text.setFixedHeight(150)
         v_layout.addWidget(self.wind_process_text)
         
+        # 计时开启时显示各阶段耗时
+        self.lbl_latency = BodyLabel("")
+        self.lbl_latency.setVisible(perf_trace.is_enabled())
+        v_layout.addWidget(self.lbl_latency)
+        
         self.setting_layout.addWidget(card)
     
+    def show_latency(self, name, total, phases):
+        if name == 'convert_wind_speed':
+            self.lbl_latency.setText(perf_trace.format_phases(name, total, phases))
+    
     def convert_wind_speed(self):
+        trace = perf_trace.start('convert_wind_speed')
         try:
             # 获取输入参数
             wind_speed = self.wind_speed_spin.value()
@@ -565,20 +906,50 @@ class WindConversionInterface(QWidget):
             input_height = self.wind_height_spin.value()
             input_time = self.wind_time_cb.currentText()
             return_period = self.wind_rp_cb.currentText()
+            trace.mark('params')
             
             # 执行转换
             result = convert_wind_speed_to_chinese(wind_speed, input_unit, input_height, input_time, return_period)
+            trace.mark('convert')
             
             # 更新结果显示
             self.lbl_wind_result2.setText(f"50年重现期, 10m高度, 10分钟平均风速: {result['wind_speed_50y_10m_10min']:.2f} m/s")
             self.lbl_wind_result3.setText(f"基本风压: {result['basic_wind_pressure']:.3f} kN/m²")
+            trace.mark('labels')
             
             # 显示转换过程
             process_text = "\n".join(result['process'])
             self.wind_process_text.setPlainText(process_text)
+            trace.mark('process_text')
             
         except Exception as e:
+            logger.exception("Wind conversion error")
             self.wind_process_text.setPlainText(f"转换错误: {str(e)}")
+        finally:
+            trace.finish()
+
+
+class LazyInterface(QWidget):
+    """导航占位页：首次显示时才用 factory() 创建真正的界面"""
+    
+    def __init__(self, factory, object_name):
+        super().__init__()
+        # addSubInterface 需要对象名称
+        self.setObjectName(object_name)
+        self._factory = factory
+        self.widget = None
+        self.v_layout = QVBoxLayout(self)
+        self.v_layout.setContentsMargins(0, 0, 0, 0)
+    
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.ensure_created()
+    
+    def ensure_created(self):
+        if self.widget is None:
+            self.widget = self._factory()
+            self.v_layout.addWidget(self.widget)
+        return self.widget
 
 
 class MainWindow(FluentWindow):
@@ -587,11 +958,9 @@ class MainWindow(FluentWindow):
         self.setWindowTitle("中美规范主要参数转换")
         self.resize(1400, 750)
         
-        # 创建反应谱比较界面
-        self.spectrum_interface = SpectrumInterface()
-        
-        # 创建风速转换界面
-        self.wind_interface = WindConversionInterface()
+        # 各界面（及其中的 matplotlib 画布）在首次切换到该页时才创建
+        self.spectrum_interface = LazyInterface(SpectrumInterface, "SpectrumInterface")
+        self.wind_interface = LazyInterface(WindConversionInterface, "WindConversionInterface")
         
         # 将界面添加到主窗口
         self.addSubInterface(self.spectrum_interface, FIF.HOME, "反应谱比较")
@@ -604,6 +973,9 @@ class MainWindow(FluentWindow):
         self.move(x, y)
 
 if __name__ == '__main__':
+    # 人工波批量生成使用进程池：打包为 exe（spawn）时子进程不得重复打开主窗口
+    multiprocessing.freeze_support()
+    
     # 启用高DPI缩放
     QApplication.setHighDpiScaleFactorRoundingPolicy(Qt.HighDpiScaleFactorRoundingPolicy.PassThrough)
     
@@ -0,0 +1,431 @@
+# 中美规范反应谱与风速转换的核心计算（不依赖 PyQt6 / matplotlib）
+#
+# GUI（spectrum_comparison_PyQt6.py）、命令行（spectrum_cli.py）与参数扫描（spectrum_sweep.py）共用本模块
+
+from collections import OrderedDict
+
+import numpy as np
+
+from code_tables import REGISTRY
+
+
+# 界面可选项（参数扫描、命令行与下拉框共用）
+INTENSITIES = ["6度(0.05g)", "7度(0.10g)", "7度(0.15g)", "8度(0.20g)", "8度(0.30g)", "9度(0.40g)"]
+SITE_CATEGORIES = ["I0", "I1", "II", "III", "IV"]
+EARTHQUAKE_GROUPS = ["第一组", "第二组", "第三组"]
+US_SITE_CLASSES = ['A', 'B', 'C', 'D']
+
+def get_alpha_max(intensity, level='frequent', edition='GB50011-2010'):
+    """水平地震影响系数最大值，level 为 'frequent'（多遇，默认）/ 'fortification'（设防）/ 'rare'（罕遇）"""
+    return REGISTRY.gb_tables(edition)['alpha_max'][level].get(intensity, 0.08)
+
+def get_Tg(site_category, earthquake_group, edition='GB50011-2010'):
+    return REGISTRY.gb_tables(edition)['Tg_dict'].get(earthquake_group, {}).get(site_category, 0.35)
+
+def chinese_damping_factors(damping):
+    """GB50011-2010 第5.1.5条阻尼调整系数，damping 可为标量或数组，返回 (gamma, eta1, eta2)"""
+    damping = np.asarray(damping, dtype=float)
+    gamma = 0.9 + (0.05 - damping) / (0.3 + 6 * damping)
+    eta1 = np.maximum(0.02 + (0.05 - damping) / (4 + 32 * damping), 0.0)
+    eta2 = np.maximum(1 + (0.05 - damping) / (0.08 + 1.6 * damping), 0.55)
+    return gamma, eta1, eta2
+
+def us_damping_factor(damping):
+    """ASCE 7 阻尼修正系数 B（0.02~0.20 之间线性插值，两端取边界值），支持数组"""
+    return np.interp(damping, [0.02, 0.05, 0.10, 0.20], [0.8, 1.0, 1.2, 1.5])
+
+def _chinese_alpha(T, alpha_max, Tg, damping):
+    # 各分段公式整体按数组计算，再用 np.select 按分段条件取值（与逐点 if/elif 顺序一致）
+    gamma, eta1, eta2 = chinese_damping_factors(damping)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.select(
+            [T < 0.1, T < Tg, T < 5 * Tg],
+            [(0.45 * alpha_max) + (eta2 - 0.45) * alpha_max * (T / 0.1),
+             eta2 * alpha_max * np.ones_like(T),
+             eta2 * alpha_max * (Tg / T) ** gamma],
+            (eta2 * 0.2 ** gamma - eta1 * (T - 5 * Tg)) * alpha_max
+        )
+
+def _us_sa(T, SDS, SD1, TL, R, B):
+    nonzero = SDS != 0
+    Ts = np.where(nonzero, SD1 / np.where(nonzero, SDS, 1.0), 0.0)
+    T0 = 0.2 * Ts
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sa = np.select(
+            [T < T0, T < Ts, T < TL],
+            [SDS * (0.4 + 0.6 * T / T0),
+             SDS * np.ones_like(T),
+             SD1 / T],
+            SD1 * TL / (T ** 2)
+        )
+    return sa / R / B
+
+def _as_scenarios(*params):
+    # 参数广播为一维场景向量，并转为 (n, 1) 列，以便与 (1, m) 的周期行广播成 (n, m)
+    arrays = np.broadcast_arrays(*(np.atleast_1d(np.asarray(p, dtype=float)) for p in params))
+    return [a.reshape(-1, 1) for a in arrays]
+
+def make_period_grid(t_min=0.01, t_max=6.0, num=600, spacing='linear', breakpoints=()):
+    """
+    等距（spacing='linear'）或对数（spacing='log'）周期网格，并插入落在范围内的规范拐点
+    """
+    if spacing == 'log':
+        base = np.geomspace(t_min, t_max, num)
+    else:
+        base = np.linspace(t_min, t_max, num)
+    extra = np.ravel(np.asarray(breakpoints, dtype=float))
+    extra = extra[(extra > t_min) & (extra < t_max)]
+    return np.unique(np.concatenate([base, extra]))
+
+def adaptive_period_grid(breakpoints=(), t_min=0.01, t_max=6.0, tol=1e-3, curved=None, power=2.0):
+    """
+    按精度要求生成的自适应周期网格
+
+    拐点之间的分段若为直线或常数，只保留两端点（线性插值无误差）；位于 curved 区间内的
+    下降段 c·T^(-p) 按等比间距加密，使线性插值的相对误差不超过 tol（比值
+    r = 1 + sqrt(8·tol / (p(p+1)))，p 取 power，默认按最陡的 1/T² 段估计）。
+
+    参数:
+        breakpoints: 规范拐点（如 0.1、Tg、5Tg 或 T0、Ts、TL），范围外的自动忽略
+        t_min, t_max: 周期范围 (s)
+        tol: 线性插值相对误差上限
+        curved: 需要加密的 (起点, 终点) 区间列表，None 表示全部分段都加密
+    """
+    knots = np.ravel(np.asarray(breakpoints, dtype=float))
+    knots = np.unique(np.concatenate([[t_min, t_max], knots[(knots > t_min) & (knots < t_max)]]))
+    ratio = 1 + np.sqrt(8 * tol / (power * (power + 1)))
+    pieces = [knots[:1]]
+    for a, b in zip(knots[:-1], knots[1:]):
+        mid = 0.5 * (a + b)
+        if a > 0 and (curved is None or any(lo <= mid <= hi for lo, hi in curved)):
+            n = max(1, int(np.ceil(np.log(b / a) / np.log(ratio))))
+            pieces.append(np.geomspace(a, b, n + 1)[1:])
+        else:
+            pieces.append([b])
+    return np.concatenate(pieces)
+
+def chinese_corner_periods(Tg):
+    """中国规范反应谱的拐点周期 0.1、Tg、5Tg，Tg 可为数组，返回一维数组"""
+    Tg = np.ravel(np.asarray(Tg, dtype=float))
+    return np.concatenate([[0.1], Tg, 5 * Tg])
+
+def us_corner_periods(Ss, S1, site_class, TL):
+    """美国规范反应谱的拐点周期，返回 (T0, Ts, TL) 三个一维数组"""
+    Fa, Fv = get_Fa_Fv_batch(Ss, S1, site_class)
+    SDS = (2/3) * Fa * np.ravel(np.asarray(Ss, dtype=float))
+    SD1 = (2/3) * Fv * np.ravel(np.asarray(S1, dtype=float))
+    Ts = np.divide(SD1, SDS, out=np.zeros_like(SD1), where=SDS != 0)
+    return 0.2 * Ts, Ts, np.ravel(np.asarray(TL, dtype=float))
+
+def chinese_period_grid(Tg, t_min=0.01, t_max=6.0, tol=1e-3):
+    """中国规范反应谱的自适应周期网格，Tg 可为数组（取全部拐点的并集）"""
+    curved = [(tg, 5 * tg) for tg in np.unique(Tg)]
+    return adaptive_period_grid(chinese_corner_periods(Tg), t_min, t_max, tol, curved)
+
+def us_period_grid(Ss, S1, site_class, TL, t_min=0.01, t_max=6.0, tol=1e-3):
+    """美国规范反应谱的自适应周期网格（拐点 T0、Ts、TL），参数可为数组（取全部拐点的并集）"""
+    T0, Ts, TL = us_corner_periods(Ss, S1, site_class, TL)
+    return adaptive_period_grid(np.concatenate([T0, Ts, TL]), t_min, t_max, tol,
+                                curved=[(Ts.min(), np.inf)])
+
+def calculate_chinese_spectrum(alpha_max, Tg, damping=0.05, periods=None):
+    if periods is None:
+        periods = np.linspace(0.01, 6.0, 600)
+    periods = np.asarray(periods, dtype=float)
+    alpha = _chinese_alpha(periods, alpha_max, Tg, damping)
+    return periods, alpha
+
+def calculate_chinese_spectrum_batch(alpha_max, Tg, damping=0.05, periods=None):
+    """
+    批量计算中国规范反应谱
+
+    参数:
+        alpha_max, Tg, damping: 标量或数组，按 NumPy 规则广播后展平为 n 个场景
+        periods: 周期数组，默认 np.linspace(0.01, 6.0, 600)；可用 make_period_grid / *_period_grid 生成
+
+    返回:
+        (periods, alpha)，alpha 形状为 (n, len(periods))
+    """
+    if periods is None:
+        periods = np.linspace(0.01, 6.0, 600)
+    periods = np.asarray(periods, dtype=float)
+    alpha_max, Tg, damping = _as_scenarios(alpha_max, Tg, damping)
+    alpha = _chinese_alpha(periods[np.newaxis, :], alpha_max, Tg, damping)
+    return periods, alpha
+
+def get_Fa_Fv(Ss, S1, site_class, edition='ASCE 7-16'):
+    """
+    场地系数 Fa、Fv（按 code_tables 中登记的规范版本查表线性插值）
+
+    表中要求场地反应分析的位置（如 ASCE 7-16 的 E 类高烈度区、F 类）返回 nan
+    """
+    fa_table, fv_table = REGISTRY.site_coefficients(edition)
+    return fa_table.value_at(Ss, site_class), fv_table.value_at(S1, site_class)
+
+def get_Fa_Fv_batch(Ss, S1, site_class, edition='ASCE 7-16'):
+    """get_Fa_Fv 的数组版本，site_class 可为单个字符串或与 Ss/S1 同长的字符串数组"""
+    Ss, S1, site_class = (a.ravel() for a in np.broadcast_arrays(np.atleast_1d(np.asarray(Ss, dtype=float)),
+                                                                 np.atleast_1d(np.asarray(S1, dtype=float)),
+                                                                 np.asarray(site_class, dtype=str)))
+    fa_table, fv_table = REGISTRY.site_coefficients(edition)
+    return fa_table.lookup(Ss, site_class), fv_table.lookup(S1, site_class)
+
+def calculate_us_spectrum(Ss, S1, site_class, TL, R, damping=0.05, periods=None, edition='ASCE 7-16'):
+    Fa, Fv = get_Fa_Fv(Ss, S1, site_class, edition)
+    SMS = Fa * Ss
+    SM1 = Fv * S1
+    SDS = (2/3) * SMS
+    SD1 = (2/3) * SM1
+    if periods is None:
+        periods = np.linspace(0.01, 6.0, 600)
+    periods = np.asarray(periods, dtype=float)
+
+    # 周期调整系数
+    B = us_damping_factor(damping)
+    Sa = _us_sa(periods, SDS, SD1, TL, R, B)
+
+    return periods, Sa, SDS, SD1, Fa, Fv
+
+def calculate_us_spectrum_batch(Ss, S1, site_class, TL, R, damping=0.05, periods=None, edition='ASCE 7-16'):
+    """
+    批量计算美国规范反应谱
+
+    参数:
+        Ss, S1, TL, R, damping: 标量或数组，按 NumPy 规则广播后展平为 n 个场景
+        site_class: 单个场地类别或长度为 n 的场地类别数组
+        periods: 周期数组，默认 np.linspace(0.01, 6.0, 600)；可用 make_period_grid / *_period_grid 生成
+        edition: 场地系数表的规范版本（见 code_tables.REGISTRY.site_editions()）
+
+    返回:
+        (periods, Sa, SDS, SD1, Fa, Fv)，Sa 形状为 (n, len(periods))，其余为长度 n 的数组
+    """
+    if periods is None:
+        periods = np.linspace(0.01, 6.0, 600)
+    periods = np.asarray(periods, dtype=float)
+    site_class = np.asarray(site_class, dtype=str)
+    shape = np.broadcast_shapes(*(np.shape(p) for p in (Ss, S1, TL, R, damping)), site_class.shape)
+    Ss, S1, TL, R, damping = _as_scenarios(*(np.broadcast_to(p, shape) for p in (Ss, S1, TL, R, damping)))
+    Fa, Fv = get_Fa_Fv_batch(Ss.ravel(), S1.ravel(), np.broadcast_to(site_class, shape).ravel(),
+                             edition)
+    SDS = (2/3) * (Fa * Ss.ravel())
+    SD1 = (2/3) * (Fv * S1.ravel())
+    B = us_damping_factor(damping)
+    Sa = _us_sa(periods[np.newaxis, :], SDS[:, np.newaxis], SD1[:, np.newaxis], TL, R, B)
+    return periods, Sa, SDS, SD1, Fa, Fv
+
+
+def chinese_spectrum_at(T, alpha_max, Tg, damping=0.05):
+    """
+    中国规范地震影响系数在任意周期处的值（不生成整条曲线）
+
+    全部参数按 NumPy 规则逐元素广播，例如每栋建筑各自的 T1、阻尼比与场地，返回广播后形状的数组
+    """
+    # 不预先广播：标量阻尼比时调整系数按标量计算，结果与 calculate_chinese_spectrum 逐位一致
+    T, alpha_max, Tg, damping = (np.asarray(p, dtype=float) for p in (T, alpha_max, Tg, damping))
+    return _chinese_alpha(T, alpha_max, Tg, damping)
+
+def us_spectrum_at(T, Ss, S1, site_class, TL, R, damping=0.05, edition='ASCE 7-16'):
+    """
+    美国规范反应谱在任意周期处的值，参数（含 site_class）逐元素广播
+
+    返回:
+        (Sa, SDS, SD1, Fa, Fv)，Sa 与 calculate_us_spectrum 同口径（已除以 R 与阻尼系数 B）
+    """
+    site_class = np.asarray(site_class, dtype=str)
+    shape = np.broadcast_shapes(*(np.shape(p) for p in (T, Ss, S1, TL, R, damping)), site_class.shape)
+    T, Ss, S1, TL, R, damping = (np.broadcast_to(np.asarray(p, dtype=float), shape)
+                                 for p in (T, Ss, S1, TL, R, damping))
+    Fa, Fv = get_Fa_Fv_batch(Ss, S1, np.broadcast_to(site_class, shape), edition)
+    Fa = Fa.reshape(shape)
+    Fv = Fv.reshape(shape)
+    SDS = (2/3) * (Fa * Ss)
+    SD1 = (2/3) * (Fv * S1)
+    Sa = _us_sa(T, SDS, SD1, TL, R, us_damping_factor(damping))
+    return Sa, SDS, SD1, Fa, Fv
+
+def us_seismic_response_coefficient(T, SDS, SD1, S1, TL, R, Ie=1.0):
+    """ASCE 7-16 第 12.8.1.1 条地震反应系数 Cs（含上限式 12.8-3/4 与下限式 12.8-5/6），参数逐元素广播"""
+    T, SDS, SD1, S1, TL, R, Ie = np.broadcast_arrays(
+        *(np.asarray(p, dtype=float) for p in (T, SDS, SD1, S1, TL, R, Ie)))
+    RI = R / Ie
+    with np.errstate(divide='ignore', invalid='ignore'):
+        upper = np.where(T <= TL, SD1 / (T * RI), SD1 * TL / (T ** 2 * RI))
+    Cs = np.minimum(SDS / RI, upper)
+    Cs = np.maximum(Cs, np.maximum(0.044 * SDS * Ie, 0.01))
+    return np.where(S1 >= 0.6, np.maximum(Cs, 0.5 * S1 / RI), Cs)
+
+
+# 重现期 -> 50年 风速转换系数
+RETURN_PERIOD_FACTORS = {
+    '300y': 1.179,
+    '700y': 1.264,
+    '1700y': 1.352,
+    '3000y': 1.409
+}
+
+# 时距转换系数（基于Durst曲线，相对1小时平均风速）
+TIME_FACTORS = {
+    '3s': 1.52,
+    '10s': 1.43,
+    '60s': 1.27,
+    '10min': 1.06,
+    '1h': 1.00
+}
+
+def convert_wind_speed_to_chinese(wind_speed, input_unit, input_height, input_time, return_period):
+    """
+    将ASCE7风速转换为中国GB50009基本风压
+    
+    参数:
+        wind_speed: 输入风速值
+        input_unit: 输入单位 ('mph' 或 'm/s')
+        input_height: 测量高度
+        input_time: 测量时距 ('3s', '10s', '60s', '10min', '1h')
+        return_period: 重现期 ('300y', '700y', '1700y', '3000y')
+    
+    返回:
+        dict: 包含转换结果和详细过程的字典
+    """
+    process = []
+    
+    # 1. 单位转换：mph -> m/s
+    if input_unit == 'mph':
+        wind_speed_ms = wind_speed * 0.44704
+        process.append(f"单位转换: {wind_speed:.2f} mph = {wind_speed_ms:.2f} m/s")
+    else:
+        wind_speed_ms = wind_speed
+        process.append(f"风速: {wind_speed_ms:.2f} m/s")
+    
+    # 2. 重现期转换系数
+    rp_factor = RETURN_PERIOD_FACTORS.get(return_period, 1.26)
+    v_50 = wind_speed_ms / rp_factor
+    process.append(f"重现期转换 ({return_period} -> 50y): {wind_speed_ms:.2f} / {rp_factor:.2f} = {v_50:.2f} m/s")
+    
+    # 3. 时距转换系数（基于Durst曲线）
+    time_factors = TIME_FACTORS
+    # 计算到1小时平均风速
+    v_1h = v_50 / time_factors.get(input_time, 1.52)
+    # 转换到10分钟平均风速
+    v_10min = v_1h * time_factors['10min']
+    process.append(f"时距转换 ({input_time} -> 10min): {v_50:.2f} / {time_factors.get(input_time, 1.52):.2f} * 1.06 = {v_10min:.2f} m/s")
+    
+    # 4. 高度转换到10m（使用幂律公式，假设Exposure C/B类地貌）
+    # 幂律指数：B类约0.16，C类约0.14
+    alpha = 0.15  # 取中间值
+    if input_height != 10:
+        v_10m = v_10min * (10 / input_height) ** alpha
+        process.append(f"高度转换 ({input_height}m -> 10m): {v_10min:.2f} * (10/{input_height})^{alpha:.2f} = {v_10m:.2f} m/s")
+    else:
+        v_10m = v_10min
+        process.append(f"高度已是10m，无需转换: {v_10m:.2f} m/s")
+    
+    # 5. 计算基本风压（中国规范）
+    # w0 = 0.5 * rho * v^2
+    rho = 1.25  # 空气密度 kg/m³
+    w0 = 0.5 * rho * v_10m ** 2 / 1000  # 转换为kN/m²
+    process.append(f"基本风压计算: w0 = 0.5 * {rho} * {v_10m:.2f}² / 1000 = {w0:.3f} kN/m²")
+    
+    return {
+        'wind_speed_50y_10m_10min': v_10m,
+        'basic_wind_pressure': w0,
+        'process': process
+    }
+
+
+def _lookup(table, keys, default):
+    # 对字符串数组按字典查表：只对去重后的取值查询一次
+    uniq, inverse = np.unique(keys, return_inverse=True)
+    return np.array([table.get(k, default) for k in uniq], dtype=float)[inverse.reshape(keys.shape)]
+
+def convert_wind_speed_batch(wind_speed, input_unit='mph', input_height=10, input_time='3s', return_period='700y'):
+    """
+    convert_wind_speed_to_chinese 的批量版本，各参数可为标量或数组（按 NumPy 规则广播）
+
+    只计算数值结果，不生成转换过程文字；需要某一行的过程时调用 wind_conversion_process(result, i)
+
+    返回:
+        dict: 输入数组及 'wind_speed_50y_10m_10min'、'basic_wind_pressure' 结果数组
+    """
+    # 高度另存调用方原始取值（不转为浮点数），过程文字与逐个调用 convert_wind_speed_to_chinese 一致
+    height = np.asarray(input_height)
+    wind_speed, input_height = (np.asarray(v, dtype=float) for v in (wind_speed, input_height))
+    input_unit, input_time, return_period = (np.asarray(v, dtype=str) for v in (input_unit, input_time, return_period))
+    wind_speed, input_height, height, input_unit, input_time, return_period = np.broadcast_arrays(
+        wind_speed, input_height, height, input_unit, input_time, return_period)
+
+    wind_speed_ms = np.where(input_unit == 'mph', wind_speed * 0.44704, wind_speed)
+    v_50 = wind_speed_ms / _lookup(RETURN_PERIOD_FACTORS, return_period, 1.26)
+    v_10min = v_50 / _lookup(TIME_FACTORS, input_time, 1.52) * TIME_FACTORS['10min']
+    v_10m = np.where(input_height != 10, v_10min * (10 / input_height) ** 0.15, v_10min)
+    w0 = 0.5 * 1.25 * v_10m ** 2 / 1000
+
+    return {
+        'wind_speed': wind_speed, 'input_unit': input_unit, 'input_height': height,
+        'input_time': input_time, 'return_period': return_period,
+        'wind_speed_50y_10m_10min': v_10m,
+        'basic_wind_pressure': w0,
+    }
+
+def wind_conversion_process(batch_result, index):
+    """按需生成 convert_wind_speed_batch 结果中第 index 行的转换过程文字"""
+    row = {k: batch_result[k].flat[index].item()
+           for k in ('wind_speed', 'input_unit', 'input_height', 'input_time', 'return_period')}
+    return convert_wind_speed_to_chinese(**row)['process']
+
+
+# SpectrumCache.get 未命中的标记
+_MISSING = object()
+
+
+class SpectrumCache:
+    """
+    反应谱计算结果的 LRU 缓存
+
+    键为某一侧规范的归一化输入（浮点数按 ndigits 位小数取整），
+    超过 maxsize 时淘汰最久未使用的条目，并统计命中/未命中/淘汰次数。
+    """
+
+    def __init__(self, maxsize=128, ndigits=6):
+        self.maxsize = maxsize
+        self.ndigits = ndigits
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def make_key(self, *inputs):
+        return tuple(round(float(v), self.ndigits) if isinstance(v, (int, float, np.floating)) else v
+                     for v in inputs)
+
+    def get(self, key, default=None):
+        if key in self._data:
+            self.hits += 1
+            self._data.move_to_end(key)
+            return self._data[key]
+        self.misses += 1
+        return default
+
+    def put(self, key, value):
+        # 缓存的数组设为只读，防止调用方修改后污染缓存
+        for item in value if isinstance(value, tuple) else (value,):
+            if isinstance(item, np.ndarray):
+                item.setflags(write=False)
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        self._data.clear()
+
+    def stats(self):
+        return {'size': len(self._data), 'maxsize': self.maxsize,
+                'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
@@ -0,0 +1,145 @@
+# 反向匹配：寻找最接近给定美国规范谱（或任意目标谱）的中国规范参数
+#
+# 候选为 烈度 × 场地类别 × 地震分组 的全部离散组合，加上连续的阻尼比。
+# 中国规范谱对 alpha_max 是线性的：α(T) = alpha_max · s(T; Tg, ζ)，因此只需缓存各 (Tg, ζ) 的
+# 单位谱形 s，加权误差 Σw(a·s - y)² = Σwy² - 2a·Σwsy + a²·Σws² 对全部候选一次矩阵运算得到；
+# 最优候选的阻尼比再在相邻网格点之间用黄金分割细化。
+#
+# 用法:
+#   from spectrum_match import match_us_spectrum
+#   best = match_us_spectrum(0.51, 0.18, 'D', 24.0, 5.0)
+#   best['intensity'], best['site_category'], best['group'], best['damping'], best['error']
+
+import numpy as np
+
+from spectrum_core import (
+    INTENSITIES, SITE_CATEGORIES, EARTHQUAKE_GROUPS, get_alpha_max, get_Tg,
+    _chinese_alpha, calculate_us_spectrum, SpectrumCache
+)
+
+# 阻尼比搜索网格（2% ~ 30%）
+DAMPING_GRID = np.round(np.arange(0.02, 0.30 + 1e-9, 0.005), 4)
+
+# 单位谱形缓存，键为 (周期, 阻尼比网格) 的字节串
+_shape_cache = SpectrumCache(maxsize=16)
+
+# 离散候选：全部 (烈度, 场地类别, 分组) 组合及其 alpha_max、Tg
+CANDIDATES = [(i, s, g) for i in INTENSITIES for s in SITE_CATEGORIES for g in EARTHQUAKE_GROUPS]
+_CANDIDATE_ALPHA = np.array([get_alpha_max(i) for i, _, _ in CANDIDATES])
+_CANDIDATE_TG = np.array([get_Tg(s, g) for _, s, g in CANDIDATES])
+TG_VALUES, _CANDIDATE_TG_INDEX = np.unique(_CANDIDATE_TG, return_inverse=True)
+
+
+def candidate_shapes(periods, dampings=DAMPING_GRID):
+    """各 (Tg, 阻尼比) 的单位 alpha_max 谱形，形状 (len(TG_VALUES), len(dampings), len(periods))，结果缓存"""
+    periods = np.ascontiguousarray(periods, dtype=float)
+    dampings = np.ascontiguousarray(dampings, dtype=float)
+    key = (periods.tobytes(), dampings.tobytes())
+    return _shape_cache.get_or_compute(key, lambda: _chinese_alpha(
+        periods, 1.0, TG_VALUES[:, np.newaxis, np.newaxis], dampings[np.newaxis, :, np.newaxis]))
+
+
+def _weights(periods, target, weights, relative):
+    # 返回 (二次型权重, 归一化用的权重和)
+    w = np.ones_like(periods) if weights is None else np.broadcast_to(np.asarray(weights, dtype=float), periods.shape)
+    if relative:
+        # 相对误差 Σw((a·s - y)/y)² 仍是二次型，只需把权重除以 y²
+        w = np.where(target > 0, w, 0.0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(target > 0, w / target ** 2, 0.0), w.sum()
+    return w, w.sum()
+
+
+def _golden_section(f, lo, hi, iterations=30):
+    ratio = (np.sqrt(5) - 1) / 2
+    a, b = lo, hi
+    c, d = b - ratio * (b - a), a + ratio * (b - a)
+    fc, fd = f(c), f(d)
+    for _ in range(iterations):
+        if fc < fd:
+            b, d, fd = d, c, fc
+            c = b - ratio * (b - a)
+            fc = f(c)
+        else:
+            a, c, fc = c, d, fd
+            d = a + ratio * (b - a)
+            fd = f(d)
+    return (c, fc) if fc < fd else (d, fd)
+
+
+def match_spectrum(periods, target, damping=None, weights=None, relative=True, top=5):
+    """
+    在全部 GB50011 离散参数组合（及阻尼比）中寻找与目标谱加权误差最小的一组
+
+    参数:
+        periods, target: 目标谱（周期 s，谱值 g）
+        damping: None 时在 DAMPING_GRID 上搜索并细化阻尼比；给定标量时固定阻尼比
+        weights: 各周期点权重，默认均匀
+        relative: True 时按相对误差计（各周期点同等重要），False 时按绝对误差
+        top: 返回的候选个数
+
+    返回:
+        dict: intensity, site_category, group, alpha_max, Tg, damping, error（加权均方根误差，relative 时为相对值），
+              periods, spectrum（最佳匹配的中国规范谱），candidates（前 top 个 (烈度, 场地, 分组, 阻尼比, 误差)）
+    """
+    periods = np.asarray(periods, dtype=float)
+    target = np.asarray(target, dtype=float)
+    if not np.isfinite(target).all():
+        # 如 E 类场地高 Ss/S1 时 Fa、Fv 无定义（需做场地反应分析），目标谱为 nan
+        raise ValueError("目标谱含非有限值（nan / inf），无法匹配")
+    dampings = DAMPING_GRID if damping is None else np.atleast_1d(np.asarray(damping, dtype=float))
+    w, w_sum = _weights(periods, target, weights, relative)
+
+    shapes = candidate_shapes(periods, dampings)
+    wy = w * target
+    sy = shapes @ wy                    # (Tg 数, 阻尼数)
+    ss = (shapes * shapes) @ w
+    yy = wy @ target
+    a = _CANDIDATE_ALPHA[:, np.newaxis]
+    idx = _CANDIDATE_TG_INDEX
+    misfit = yy - 2 * a * sy[idx] + a * a * ss[idx]      # (候选数, 阻尼数)
+
+    best_d = misfit.argmin(axis=1)
+    best_misfit = misfit[np.arange(len(CANDIDATES)), best_d]
+    order = np.argsort(best_misfit)
+
+    k = order[0]
+    alpha_max = _CANDIDATE_ALPHA[k]
+    Tg = _CANDIDATE_TG[k]
+    zeta = dampings[best_d[k]]
+    value = best_misfit[k]
+    if damping is None:
+        j = best_d[k]
+        lo, hi = dampings[max(j - 1, 0)], dampings[min(j + 1, len(dampings) - 1)]
+
+        def f(z):
+            r = alpha_max * _chinese_alpha(periods, 1.0, Tg, z) - target
+            return w @ (r * r)
+        z, fz = _golden_section(f, lo, hi)
+        if fz < value:
+            zeta, value = float(z), fz
+
+    def rms(m):
+        return float(np.sqrt(max(m, 0.0) / w_sum))
+
+    intensity, site, group = CANDIDATES[k]
+    return {
+        'intensity': intensity, 'site_category': site, 'group': group,
+        'alpha_max': float(alpha_max), 'Tg': float(Tg), 'damping': float(zeta), 'error': rms(value),
+        'periods': periods, 'spectrum': alpha_max * _chinese_alpha(periods, 1.0, Tg, zeta),
+        'candidates': [(*CANDIDATES[i], float(dampings[best_d[i]]), rms(best_misfit[i])) for i in order[:top]],
+    }
+
+
+def match_us_spectrum(Ss, S1, site_class, TL, R, damping=0.05, periods=None, match_damping=False, **kwargs):
+    """
+    寻找与美国规范谱（calculate_us_spectrum 的结果，已除以 R 与 B）最接近的中国规范参数
+
+    参数:
+        damping: 美国规范谱的阻尼比；match_damping 为 False 时中国规范谱取相同阻尼比
+        match_damping: True 时中国规范谱的阻尼比也作为搜索变量
+        periods: 匹配所用周期点，默认 np.linspace(0.01, 6.0, 600)
+        其余关键字参数传给 match_spectrum（weights、relative、top）
+    """
+    periods, target = calculate_us_spectrum(Ss, S1, site_class, TL, R, damping, periods=periods)[:2]
+    return match_spectrum(periods, target, damping=None if match_damping else damping, **kwargs)
@@ -0,0 +1,361 @@
+# 中美反应谱对比指标：比值曲线、交点周期、分周期段的最大/平均偏差、谱强度差与底部剪力系数比
+#
+# 两国规范谱都是分段解析式，每段可写成 f(T) = a + bT + cT^p + d/T + e/T²（中国规范下降段 p = -γ），
+# PiecewiseSpectrum 对一批场景保存各段端点与系数，因此：
+#   - 积分（谱强度、平均偏差）按原函数精确计算，不依赖周期网格；
+#   - 差值 h = 中国 - 美国 的交点：先在各段内求 h'' 的零点（两项时有闭式解）把段分为凸/凹两部分，
+#     再用二分法求 h' 的零点（凸/凹部分上 h' 单调），得到 h 的单调区间，最后在变号区间内二分到机器精度；
+#   - 分段内的最大偏差只可能出现在上述区间端点（段端点、h' 零点）与周期段端点处。
+# 全部步骤对场景与分段整体向量化，几百个场地一次完成。
+#
+# 用法:
+#   from spectrum_metrics import comparison_metrics
+#   m = comparison_metrics(0.08, 0.35, 0.51, 0.18, 'D', 24.0, 5.0, bands=[(0, 0.5), (0.5, 1.5), (1.5, 6)])
+#   m['crossings'], m['mean_deviation'], m['base_shear_ratio']
+
+import numpy as np
+
+from spectrum_core import (
+    chinese_damping_factors, us_damping_factor, get_Fa_Fv_batch,
+    calculate_chinese_spectrum_batch, calculate_us_spectrum_batch
+)
+
+# 默认周期段 (s)
+DEFAULT_BANDS = ((0.0, 0.5), (0.5, 1.0), (1.0, 3.0), (3.0, 6.0))
+
+_TERMS = ('a', 'b', 'c', 'p', 'd', 'e')
+
+
+def _column(x):
+    return np.atleast_1d(np.asarray(x, dtype=float)).reshape(-1, 1)
+
+
+def _power(c, T, p):
+    # c · T^p，c 为 0 的位置直接取 0（避免 0 · inf）
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        return np.where(c != 0, c * T ** p, 0.0)
+
+
+def _evaluate(coef, T, order=0):
+    """按系数计算 f、f' 或 f''（order = 0 / 1 / 2），coef 各项与 T 可广播"""
+    a, b, c, p, d, e = (coef[k] for k in _TERMS)
+    if order == 0:
+        return a + b * T + _power(c, T, p) + _power(d, T, -1.0) + _power(e, T, -2.0)
+    if order == 1:
+        return b + _power(c * p, T, p - 1) - _power(d, T, -2.0) - _power(2 * e, T, -3.0)
+    return _power(c * p * (p - 1), T, p - 2) + _power(2 * d, T, -3.0) + _power(6 * e, T, -4.0)
+
+
+def _antiderivative(coef, T):
+    a, b, c, p, d, e = (coef[k] for k in _TERMS)
+    q = p + 1
+    with np.errstate(divide='ignore', invalid='ignore'):
+        power = np.where(np.abs(q) > 1e-12, _power(c, T, q) / np.where(q == 0, 1.0, q),
+                         np.where(c != 0, c * np.log(T), 0.0))
+        log = np.where(d != 0, d * np.log(T), 0.0)
+    return a * T + 0.5 * b * T * T + power + log - _power(e, T, -1.0)
+
+
+def _bisect(f, lo, hi, iterations=64):
+    """对每个区间 [lo, hi]（f(lo)、f(hi) 异号）二分求根，数组整体迭代"""
+    f_lo = f(lo)
+    for _ in range(iterations):
+        mid = 0.5 * (lo + hi)
+        f_mid = f(mid)
+        same = np.sign(f_mid) == np.sign(f_lo)
+        lo = np.where(same, mid, lo)
+        f_lo = np.where(same, f_mid, f_lo)
+        hi = np.where(same, hi, mid)
+    return 0.5 * (lo + hi)
+
+
+class PiecewiseSpectrum:
+    """
+    一批场景的分段解析谱，第 i 个场景在 [knots[i, j], knots[i, j+1]) 上为
+    a + bT + cT^p + d/T + e/T²（系数取 coef[k][i, j]）；knots 形状 (n, K+1)，系数形状 (n, K)
+    """
+
+    def __init__(self, knots, coef):
+        self.knots = knots
+        self.coef = coef
+
+    @classmethod
+    def build(cls, breaks, t_min, t_max, terms):
+        """breaks: (n, m) 分段点（nan 与超出 [t_min, t_max] 的点被忽略）；terms(T) 返回 T 所在段的系数"""
+        breaks = np.nan_to_num(np.asarray(breaks, dtype=float), nan=t_max)
+        n = len(breaks)
+        knots = np.sort(np.clip(np.column_stack([np.full(n, t_min), breaks, np.full(n, t_max)]), t_min, t_max),
+                        axis=1)
+        return cls(knots, terms(0.5 * (knots[:, :-1] + knots[:, 1:])))
+
+    @property
+    def n(self):
+        return len(self.knots)
+
+    def locate(self, T):
+        """T（形状 (n, m)）所在的段号，段端点处取右侧一段"""
+        T = np.asarray(T, dtype=float)
+        return (self.knots[:, np.newaxis, 1:-1] <= T[..., np.newaxis]).sum(axis=-1)
+
+    def coef_at(self, index):
+        return {k: np.take_along_axis(v, index, axis=1) for k, v in self.coef.items()}
+
+    def __call__(self, T, order=0):
+        """在 T 处求值（order 为导数阶数），T 可为一维周期数组（所有场景相同）或 (n, m) 数组"""
+        T = np.broadcast_to(np.asarray(T, dtype=float), (self.n,) + np.shape(T)[-1:]) if np.ndim(T) < 2 else T
+        return _evaluate(self.coef_at(self.locate(T)), T, order)
+
+    def _cumulative(self):
+        # 各段端点处自 knots[:, 0] 起的积分
+        lo, hi = self.knots[:, :-1], self.knots[:, 1:]
+        pieces = np.where(hi > lo, _antiderivative(self.coef, hi) - _antiderivative(self.coef, lo), 0.0)
+        return np.column_stack([np.zeros(self.n), np.cumsum(pieces, axis=1)])
+
+    def integral(self, t1, t2):
+        """精确积分 ∫_{t1}^{t2} f(T) dT；t1、t2 为标量、(n,) 或 (n, m) 数组，前两种返回 (n,)"""
+        t1, t2 = (np.asarray(t, dtype=float) for t in (t1, t2))
+        flat = max(t1.ndim, t2.ndim) < 2
+        t1, t2 = (t.reshape(-1, 1) if t.ndim == 1 else t for t in (t1, t2))
+        t1, t2 = (np.broadcast_to(t, np.broadcast_shapes((self.n, 1), t1.shape, t2.shape)) for t in (t1, t2))
+        cumulative = self._cumulative()
+
+        def G(T):
+            j = self.locate(T)
+            coef = self.coef_at(j)
+            start = np.take_along_axis(self.knots, j, axis=1)
+            return np.take_along_axis(cumulative, j, axis=1) + _antiderivative(coef, T) - _antiderivative(coef, start)
+        result = G(t2) - G(t1)
+        return result[:, 0] if flat else result
+
+    def __sub__(self, other):
+        knots = np.sort(np.column_stack([self.knots, other.knots[:, 1:-1]]), axis=1)
+        mid = 0.5 * (knots[:, :-1] + knots[:, 1:])
+        f, g = self.coef_at(self.locate(mid)), other.coef_at(other.locate(mid))
+        if np.any((f['c'] != 0) & (g['c'] != 0)):
+            raise ValueError("两条曲线在同一段内都含幂函数项，不能表示为一条分段解析式")
+        coef = {k: f[k] - g[k] for k in ('a', 'b', 'c', 'd', 'e')}
+        coef['p'] = np.where(f['c'] != 0, f['p'], g['p'])
+        return PiecewiseSpectrum(knots, coef)
+
+    def monotone_pieces(self):
+        """
+        把每段再分为 f 单调的小段，返回 (lo, hi, critical)，前两者形状 (n, 4K)、critical 形状 (n, 2K)；
+        critical 为各段内 f' 的零点（无则为 nan）
+        """
+        lo, hi = self.knots[:, :-1], self.knots[:, 1:]
+        c, p, d, e = (self.coef[k] for k in ('c', 'p', 'd', 'e'))
+        # f'' = c p (p-1) T^(p-2) + 2d T^-3 + 6e T^-4，幂函数项与 d 或 e 项同时存在时有唯一闭式零点
+        s = c * p * (p - 1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            inflection = np.where((s != 0) & (d != 0), (-2 * d / s) ** (1 / (p + 1)),
+                                  np.where((s != 0) & (e != 0), (-6 * e / s) ** (1 / (p + 2)), np.nan))
+        inside = (inflection > lo) & (inflection < hi)
+        split = np.where(inside, inflection, hi)
+        # 凸 / 凹部分上 f' 单调：f' 变号时二分求零点
+        parts_lo = np.stack([lo, split], axis=-1)
+        parts_hi = np.stack([split, hi], axis=-1)
+        coef = {k: v[..., np.newaxis] for k, v in self.coef.items()}
+
+        def slope(T):
+            return _evaluate(coef, T, 1)
+        s_lo, s_hi = slope(parts_lo), slope(parts_hi)
+        turning = (parts_hi > parts_lo) & (np.sign(s_lo) * np.sign(s_hi) < 0)
+        critical = np.where(turning, _bisect(slope, parts_lo, parts_hi), np.nan)
+        # 每段得到 [lo, c1, split, c2, hi] 五个点，缺失的点用相邻点代替（长度为 0 的小段）
+        c1 = np.where(turning[..., 0], critical[..., 0], split)
+        c2 = np.where(turning[..., 1], critical[..., 1], hi)
+        points = np.stack([lo, c1, split, c2, hi], axis=-1)
+        n, K = lo.shape
+        pieces_lo = points[..., :-1].reshape(n, 4 * K)
+        pieces_hi = points[..., 1:].reshape(n, 4 * K)
+        return pieces_lo, pieces_hi, critical.reshape(n, 2 * K)
+
+    def roots(self):
+        """f = 0 的全部根（升序），形状 (n, m)，不足 m 个的位置为 nan；f 在一段内恒为 0 时不计"""
+        lo, hi, _ = self.monotone_pieces()
+        coef = {k: np.repeat(v, 4, axis=1) for k, v in self.coef.items()}
+
+        def f(T):
+            return _evaluate(coef, T)
+        f_lo, f_hi = f(lo), f(hi)
+        crossing = (hi > lo) & (((f_lo < 0) & (f_hi > 0)) | ((f_lo > 0) & (f_hi < 0)))
+        touching = (hi > lo) & (f_hi == 0) & (f_lo != 0)
+        roots = np.where(crossing, _bisect(f, lo, hi), np.where(touching, hi, np.nan))
+        start = self.knots[:, :1]
+        roots = np.column_stack([np.where(self(start)[:, :1] == 0, start, np.nan), roots])
+        roots = np.sort(roots, axis=1)
+        width = max(int(np.isfinite(roots).sum(axis=1).max(initial=0)), 1)
+        return roots[:, :width]
+
+
+def chinese_piecewise(alpha_max, Tg, damping=0.05, t_min=0.0, t_max=6.0):
+    """中国规范地震影响系数曲线（与 _chinese_alpha 的分段一致）"""
+    alpha_max, Tg, damping = (_column(x) for x in np.broadcast_arrays(
+        np.atleast_1d(alpha_max), np.atleast_1d(Tg), np.atleast_1d(damping)))
+    gamma, eta1, eta2 = chinese_damping_factors(damping)
+
+    def terms(T):
+        zero = np.zeros_like(T)
+        seg = np.select([T < 0.1, T < Tg, T < 5 * Tg], [0, 1, 2], 3)
+        return {
+            'a': np.select([seg == 0, seg == 1, seg == 3],
+                           [0.45 * alpha_max + zero, eta2 * alpha_max + zero,
+                            (eta2 * 0.2 ** gamma + 5 * eta1 * Tg) * alpha_max + zero], 0.0),
+            'b': np.select([seg == 0, seg == 3], [(eta2 - 0.45) * alpha_max / 0.1 + zero, -eta1 * alpha_max + zero], 0.0),
+            'c': np.where(seg == 2, eta2 * alpha_max * Tg ** gamma, 0.0),
+            'p': -gamma + zero,
+            'd': zero, 'e': zero,
+        }
+    return PiecewiseSpectrum.build(np.column_stack([np.full(len(Tg), 0.1), Tg, 5 * Tg]), t_min, t_max, terms)
+
+
+def us_piecewise(SDS, SD1, TL, R, damping=0.05, t_min=0.0, t_max=6.0):
+    """美国规范设计谱（与 _us_sa 同口径，已除以 R 与 B）"""
+    SDS, SD1, TL, R, damping = (_column(x) for x in np.broadcast_arrays(
+        *(np.atleast_1d(np.asarray(v, dtype=float)) for v in (SDS, SD1, TL, R, damping))))
+    scale = 1.0 / (R * us_damping_factor(damping))
+    nonzero = SDS != 0
+    Ts = np.where(nonzero, SD1 / np.where(nonzero, SDS, 1.0), 0.0)
+    T0 = 0.2 * Ts
+
+    def terms(T):
+        zero = np.zeros_like(T)
+        seg = np.select([T < T0, T < Ts, T < TL], [0, 1, 2], 3)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ramp = 0.6 * SDS / T0
+        return {
+            'a': np.select([seg == 0, seg == 1], [0.4 * SDS * scale + zero, SDS * scale + zero], 0.0),
+            'b': np.where(seg == 0, ramp * scale, 0.0),
+            'c': zero, 'p': zero,
+            'd': np.where(seg == 2, SD1 * scale, 0.0),
+            'e': np.where(seg == 3, SD1 * TL * scale, 0.0),
+        }
+    return PiecewiseSpectrum.build(np.column_stack([T0, Ts, TL]), t_min, t_max, terms)
+
+
+def cs_piecewise(SDS, SD1, S1, TL, R, Ie=1.0, t_min=0.0, t_max=6.0):
+    """ASCE 7-16 第 12.8.1.1 条地震反应系数 Cs(T)（与 us_seismic_response_coefficient 一致）"""
+    SDS, SD1, S1, TL, R, Ie = (_column(x) for x in np.broadcast_arrays(
+        *(np.atleast_1d(np.asarray(v, dtype=float)) for v in (SDS, SD1, S1, TL, R, Ie))))
+    RI = R / Ie
+    floor = np.maximum(np.maximum(0.044 * SDS * Ie, 0.01), np.where(S1 >= 0.6, 0.5 * S1 / RI, 0.0))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        Ts = SD1 / SDS
+        # 上限式 12.8-3 / 12.8-4 降到下限值的周期
+        hit_1 = SD1 / (RI * floor)
+        hit_2 = np.sqrt(SD1 * TL / (RI * floor))
+        # Ts > TL 时平台段与式 12.8-4 相交于 sqrt(Ts·TL)（Ts <= TL 时该点落在 1/T 段内，只是多一个分段点）
+        flat_end = np.sqrt(Ts * TL)
+
+    def terms(T):
+        zero = np.zeros_like(T)
+        flat = SDS / RI + zero
+        with np.errstate(divide='ignore', invalid='ignore'):
+            upper = np.where(T <= TL, SD1 / (T * RI), SD1 * TL / (T ** 2 * RI))
+        use_floor = np.maximum(np.minimum(flat, upper), floor) == floor
+        use_flat = ~use_floor & (flat <= upper)
+        use_d = ~use_floor & ~use_flat & (T <= TL)
+        use_e = ~use_floor & ~use_flat & (T > TL)
+        return {
+            'a': np.select([use_floor, use_flat], [floor + zero, flat], 0.0),
+            'b': zero, 'c': zero, 'p': zero,
+            'd': np.where(use_d, SD1 / RI, 0.0),
+            'e': np.where(use_e, SD1 * TL / RI, 0.0),
+        }
+    return PiecewiseSpectrum.build(np.column_stack([Ts, TL, hit_1, hit_2, flat_end]), t_min, t_max, terms)
+
+
+def comparison_metrics(alpha_max, Tg, Ss, S1, site_class, TL, R, damping=0.05, bands=DEFAULT_BANDS,
+                       periods=None, Ie=1.0, geq_factor=0.85, t_min=0.0, t_max=6.0, edition='ASCE 7-16'):
+    """
+    一批场景的中美反应谱对比指标（参数按 NumPy 规则广播为 n 个场景，site_class 可为字符串数组）
+
+    参数:
+        bands: 周期段 [(T1, T2), ...] (s)
+        periods: 比值曲线的周期点，默认 np.linspace(0.01, 6.0, 600)
+        Ie, geq_factor: 底部剪力系数比所用的重要性系数与等效总重力荷载系数
+        t_min, t_max: 求交点的周期范围
+
+    返回:
+        dict（n 为场景数，B 为周期段数）:
+            periods, ratio (n, P): 比值曲线 中国 / 美国
+            crossings (n, m): 交点周期（升序，不足处为 nan），n_crossings (n,)
+            bands (B, 2)，以下均为 (n, B):
+            max_deviation: 段内 |中国 - 美国| 最大处的差值（带符号），max_deviation_period: 其周期
+            mean_deviation: 段内平均差值，mean_abs_deviation: 段内平均绝对差值
+            china_intensity / us_intensity: 段内谱强度 ∫Sa dT (g·s)，intensity_difference / intensity_ratio
+            base_shear_ratio: 段内平均底部剪力系数之比 geq_factor·∫α dT / ∫Cs dT
+            以及 SDS, SD1, Fa, Fv (n,)
+    """
+    site_class = np.asarray(site_class, dtype=str)
+    shape = np.broadcast_shapes(*(np.shape(v) for v in (alpha_max, Tg, Ss, S1, TL, R, damping, Ie, geq_factor)),
+                                site_class.shape)
+    alpha_max, Tg, Ss, S1, TL, R, damping, Ie, geq_factor = (
+        np.broadcast_to(np.asarray(v, dtype=float), shape).ravel()
+        for v in (alpha_max, Tg, Ss, S1, TL, R, damping, Ie, geq_factor))
+    Fa, Fv = get_Fa_Fv_batch(Ss, S1, np.broadcast_to(site_class, shape).ravel(), edition)
+    SDS = (2/3) * Fa * Ss
+    SD1 = (2/3) * Fv * S1
+
+    china = chinese_piecewise(alpha_max, Tg, damping, t_min, t_max)
+    us = us_piecewise(SDS, SD1, TL, R, damping, t_min, t_max)
+    diff = china - us
+    crossings = diff.roots()
+    n = len(alpha_max)
+
+    if periods is None:
+        periods = np.linspace(0.01, 6.0, 600)
+    periods = np.asarray(periods, dtype=float)
+    _, china_curve = calculate_chinese_spectrum_batch(alpha_max, Tg, damping, periods=periods)
+    us_curve = calculate_us_spectrum_batch(Ss, S1, np.broadcast_to(site_class, shape).ravel(), TL, R, damping,
+                                           periods=periods, edition=edition)[1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = china_curve / us_curve
+
+    bands = np.asarray(bands, dtype=float).reshape(-1, 2)
+    t1 = np.broadcast_to(bands[:, 0], (n, len(bands)))
+    t2 = np.broadcast_to(bands[:, 1], (n, len(bands)))
+    width = t2 - t1
+
+    # 段内极值：候选点为各单调小段截取到周期段内后的两端（含分段点与 h' 零点），
+    # 每个端点按所在小段的系数求值，分段点处的左右极限都在候选之列（Ts > TL 时美国谱在 Ts 处不连续）
+    lo, hi, _ = diff.monotone_pieces()
+    piece_coef = {k: np.tile(np.repeat(v, 4, axis=1), 2) for k, v in diff.coef.items()}
+    max_deviation = np.empty((n, len(bands)))
+    max_period = np.empty((n, len(bands)))
+    for j, (a, b) in enumerate(bands):
+        piece_lo, piece_hi = np.clip(lo, a, b), np.clip(hi, a, b)
+        points = np.column_stack([piece_lo, piece_hi])
+        inside = np.tile(piece_hi > piece_lo, 2)
+        values = np.where(inside, _evaluate(piece_coef, points), np.nan)
+        k = np.nanargmax(np.where(np.isfinite(values), np.abs(values), -np.inf), axis=1)
+        max_deviation[:, j] = values[np.arange(n), k]
+        max_period[:, j] = points[np.arange(n), k]
+
+    # 平均绝对差值：在交点处分开后逐段积分取绝对值
+    abs_integral = np.empty((n, len(bands)))
+    for j, (a, b) in enumerate(bands):
+        cuts = np.sort(np.column_stack([np.full(n, a), np.clip(np.nan_to_num(crossings, nan=b), a, b),
+                                        np.full(n, b)]), axis=1)
+        abs_integral[:, j] = np.abs(diff.integral(cuts[:, :-1], cuts[:, 1:])).sum(axis=1)
+
+    china_intensity = china.integral(t1, t2)
+    us_intensity = us.integral(t1, t2)
+    cs = cs_piecewise(SDS, SD1, S1, TL, R, Ie, t_min, t_max)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        intensity_ratio = china_intensity / us_intensity
+        base_shear_ratio = geq_factor[:, np.newaxis] * china_intensity / cs.integral(t1, t2)
+        mean_deviation = (china_intensity - us_intensity) / width
+        mean_abs_deviation = abs_integral / width
+
+    return {
+        'SDS': SDS, 'SD1': SD1, 'Fa': Fa, 'Fv': Fv,
+        'periods': periods, 'ratio': ratio,
+        'crossings': crossings, 'n_crossings': np.isfinite(crossings).sum(axis=1),
+        'bands': bands,
+        'max_deviation': max_deviation, 'max_deviation_period': max_period,
+        'mean_deviation': mean_deviation, 'mean_abs_deviation': mean_abs_deviation,
+        'china_intensity': china_intensity, 'us_intensity': us_intensity,
+        'intensity_difference': china_intensity - us_intensity, 'intensity_ratio': intensity_ratio,
+        'base_shear_ratio': base_shear_ratio,
+    }
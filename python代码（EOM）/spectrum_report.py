@@ -0,0 +1,198 @@
+# 批量出图：对大量场地场景生成与界面相同的中美反应谱对比图（PNG 或多页 PDF）及参数汇总表
+#
+# 全部场景的谱值先在主进程中一次批量计算（spectrum_cli.compute_spectra），再按块分给进程池绘制。
+# 每个工作进程只创建一次模板 Figure（坐标轴、曲线、图例、参数表），之后每个场景只替换曲线数据与文字，
+# 不重新创建图元；使用 Agg / PDF 后端，不需要 Qt 与显示器。
+#
+# 用法示例:
+#   python spectrum_report.py sites.csv -o report --format pdf
+#   python spectrum_report.py sites.json -o report --format png --dpi 150 --workers 8
+#
+# 输出目录中：summary.csv 为全部场景的 alpha_max、Tg、Fa、Fv、SDS、SD1 等汇总表；
+# PDF 每个进程任务写一个多页文件 report_01.pdf、report_02.pdf ...（--workers 1 时为单个 report.pdf），
+# PNG 每个场景一张 001_<name>.png。
+
+import os
+import re
+import sys
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import matplotlib
+import matplotlib.style
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.backends.backend_pdf import PdfPages
+
+from spectrum_cli import SPECTRUM_DEFAULTS, read_scenarios, compute_spectra, write_table
+
+# 与界面一致的中文字体设置
+matplotlib.rcParams['font.sans-serif'] = ['SimHei', 'Microsoft YaHei', 'Arial Unicode MS', 'DejaVu Sans']
+matplotlib.rcParams['axes.unicode_minus'] = False
+
+# 每个工作进程的模板图（首次使用时创建）
+_template = None
+
+
+class _ReportTemplate:
+    """可复用的对比图：曲线、标题、图例与参数表只创建一次"""
+
+    def __init__(self, t_max):
+        with matplotlib.style.context('bmh'):
+            self.fig = Figure(figsize=(10, 7.5), dpi=100)
+            FigureCanvasAgg(self.fig)
+            self.ax = self.fig.add_axes([0.08, 0.30, 0.88, 0.62])
+            self.china_line, = self.ax.plot([], [], label='China GB50011-2010', linewidth=2, color='#009faa')
+            self.us_line, = self.ax.plot([], [], label='US ASCE7-16', linewidth=2, color='#ff6b00')
+            self.ax.set_xlabel("Period T (s)")
+            self.ax.set_ylabel("Spectral Acceleration (g)")
+            self.ax.grid(True, linestyle='--', alpha=0.6)
+            self.ax.set_xlim(0, t_max)
+            self.legend = self.ax.legend()
+
+            table_ax = self.fig.add_axes([0.08, 0.03, 0.88, 0.16])
+            table_ax.axis('off')
+            self.table = table_ax.table(cellText=[[''] * 6] * 3, loc='center', cellLoc='center')
+            self.table.auto_set_font_size(False)
+            self.table.set_fontsize(9)
+            self.table.scale(1, 1.5)
+
+    def _set_row(self, row, texts):
+        for col, text in enumerate(texts):
+            self.table[(row, col)].get_text().set_text(text)
+
+    def update(self, name, periods, china, us, item):
+        self.china_line.set_data(periods, china)
+        self.us_line.set_data(periods, us)
+        us_label = f"US ASCE7-16 (R={item['R']})"
+        if self.us_line.get_label() != us_label:
+            self.us_line.set_label(us_label)
+            self.legend.get_texts()[1].set_text(us_label)
+        top = np.nanmax([np.nanmax(china), np.nanmax(us)])
+        self.ax.set_ylim(0, top * 1.1 if np.isfinite(top) and top > 0 else 1.0)
+        self.ax.set_title(f"Response Spectrum Comparison - {name}", fontsize=12)
+
+        self._set_row(0, ['China', str(item.get('intensity', '-')), f"Site {item.get('site_category', '-')}",
+                          str(item.get('group', '-')), f"αmax = {item['alpha_max']:.3f}", f"Tg = {item['Tg']:.2f} s"])
+        self._set_row(1, ['US', f"Ss = {item['Ss']:g} g", f"S1 = {item['S1']:g} g", f"Site {item['site_class']}",
+                          f"Fa = {item['Fa']:.3f}", f"Fv = {item['Fv']:.3f}"])
+        self._set_row(2, ['', f"ζ = {item['damping']:g}", f"R = {item['R']:g}", f"TL = {item['TL']:g} s",
+                          f"SDS = {item['SDS']:.3f} g", f"SD1 = {item['SD1']:.3f} g"])
+
+
+def _safe_filename(name):
+    return re.sub(r'[\\/:*?"<>|\s]+', '_', str(name)).strip('_') or 'site'
+
+
+def _render_chunk(args):
+    # 工作进程：用本进程的模板图依次绘制一块场景
+    global _template
+    start, names, periods, china, us, items, out_dir, fmt, dpi, t_max, pdf_name = args
+    if _template is None or _template.ax.get_xlim()[1] != t_max:
+        _template = _ReportTemplate(t_max)
+    paths = []
+    if fmt == 'pdf':
+        path = os.path.join(out_dir, pdf_name)
+        with PdfPages(path) as pdf:
+            for name, c, u, item in zip(names, china, us, items):
+                _template.update(name, periods, c, u, item)
+                pdf.savefig(_template.fig)
+        paths.append(path)
+    else:
+        for i, (name, c, u, item) in enumerate(zip(names, china, us, items), start + 1):
+            _template.update(name, periods, c, u, item)
+            path = os.path.join(out_dir, f"{i:03d}_{_safe_filename(name)}.png")
+            _template.fig.savefig(path, dpi=dpi, pil_kwargs={'compress_level': 1})
+            paths.append(path)
+    return len(names), paths
+
+
+def render_report(rows, out_dir, fmt='pdf', workers=None, chunk_size=None, dpi=100,
+                  grid='adaptive', t_min=0.01, t_max=6.0, num=600, tol=1e-4, progress=None):
+    """
+    批量生成对比图与汇总表
+
+    参数:
+        rows: 场景列表（read_scenarios 的结果，可含 'name' 字段用于标题与文件名）
+        out_dir: 输出目录
+        fmt: 'pdf'（多页）或 'png'
+        workers: 进程数，默认全部 CPU 核心；为 1 时在当前进程内绘制并输出单个 report.pdf
+        chunk_size: 每个进程任务的场景数，默认 PNG 为 25，PDF 按进程数均分
+        dpi: PNG 分辨率
+        grid, t_min, t_max, num, tol: 周期网格（同 spectrum_cli.compute_spectra）
+        progress: 可选回调 progress(已完成场景数, 场景总数)
+
+    返回:
+        dict: summary（汇总表路径）, files（图文件路径列表）
+    """
+    if not rows:
+        raise ValueError("场景列表为空")
+    os.makedirs(out_dir, exist_ok=True)
+    periods, china, us, summary = compute_spectra(rows, grid, t_min, t_max, num, tol)
+    names = [row.get('name') or f"site_{i + 1:03d}" for i, row in enumerate(rows)]
+    summary_path = os.path.join(out_dir, 'summary.csv')
+    write_table(summary_path, [dict(item, name=name) for name, item in zip(names, summary)])
+
+    n = len(rows)
+    workers = workers or os.cpu_count()
+    if chunk_size is None:
+        chunk_size = -(-n // workers) if fmt == 'pdf' else 25
+    chunks = [(s, min(s + chunk_size, n)) for s in range(0, n, chunk_size)]
+    tasks = []
+    for k, (s, e) in enumerate(chunks, 1):
+        pdf_name = 'report.pdf' if len(chunks) == 1 else f"report_{k:02d}.pdf"
+        tasks.append((s, names[s:e], periods, china[s:e], us[s:e], summary[s:e], out_dir, fmt, dpi, t_max, pdf_name))
+
+    files = []
+    done = 0
+    if workers == 1 or len(tasks) == 1:
+        for task in tasks:
+            count, paths = _render_chunk(task)
+            files.extend(paths)
+            done += count
+            if progress is not None:
+                progress(done, n)
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            futures = {pool.submit(_render_chunk, task): i for i, task in enumerate(tasks)}
+            results = [None] * len(tasks)
+            for future in as_completed(futures):
+                count, paths = future.result()
+                results[futures[future]] = paths
+                done += count
+                if progress is not None:
+                    progress(done, n)
+        files = [p for paths in results for p in paths]
+    return {'summary': summary_path, 'files': files}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="批量生成中美反应谱对比图 (PNG / PDF) 与参数汇总表")
+    parser.add_argument('input', help="场景文件 (.json / .csv)，字段同 spectrum_cli.py spectrum，可加 name 列")
+    parser.add_argument('-o', '--output', default='report', help="输出目录")
+    parser.add_argument('--format', default='pdf', choices=['pdf', 'png'], help="输出格式")
+    parser.add_argument('--workers', type=int, default=None, help="进程数，默认全部 CPU 核心")
+    parser.add_argument('--chunk-size', type=int, default=None, help="每个进程任务的场景数")
+    parser.add_argument('--dpi', type=int, default=100, help="PNG 分辨率")
+    parser.add_argument('--t-max', type=float, default=6.0, help="横轴最大周期 (s)")
+    args = parser.parse_args(argv)
+
+    rows = read_scenarios(args.input, SPECTRUM_DEFAULTS)
+    if not rows:
+        parser.error(f"场景文件中没有场景: {args.input}")
+
+    def progress(done, total):
+        sys.stderr.write(f"\r{done}/{total}")
+        sys.stderr.flush()
+
+    result = render_report(rows, args.output, args.format, args.workers, args.chunk_size, args.dpi,
+                           t_max=args.t_max, progress=progress)
+    sys.stderr.write(f"\n汇总表: {result['summary']}\n图文件: {len(result['files'])} 个\n")
+
+
+if __name__ == '__main__':
+    # 打包为 exe 时子进程不会重复执行命令行入口
+    multiprocessing.freeze_support()
+    main()
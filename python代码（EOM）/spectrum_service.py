@@ -0,0 +1,361 @@
+# 本地异步计算服务：以 HTTP/JSON 提供反应谱、底部剪力、对比指标与风速转换，供脚本与表格调用
+#
+# 只依赖标准库 asyncio 与计算模块（不导入 PyQt6 / matplotlib），启动后 NumPy 与规范表格常驻内存。
+# 短时间窗口（默认 2 ms）内到达的同类请求合并为一批，由 spectrum_cli 的批量函数一次向量化计算，
+# 计算在单独的线程中进行，事件循环继续接收请求（计算期间到达的请求自然组成下一批）。
+# 每个场景的结果按归一化输入缓存（SpectrumCache），重复查询直接返回，只有未命中的场景进入批量计算。
+#
+# 接口（POST 请求体为单个场景、场景列表或 {"scenarios": [...], 选项...}；GET 用查询字符串给出单个场景与选项）:
+#   /spectrum    反应谱，选项 t_min、t_max、num、grid ('linear' / 'log')
+#   /base-shear  基本周期 T1 处底部剪力系数之比
+#   /metrics     对比指标，选项 bands（如 "0-0.5,0.5-1,1-3,3-6"）、t_max
+#   /wind        风速转换，选项 process（是否输出转换过程文字）
+#   /health      服务状态：请求数、批次数、缓存命中率
+# GET 请求可加 field=<字段名>，此时只返回该字段的纯文本值，便于表格的 WEBSERVICE 函数直接取数。
+#
+# 用法:
+#   python spectrum_service.py --port 8765
+#   curl -d '{"Ss": 1.2, "S1": 0.5, "site_class": "C"}' http://127.0.0.1:8765/spectrum
+#   =WEBSERVICE("http://127.0.0.1:8765/wind?wind_speed=120&field=w0")
+
+import sys
+import json
+import time
+import asyncio
+import argparse
+from http import HTTPStatus
+from urllib.parse import urlsplit, parse_qsl
+from concurrent.futures import ThreadPoolExecutor
+
+from spectrum_core import SpectrumCache, make_period_grid
+from spectrum_cli import (
+    SPECTRUM_DEFAULTS, BASE_SHEAR_DEFAULTS, METRICS_DEFAULTS, WIND_DEFAULTS,
+    normalize_scenarios, compute_spectra, compute_base_shear, base_shear_results,
+    compute_metrics, metrics_results, parse_bands, convert_winds, json_safe
+)
+
+# 请求体上限
+MAX_BODY_BYTES = 16 * 2**20
+
+
+def _field_text(value):
+    # 单字段纯文本输出（供表格 WEBSERVICE 调用），列表逐行输出，null 输出为空行
+    if isinstance(value, list):
+        return '\n'.join(_field_text(v) for v in value)
+    return '' if value is None else str(value)
+
+
+def _flag(value):
+    return str(value).lower() in ('1', 'true', 'yes', 'on')
+
+
+# ==========================================
+# 各接口的批量计算：输入归一化后的场景列表与选项，按场景返回结果字典
+# ==========================================
+
+def _spectrum_periods(options):
+    return make_period_grid(float(options.get('t_min', 0.01)), float(options.get('t_max', 6.0)),
+                            int(options.get('num', 600)), options.get('grid', 'linear'))
+
+
+def _spectrum_batch(rows, options):
+    _, china, us, summary = compute_spectra(rows, periods=_spectrum_periods(options))
+    for i, item in enumerate(summary):
+        item['china'] = china[i].tolist()
+        item['us'] = us[i].tolist()
+    return summary
+
+
+def _base_shear_batch(rows, options):
+    return base_shear_results(rows, compute_base_shear(rows))
+
+
+def _metrics_bands(options):
+    bands = options.get('bands')
+    if isinstance(bands, str):
+        return parse_bands(bands)
+    return [tuple(band) for band in bands] if bands else None
+
+
+def _metrics_batch(rows, options):
+    fields = compute_metrics(rows, _metrics_bands(options), float(options.get('t_max', 6.0)))
+    return metrics_results(rows, fields)
+
+
+def _wind_batch(rows, options):
+    return convert_winds(rows, with_process=_flag(options.get('process', False)))
+
+
+# 接口: (场景缺省值, 选项名, 批量函数)
+ENDPOINTS = {
+    '/spectrum': (SPECTRUM_DEFAULTS, ('t_min', 't_max', 'num', 'grid'), _spectrum_batch),
+    '/base-shear': (BASE_SHEAR_DEFAULTS, (), _base_shear_batch),
+    '/metrics': (METRICS_DEFAULTS, ('bands', 't_max'), _metrics_batch),
+    '/wind': (WIND_DEFAULTS, ('process',), _wind_batch),
+}
+
+
+class MicroBatcher:
+    """
+    合并短时间窗口内的请求：第一个请求到达后等待 window 秒（或累计 max_batch 个场景）再一次计算
+
+    compute(rows) 在 executor 中执行，返回与 rows 等长的结果列表；
+    整批计算出错时逐个请求重新计算，只有出错的请求收到异常
+    """
+
+    def __init__(self, compute, executor, window=0.002, max_batch=4096):
+        self.compute = compute
+        self.executor = executor
+        self.window = window
+        self.max_batch = max_batch
+        self.batches = 0
+        self.rows = 0
+        self._pending = []
+        self._size = 0
+        self._timer = None
+
+    async def submit(self, rows):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((rows, future))
+        self._size += len(rows)
+        if self._size >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending, self._size = self._pending, [], 0
+        if pending:
+            asyncio.get_running_loop().create_task(self._run(pending))
+
+    async def _run(self, pending):
+        loop = asyncio.get_running_loop()
+        rows = [row for request_rows, _ in pending for row in request_rows]
+        self.batches += 1
+        self.rows += len(rows)
+        try:
+            results = await loop.run_in_executor(self.executor, self.compute, rows)
+        except Exception as exc:
+            if len(pending) == 1:
+                pending[0][1].set_exception(exc)
+                return
+            for request_rows, future in pending:
+                try:
+                    future.set_result(await loop.run_in_executor(self.executor, self.compute, request_rows))
+                except Exception as request_exc:
+                    future.set_exception(request_exc)
+            return
+        start = 0
+        for request_rows, future in pending:
+            if not future.done():
+                future.set_result(results[start:start + len(request_rows)])
+            start += len(request_rows)
+
+
+class SpectrumService:
+    """
+    与传输无关的服务核心：handle(method, path, query, body) -> (状态码, 响应对象或文本)
+
+    参数:
+        window: 合并请求的时间窗口 (s)
+        max_batch: 每批最多场景数
+        cache_size: 结果缓存的场景数
+    """
+
+    def __init__(self, window=0.002, max_batch=4096, cache_size=4096):
+        self.window = window
+        self.max_batch = max_batch
+        self.cache = SpectrumCache(maxsize=cache_size)
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='spectrum-service')
+        self.started = time.time()
+        self.requests = 0
+        self._batchers = {}
+
+    def _batcher(self, path, options_key, options):
+        key = (path, options_key)
+        if key not in self._batchers:
+            compute = ENDPOINTS[path][2]
+            self._batchers[key] = MicroBatcher(lambda rows: [json_safe(r) for r in compute(rows, options)],
+                                               self.executor, self.window, self.max_batch)
+        return self._batchers[key]
+
+    def stats(self):
+        batchers = self._batchers.values()
+        return {
+            'status': 'ok',
+            'uptime': round(time.time() - self.started, 3),
+            'requests': self.requests,
+            'batches': sum(b.batches for b in batchers),
+            'batched_scenarios': sum(b.rows for b in batchers),
+            'cache': self.cache.stats(),
+        }
+
+    @staticmethod
+    def parse_request(path, query, body):
+        """请求 -> (场景列表, 选项)；GET 查询字符串为单个场景"""
+        option_names = ENDPOINTS[path][1]
+        if body:
+            data = json.loads(body)
+        else:
+            data = dict(query)
+        if isinstance(data, list):
+            return data, {}
+        if not isinstance(data, dict):
+            raise ValueError("请求体应为场景对象、场景列表或 {\"scenarios\": [...]}")
+        options = {k: data.pop(k) for k in option_names if k in data}
+        scenarios = data.pop('scenarios', None)
+        return (scenarios if scenarios is not None else [data]), options
+
+    async def evaluate(self, path, scenarios, options):
+        """按缓存与批量计算得到每个场景的结果"""
+        defaults, option_names = ENDPOINTS[path][:2]
+        rows = normalize_scenarios(scenarios, defaults)
+        options_key = tuple((k, json.dumps(options[k], sort_keys=True)) for k in option_names if k in options)
+        keys = [self.cache.make_key(path, options_key, *(x for k in sorted(row) for x in (k, row[k])))
+                for row in rows]
+        results = [self.cache.get(key) for key in keys]
+        missing = [i for i, r in enumerate(results) if r is None]
+        if missing:
+            computed = await self._batcher(path, options_key, options).submit([rows[i] for i in missing])
+            for i, value in zip(missing, computed):
+                results[i] = value
+                self.cache.put(keys[i], value)
+        return results
+
+    async def handle(self, method, path, query=(), body=b''):
+        self.requests += 1
+        if path == '/health':
+            return HTTPStatus.OK, self.stats()
+        if path not in ENDPOINTS:
+            return HTTPStatus.NOT_FOUND, {'error': f"未知接口: {path}", 'endpoints': sorted(ENDPOINTS) + ['/health']}
+        if method not in ('GET', 'POST'):
+            return HTTPStatus.METHOD_NOT_ALLOWED, {'error': f"不支持的方法: {method}"}
+        query = dict(query)
+        field = query.pop('field', None) if method == 'GET' else None
+        try:
+            scenarios, options = self.parse_request(path, query, body)
+            results = await self.evaluate(path, scenarios, options)
+            if field is not None:
+                if field not in results[0]:
+                    raise ValueError(f"未知字段: {field}")
+                return HTTPStatus.OK, _field_text(results[0][field])
+        except (ValueError, KeyError, TypeError) as exc:
+            return HTTPStatus.BAD_REQUEST, {'error': f"{type(exc).__name__}: {exc}"}
+
+        if path == '/spectrum':
+            return HTTPStatus.OK, {'periods': _spectrum_periods(options).tolist(), 'scenarios': results}
+        return HTTPStatus.OK, results
+
+
+# ==========================================
+# HTTP/1.1（保持连接，Content-Length 定长请求体）
+# ==========================================
+
+def _response(status, payload, keep_alive):
+    if isinstance(payload, str):
+        body = payload.encode('utf-8')
+        content_type = 'text/plain; charset=utf-8'
+    else:
+        body = json.dumps(payload, ensure_ascii=False, allow_nan=False).encode('utf-8')
+        content_type = 'application/json; charset=utf-8'
+    head = (f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode('latin-1') + body
+
+
+async def _read_request(reader):
+    """读取一个请求，连接关闭时返回 None"""
+    line = await reader.readline()
+    if not line.strip():
+        return None
+    method, target, version = line.decode('latin-1').split()
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get('content-length', 0))
+    if length > MAX_BODY_BYTES:
+        raise ValueError(f"请求体超过 {MAX_BODY_BYTES} 字节")
+    body = await reader.readexactly(length) if length else b''
+    connection = headers.get('connection', '').lower()
+    keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+    return method.upper(), target, body, keep_alive
+
+
+def make_handler(service):
+    """asyncio.start_server 的连接处理函数"""
+
+    async def handle_connection(reader, writer):
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except (ValueError, UnicodeDecodeError):
+                    writer.write(_response(HTTPStatus.BAD_REQUEST, {'error': "无法解析的 HTTP 请求"}, False))
+                    break
+                if request is None:
+                    break
+                method, target, body, keep_alive = request
+                url = urlsplit(target)
+                try:
+                    status, payload = await service.handle(method, url.path.rstrip('/') or '/',
+                                                           parse_qsl(url.query), body)
+                except Exception as exc:
+                    status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {'error': f"{type(exc).__name__}: {exc}"}
+                writer.write(_response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            # 客户端断开，或服务关闭时仍有空闲的保持连接
+            pass
+        finally:
+            writer.close()
+
+    return handle_connection
+
+
+async def serve(host='127.0.0.1', port=8765, window=0.002, max_batch=4096, cache_size=4096, ready=None):
+    """启动服务并一直运行；ready 为可选回调 ready(server)（如测试中取实际端口）"""
+    service = SpectrumService(window, max_batch, cache_size)
+    # 预热：首个请求不承担各模块首次调用的开销
+    await service.evaluate('/spectrum', [{}], {})
+    await service.evaluate('/wind', [{}], {})
+    service.cache.clear()
+    server = await asyncio.start_server(make_handler(service), host, port)
+    if ready is not None:
+        ready(server)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="中美规范计算的本地 HTTP/JSON 服务（请求合并批量计算 + 结果缓存）")
+    parser.add_argument('--host', default='127.0.0.1', help="监听地址，默认只接受本机连接")
+    parser.add_argument('--port', type=int, default=8765, help="端口")
+    parser.add_argument('--window-ms', type=float, default=2.0, help="合并请求的时间窗口 (ms)")
+    parser.add_argument('--max-batch', type=int, default=4096, help="每批最多场景数")
+    parser.add_argument('--cache-size', type=int, default=4096, help="结果缓存的场景数")
+    args = parser.parse_args(argv)
+
+    def ready(server):
+        address = server.sockets[0].getsockname()
+        sys.stderr.write(f"spectrum service: http://{address[0]}:{address[1]}\n")
+    try:
+        asyncio.run(serve(args.host, args.port, args.window_ms / 1000.0, args.max_batch, args.cache_size, ready))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,199 @@
+# 参数扫描：GB50011 全部烈度/场地/分组 × ASCE 7-16 参数网格
+#
+# 结果按块写入磁盘上的 .npy（memmap），由进程池并行填充：
+#   axes.npz            各维度坐标（周期、阻尼、中国参数组合、美国参数组合及 SDS/SD1/Fa/Fv）
+#   china_spectra.npy   (阻尼, 中国组合, 周期)
+#   us_spectra.npy      (阻尼, 美国组合, 周期)
+#   ratio.npy           (阻尼, 中国组合, 美国组合, 周期)，美/中 比值曲线
+#
+# 用法示例:
+#   python spectrum_sweep.py atlas --ss 0.1:2.0:20 --s1 0.05:0.8:16 --site A,B,C,D --r 3,5,8 --tl 4,8,12 --damping 0.02,0.05,0.1
+
+import os
+import sys
+import argparse
+import multiprocessing
+import itertools
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from spectrum_core import (
+    INTENSITIES, SITE_CATEGORIES, EARTHQUAKE_GROUPS, US_SITE_CLASSES,
+    get_alpha_max, get_Tg, calculate_chinese_spectrum_batch, calculate_us_spectrum_batch,
+    make_period_grid, adaptive_period_grid, chinese_corner_periods, us_corner_periods
+)
+
+
+def china_grid():
+    """GB50011 全部 烈度 × 场地类别 × 地震分组 组合，返回 (标签列表, alpha_max, Tg)"""
+    labels = list(itertools.product(INTENSITIES, SITE_CATEGORIES, EARTHQUAKE_GROUPS))
+    alpha_max = np.array([get_alpha_max(i) for i, _, _ in labels])
+    Tg = np.array([get_Tg(s, g) for _, s, g in labels])
+    return labels, alpha_max, Tg
+
+
+def us_grid(ss_values, s1_values, site_classes, r_values, tl_values):
+    """ASCE 7-16 参数网格的笛卡尔积，展平为一维数组字典"""
+    mesh = np.meshgrid(np.asarray(ss_values, dtype=float), np.asarray(s1_values, dtype=float),
+                       np.arange(len(site_classes)), np.asarray(r_values, dtype=float),
+                       np.asarray(tl_values, dtype=float), indexing='ij')
+    Ss, S1, site_idx, R, TL = (m.ravel() for m in mesh)
+    return {'Ss': Ss, 'S1': S1, 'site_class': np.asarray(site_classes, dtype=str)[site_idx], 'R': R, 'TL': TL}
+
+
+def _sweep_chunk(out_dir, d_index, start, stop, damping):
+    # 子进程：计算一块美国反应谱及其与全部中国反应谱的比值，直接写入 memmap
+    axes = np.load(os.path.join(out_dir, 'axes.npz'))
+    periods = axes['periods']
+    sl = slice(start, stop)
+    _, Sa, _, _, _, _ = calculate_us_spectrum_batch(
+        axes['us_Ss'][sl], axes['us_S1'][sl], axes['us_site_class'][sl],
+        axes['us_TL'][sl], axes['us_R'][sl], damping, periods=periods)
+
+    us = np.load(os.path.join(out_dir, 'us_spectra.npy'), mmap_mode='r+')
+    us[d_index, sl, :] = Sa
+    us.flush()
+    del us
+
+    ratio_path = os.path.join(out_dir, 'ratio.npy')
+    if os.path.exists(ratio_path):
+        china = np.load(os.path.join(out_dir, 'china_spectra.npy'))[d_index]
+        ratio = np.load(ratio_path, mmap_mode='r+')
+        with np.errstate(divide='ignore', invalid='ignore'):
+            block = np.where(china[:, np.newaxis, :] > 0, Sa[np.newaxis, :, :] / china[:, np.newaxis, :], np.nan)
+        ratio[d_index, :, sl, :] = block
+        ratio.flush()
+        del ratio
+    return d_index, start, stop
+
+
+def run_sweep(out_dir, ss_values, s1_values, site_classes=US_SITE_CLASSES, r_values=(5.0,), tl_values=(8.0,),
+              dampings=(0.05,), periods=None, ratios=True, dtype='float32',
+              max_chunk_bytes=64 * 2**20, workers=None, progress=None):
+    """
+    运行参数扫描并将结果写入 out_dir
+
+    参数:
+        ss_values, s1_values, site_classes, r_values, tl_values: 美国规范参数网格（取笛卡尔积）
+        dampings: 阻尼比列表，中美两侧共用
+        periods: 周期数组，默认 np.linspace(0.01, 6.0, 600)
+        ratios: 是否生成 美/中 比值立方体
+        dtype: 磁盘数组的数据类型
+        max_chunk_bytes: 单个任务在内存中生成的结果块上限（字节）
+        workers: 进程数，默认使用全部 CPU 核心
+        progress: 可选回调 progress(已完成块数, 总块数)
+
+    返回:
+        dict: 各输出文件路径
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    if periods is None:
+        periods = np.linspace(0.01, 6.0, 600)
+    periods = np.asarray(periods, dtype=float)
+    dampings = np.atleast_1d(np.asarray(dampings, dtype=float))
+    n_periods = len(periods)
+
+    labels, alpha_max, Tg = china_grid()
+    grid = us_grid(ss_values, s1_values, site_classes, r_values, tl_values)
+    n_china = len(labels)
+    n_us = len(grid['Ss'])
+
+    # 中国侧组合数很少，直接在主进程计算
+    china = np.empty((len(dampings), n_china, n_periods), dtype=dtype)
+    for k, d in enumerate(dampings):
+        china[k] = calculate_chinese_spectrum_batch(alpha_max, Tg, d, periods=periods)[1]
+    paths = {'china_spectra': os.path.join(out_dir, 'china_spectra.npy')}
+    np.save(paths['china_spectra'], china)
+
+    # 美国侧的 SDS/SD1/Fa/Fv 与阻尼无关，一次算出存入坐标文件
+    _, _, SDS, SD1, Fa, Fv = calculate_us_spectrum_batch(
+        grid['Ss'], grid['S1'], grid['site_class'], grid['TL'], grid['R'], 0.05, periods=periods[:1])
+    paths['axes'] = os.path.join(out_dir, 'axes.npz')
+    np.savez(paths['axes'], periods=periods, dampings=dampings,
+             china_labels=np.array(labels, dtype=str), china_alpha_max=alpha_max, china_Tg=Tg,
+             us_Ss=grid['Ss'], us_S1=grid['S1'], us_site_class=grid['site_class'],
+             us_R=grid['R'], us_TL=grid['TL'], us_SDS=SDS, us_SD1=SD1, us_Fa=Fa, us_Fv=Fv)
+
+    paths['us_spectra'] = os.path.join(out_dir, 'us_spectra.npy')
+    np.lib.format.open_memmap(paths['us_spectra'], mode='w+', dtype=dtype,
+                              shape=(len(dampings), n_us, n_periods)).flush()
+    ratio_path = os.path.join(out_dir, 'ratio.npy')
+    if ratios:
+        paths['ratio'] = ratio_path
+        np.lib.format.open_memmap(ratio_path, mode='w+', dtype=dtype,
+                                  shape=(len(dampings), n_china, n_us, n_periods)).flush()
+    elif os.path.exists(ratio_path):
+        os.remove(ratio_path)
+
+    # 按内存上限切块：比值块 (n_china, chunk, n_periods) 为最大的中间数组（float64）
+    row_bytes = n_periods * 8 * (n_china + 1 if ratios else 1)
+    chunk = max(1, min(n_us, max_chunk_bytes // row_bytes))
+    tasks = [(k, start, min(start + chunk, n_us), float(d))
+             for k, d in enumerate(dampings) for start in range(0, n_us, chunk)]
+
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        futures = [pool.submit(_sweep_chunk, out_dir, *task) for task in tasks]
+        for done, future in enumerate(as_completed(futures), 1):
+            future.result()
+            if progress is not None:
+                progress(done, len(tasks))
+    return paths
+
+
+def _parse_values(text, cast=float):
+    # "a:b:n" 表示 np.linspace(a, b, n)，否则为逗号分隔列表
+    if ':' in text:
+        start, stop, num = text.split(':')
+        return np.linspace(float(start), float(stop), int(num))
+    return [cast(v) for v in text.split(',')]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="GB50011 × ASCE 7-16 反应谱参数扫描")
+    parser.add_argument('out_dir', help="输出目录")
+    parser.add_argument('--ss', default='0.25:1.5:6', help="Ss 取值，a:b:n 或逗号列表")
+    parser.add_argument('--s1', default='0.1:0.6:6', help="S1 取值")
+    parser.add_argument('--site', default=','.join(US_SITE_CLASSES), help="场地类别，逗号分隔")
+    parser.add_argument('--r', default='5', help="R 取值")
+    parser.add_argument('--tl', default='8', help="TL 取值")
+    parser.add_argument('--damping', default='0.05', help="阻尼比取值")
+    parser.add_argument('--grid', default='linear', choices=['linear', 'log', 'adaptive'],
+                        help="周期网格：等距 / 对数 / 按精度自适应（均包含中国规范拐点及美国规范 T0、Ts、TL）")
+    parser.add_argument('--t-min', type=float, default=0.01, help="最小周期 (s)")
+    parser.add_argument('--t-max', type=float, default=6.0, help="最大周期 (s)")
+    parser.add_argument('--num', type=int, default=600, help="linear / log 网格点数")
+    parser.add_argument('--tol', type=float, default=1e-3, help="adaptive 网格的线性插值相对误差")
+    parser.add_argument('--no-ratio', action='store_true', help="不生成比值立方体")
+    parser.add_argument('--dtype', default='float32', choices=['float32', 'float64'])
+    parser.add_argument('--chunk-mb', type=float, default=64, help="单块内存上限 (MB)")
+    parser.add_argument('--workers', type=int, default=None, help="进程数，默认全部核心")
+    args = parser.parse_args(argv)
+
+    ss_values, s1_values, site_classes = _parse_values(args.ss), _parse_values(args.s1), _parse_values(args.site, str)
+    tl_values = _parse_values(args.tl)
+    _, _, Tg = china_grid()
+    # 美国规范拐点 T0、Ts 与 R 无关，只对 Ss × S1 × 场地类别 × TL 计算一次
+    corners = us_grid(ss_values, s1_values, site_classes, [1.0], tl_values)
+    T0, Ts, TL = us_corner_periods(corners['Ss'], corners['S1'], corners['site_class'], corners['TL'])
+    breakpoints = np.concatenate([chinese_corner_periods(Tg), T0, Ts, TL])
+    if args.grid == 'adaptive':
+        periods = adaptive_period_grid(breakpoints, args.t_min, args.t_max, args.tol)
+    else:
+        periods = make_period_grid(args.t_min, args.t_max, args.num, args.grid, breakpoints)
+
+    def report(done, total):
+        print(f"\r{done}/{total} 块", end='', file=sys.stderr)
+
+    paths = run_sweep(args.out_dir, ss_values, s1_values, site_classes, _parse_values(args.r), tl_values,
+                      _parse_values(args.damping), periods=periods, ratios=not args.no_ratio, dtype=args.dtype,
+                      max_chunk_bytes=int(args.chunk_mb * 2**20), workers=args.workers, progress=report)
+    print(file=sys.stderr)
+    for name, path in paths.items():
+        print(f"{name}: {path}")
+
+
+if __name__ == '__main__':
+    # 打包为 exe 时子进程不会重复执行命令行入口
+    multiprocessing.freeze_support()
+    main()
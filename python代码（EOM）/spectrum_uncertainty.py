@@ -0,0 +1,221 @@
+# 蒙特卡洛不确定性包络：输入参数按给定分布抽样，给出两国规范谱各周期点的 16% / 50% / 84% 分位数
+#
+# 可抽样的输入：中国规范的烈度、场地类别、地震分组，美国规范的 Ss、S1、场地类别、TL、R，以及两国共用的阻尼比。
+# 每个输入的分布写法：
+#   标量或字符串                 固定值
+#   ('uniform', lo, hi)          均匀分布
+#   ('normal', mean, std[, lo, hi])  正态分布（可截断到 [lo, hi]）
+#   ('lognormal', median, beta)  对数正态分布（beta 为对数标准差，适合 Ss、S1）
+#   {值: 权重, ...} 或 [值, ...]   离散分布（列表为等权重），全部输入均可使用；
+#                                烈度、场地类别与分组只能用固定值或离散分布
+#
+# 样本分块生成，每块用 calculate_*_spectrum_batch 一次算出全部谱值，再累加到 StreamingPercentiles
+# （各周期点一个对数分箱直方图）后丢弃，内存只取决于周期点数与块大小，10^6 个样本也不会占用更多内存。
+#
+# 用法:
+#   from spectrum_uncertainty import monte_carlo_envelopes
+#   res = monte_carlo_envelopes(100000, {'Ss': ('lognormal', 0.51, 0.3), 'S1': ('lognormal', 0.18, 0.3),
+#                                        'site_class': {'C': 0.25, 'D': 0.5, 'E': 0.25}}, seed=1)
+#   res['periods'], res['us']   # res['us'][i] 为 res['percentiles'][i] 分位数谱
+
+import numpy as np
+
+from spectrum_core import (
+    get_alpha_max, get_Tg, calculate_chinese_spectrum_batch, calculate_us_spectrum_batch
+)
+
+# 未给定分布的输入取这些固定值（与 spectrum_cli.SPECTRUM_DEFAULTS 相同）
+UNCERTAINTY_DEFAULTS = {
+    'damping': 0.05,
+    'intensity': "7度(0.10g)", 'site_category': "II", 'group': "第一组",
+    'Ss': 0.51, 'S1': 0.18, 'site_class': 'D', 'TL': 24.0, 'R': 5.0,
+}
+
+DEFAULT_PERCENTILES = (16, 50, 84)
+
+
+class StreamingPercentiles:
+    """
+    逐块累加的分位数估计：每个周期点一个对数等距分箱的直方图（另加下溢、上溢箱），
+    分位数在所在箱内线性插值；箱宽相对值约为 (hi/lo)^(1/bins) - 1，默认约 0.6%。
+    nan（如美国规范要求场地反应分析的样本）不计入。
+    """
+
+    def __init__(self, n_points, lo=1e-4, hi=10.0, bins=2048):
+        self.n_points = n_points
+        self.bins = bins
+        self.edges = np.geomspace(lo, hi, bins + 1)
+        self._log_lo = np.log(lo)
+        self._log_step = np.log(hi / lo) / bins
+        # 最后一列记录 nan（不参与统计）
+        self._counts = np.zeros((n_points, bins + 3), dtype=np.int64)
+        self.total = np.zeros(n_points)
+        self.min = np.full(n_points, np.inf)
+        self.max = np.full(n_points, -np.inf)
+
+    @property
+    def counts(self):
+        return self._counts[:, :-1]
+
+    @property
+    def count(self):
+        return self.counts.sum(axis=1)
+
+    def update(self, values):
+        """values: (样本数, 周期点数)"""
+        values = np.asarray(values, dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            idx = np.log(values)
+            idx -= self._log_lo
+            idx /= self._log_step
+            idx += 1
+        np.clip(idx, 0, self.bins + 1, out=idx)
+        idx[np.isnan(idx)] = self.bins + 2
+        flat = idx.astype(np.intp)
+        flat += (self.bins + 3) * np.arange(self.n_points)
+        self._counts += np.bincount(flat.ravel(), minlength=self._counts.size).reshape(self._counts.shape)
+        self.total += np.nansum(values, axis=0)
+        self.min = np.fmin(self.min, np.fmin.reduce(values, axis=0))
+        self.max = np.fmax(self.max, np.fmax.reduce(values, axis=0))
+
+    def mean(self):
+        count = self.count
+        return np.where(count > 0, self.total / np.maximum(count, 1), np.nan)
+
+    def percentiles(self, q):
+        """各分位数（百分数）的值，形状 (len(q), 周期点数)；无有效样本的周期点为 nan"""
+        q = np.atleast_1d(np.asarray(q, dtype=float))
+        # 每行的箱边界：[下溢箱左端, edges..., 上溢箱右端]
+        edges = np.empty((self.n_points, self.bins + 3))
+        edges[:, 1:-1] = self.edges
+        edges[:, 0] = np.minimum(self.min, self.edges[0])
+        edges[:, -1] = np.maximum(self.max, self.edges[-1])
+        counts = self.counts
+        count = counts.sum(axis=1)
+        cum = np.cumsum(counts, axis=1)
+        rows = np.arange(self.n_points)
+        out = np.full((len(q), self.n_points), np.nan)
+        for i, p in enumerate(q):
+            rank = p / 100.0 * count
+            k = np.minimum((cum < rank[:, np.newaxis]).sum(axis=1), self.bins + 1)
+            before = np.where(k > 0, cum[rows, k - 1], 0)
+            in_bin = counts[rows, k]
+            frac = np.clip((rank - before) / np.maximum(in_bin, 1), 0.0, 1.0)
+            left, right = edges[rows, k], edges[rows, k + 1]
+            value = left + frac * (right - left)
+            # 结果不超出实际样本范围（所在箱为首、末有效箱时尤其重要）
+            out[i] = np.where(count > 0, np.clip(value, self.min, self.max), np.nan)
+        return out
+
+
+def _categories(spec):
+    if isinstance(spec, dict):
+        values = list(spec)
+        weights = np.array([spec[v] for v in values], dtype=float)
+    else:
+        values = list(spec)
+        weights = np.ones(len(values))
+    return values, weights / weights.sum()
+
+
+def sample(spec, n, rng):
+    """
+    按分布写法抽取 n 个样本
+
+    返回:
+        数值分布为长度 n 的浮点数组；离散分布为 (类别列表, 长度 n 的类别下标数组)
+    """
+    if isinstance(spec, (dict, list)):
+        values, p = _categories(spec)
+        return values, rng.choice(len(values), size=n, p=p)
+    if isinstance(spec, str):
+        return [spec], np.zeros(n, dtype=np.intp)
+    if isinstance(spec, tuple):
+        kind, *args = spec
+        if kind == 'uniform':
+            return rng.uniform(args[0], args[1], n)
+        if kind == 'normal':
+            lo = args[2] if len(args) > 2 else -np.inf
+            hi = args[3] if len(args) > 3 else np.inf
+            return np.clip(rng.normal(args[0], args[1], n), lo, hi)
+        if kind == 'lognormal':
+            return args[0] * np.exp(args[1] * rng.standard_normal(n))
+        raise ValueError(f"未知分布: {kind}")
+    return np.full(n, float(spec))
+
+
+def _categorical(spec, n, rng):
+    values, idx = sample(spec, n, rng)
+    return np.asarray(values)[idx]
+
+
+def _numeric(spec, n, rng):
+    # 数值输入（阻尼比、Ss、S1、TL、R）也可给离散分布，如 {'damping': [0.02, 0.05]}
+    if isinstance(spec, (dict, list, str)):
+        return _categorical(spec, n, rng).astype(float)
+    return sample(spec, n, rng)
+
+
+def monte_carlo_envelopes(n_samples, distributions=None, periods=None, percentiles=DEFAULT_PERCENTILES,
+                          chunk_size=5000, seed=None, progress=None):
+    """
+    抽样计算两国规范谱的分位数包络
+
+    参数:
+        n_samples: 样本数
+        distributions: {输入名: 分布}，未给出的输入取 UNCERTAINTY_DEFAULTS 中的固定值
+        periods: 周期数组，默认 np.linspace(0.01, 6.0, 600)
+        percentiles: 分位数（百分数）
+        chunk_size: 每块样本数（决定峰值内存：约 chunk_size × 周期点数 × 8 字节 × 数个数组）
+        seed: 随机种子
+        progress: 可选回调 progress(已完成样本数, 样本总数)（可直接用于 gui_workers.JobRunner）
+
+    返回:
+        dict: periods, percentiles, china / us（形状 (len(percentiles), 周期点数)），
+              china_mean / us_mean，n_samples，us_invalid（需场地反应分析而无谱值的样本数）
+    """
+    spec = dict(UNCERTAINTY_DEFAULTS, **(distributions or {}))
+    unknown = set(spec) - set(UNCERTAINTY_DEFAULTS)
+    if unknown:
+        raise ValueError(f"未知输入: {', '.join(sorted(unknown))}")
+    if periods is None:
+        periods = np.linspace(0.01, 6.0, 600)
+    periods = np.asarray(periods, dtype=float)
+    rng = np.random.default_rng(seed)
+
+    china = StreamingPercentiles(len(periods))
+    us = StreamingPercentiles(len(periods))
+    us_invalid = 0
+    done = 0
+    while done < n_samples:
+        m = min(chunk_size, n_samples - done)
+        damping = _numeric(spec['damping'], m, rng)
+
+        # 离散的中国规范参数：先对各类别查表，再按样本下标取值
+        intensities, i_idx = sample(spec['intensity'], m, rng)
+        sites, s_idx = sample(spec['site_category'], m, rng)
+        groups, g_idx = sample(spec['group'], m, rng)
+        alpha_max = np.array([get_alpha_max(i) for i in intensities])[i_idx]
+        Tg = np.array([[get_Tg(s, g) for g in groups] for s in sites])[s_idx, g_idx]
+        china.update(calculate_chinese_spectrum_batch(alpha_max, Tg, damping, periods=periods)[1])
+
+        _, Sa, SDS, SD1, _, _ = calculate_us_spectrum_batch(
+            _numeric(spec['Ss'], m, rng), _numeric(spec['S1'], m, rng), _categorical(spec['site_class'], m, rng),
+            _numeric(spec['TL'], m, rng), _numeric(spec['R'], m, rng), damping, periods=periods)
+        us_invalid += int(np.count_nonzero(~np.isfinite(SDS + SD1)))
+        us.update(Sa)
+
+        done += m
+        if progress is not None:
+            progress(done, n_samples)
+
+    return {
+        'periods': periods,
+        'percentiles': tuple(percentiles),
+        'china': china.percentiles(percentiles),
+        'us': us.percentiles(percentiles),
+        'china_mean': china.mean(),
+        'us_mean': us.mean(),
+        'n_samples': n_samples,
+        'us_invalid': us_invalid,
+    }
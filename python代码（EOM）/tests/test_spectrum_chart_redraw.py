@@ -0,0 +1,77 @@
+"""反应谱图表刷新路径：单个参数变化应走 blit，而不是整图重绘"""
+import os
+import sys
+
+import pytest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip('PyQt6')
+pytest.importorskip('qfluentwidgets')
+
+from PyQt6.QtWidgets import QApplication  # noqa: E402
+
+import spectrum_comparison_PyQt6 as gui  # noqa: E402
+
+
+@pytest.fixture(scope='module')
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+def count_redraws(interface, change):
+    canvas = interface.canvas
+    counts = {'draw': 0, 'blit': 0}
+    draw, blit = canvas.draw, canvas.blit
+
+    def counting_draw(*args, **kwargs):
+        counts['draw'] += 1
+        return draw(*args, **kwargs)
+
+    def counting_blit(*args, **kwargs):
+        counts['blit'] += 1
+        return blit(*args, **kwargs)
+
+    canvas.draw, canvas.blit = counting_draw, counting_blit
+    try:
+        change()
+        interface.update_chart()
+    finally:
+        canvas.draw, canvas.blit = draw, blit
+    return counts
+
+
+@pytest.mark.parametrize('family_on', [False, True])
+def test_single_ss_change_blits(app, family_on):
+    interface = gui.SpectrumInterface()
+    interface.resize(1400, 750)
+    interface.show()
+    interface.family_cb.setChecked(family_on)
+    interface.update_chart()
+    app.processEvents()
+    interface.canvas.draw()
+
+    counts = count_redraws(interface, lambda: interface.us_ss_spin.setValue(0.52))
+    assert counts == {'draw': 0, 'blit': 1}
+    interface.close()
+
+
+def test_released_interface_stops_listening(app):
+    import gc
+    import weakref
+    import perf_trace
+
+    interface = gui.SpectrumInterface()
+    alive = weakref.ref(interface)
+    assert any(ref() == interface.show_latency for ref in perf_trace._listeners)
+    del interface
+    gc.collect()
+    assert alive() is None
+    enabled = perf_trace.is_enabled()
+    perf_trace.enable(True)
+    try:
+        perf_trace.start('check').finish()
+    finally:
+        perf_trace.enable(enabled)
+    assert all(ref() is not None for ref in perf_trace._listeners)
@@ -0,0 +1,21 @@
+"""反向匹配：目标谱无定义时应报错而不是返回第一个候选"""
+import math
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from spectrum_match import match_us_spectrum  # noqa: E402
+
+
+def test_default_site_matches():
+    best = match_us_spectrum(0.51, 0.18, 'D', 24.0, 5.0)
+    assert math.isfinite(best['error'])
+    assert best['candidates'][0][:3] == (best['intensity'], best['site_category'], best['group'])
+
+
+def test_site_e_without_coefficients_raises():
+    with pytest.raises(ValueError):
+        match_us_spectrum(3.0, 1.5, 'E', 8, 1.0)
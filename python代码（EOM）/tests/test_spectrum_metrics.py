@@ -0,0 +1,43 @@
+"""分段解析对比指标与密网格数值结果一致（含 TL < Ts 的短 TL 场景）"""
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from spectrum_core import (  # noqa: E402
+    calculate_chinese_spectrum_batch, calculate_us_spectrum_batch, us_seismic_response_coefficient
+)
+from spectrum_metrics import comparison_metrics  # noqa: E402
+
+
+@pytest.mark.parametrize('tl_range', [(4.0, 12.0), (0.5, 3.0)])
+def test_piecewise_metrics_match_brute_force(tl_range):
+    rng = np.random.default_rng(1)
+    n = 60
+    args = dict(alpha_max=rng.choice([0.04, 0.08, 0.16, 0.24, 0.32], n),
+                Tg=rng.choice([0.25, 0.35, 0.45, 0.65, 0.9], n),
+                Ss=rng.uniform(0.1, 2.0, n), S1=rng.uniform(0.1, 1.2, n),
+                site_class=rng.choice(list('ABCD'), n), TL=rng.uniform(*tl_range, n),
+                R=rng.choice([3.0, 5.0, 8.0], n))
+    m = comparison_metrics(**args)
+    ok = np.isfinite(m['SDS'])
+
+    T = np.linspace(0.0, 6.0, 120001)[1:]
+    china = calculate_chinese_spectrum_batch(args['alpha_max'], args['Tg'], 0.05, periods=T)[1]
+    us = calculate_us_spectrum_batch(args['Ss'], args['S1'], args['site_class'], args['TL'], args['R'], 0.05,
+                                     periods=T)[1]
+    for j, (a, b) in enumerate(m['bands']):
+        sel = (T >= a) & (T <= b)
+        diff = (china - us)[:, sel]
+        max_deviation = diff[np.arange(n), np.abs(diff).argmax(axis=1)]
+        cs = us_seismic_response_coefficient(T[sel], m['SDS'][:, None], m['SD1'][:, None], args['S1'][:, None],
+                                             args['TL'][:, None], args['R'][:, None])
+        base_shear_ratio = 0.85 * np.trapezoid(china[:, sel], T[sel]) / np.trapezoid(cs, T[sel])
+        us_intensity = np.trapezoid(us[:, sel], T[sel])
+
+        np.testing.assert_allclose(m['max_deviation'][ok, j], max_deviation[ok], rtol=2e-3, atol=1e-5)
+        np.testing.assert_allclose(m['base_shear_ratio'][ok, j], base_shear_ratio[ok], rtol=2e-3)
+        np.testing.assert_allclose(m['us_intensity'][ok, j], us_intensity[ok], rtol=2e-3)
@@ -0,0 +1,218 @@
+# 多点空间相关脉动风速时程模拟（谱表示法 + FFT）
+#
+# 与 C# WindSimulationCalculations.GenerateWind（单点、ASCE 7-16 参数）不同，这里按 GB50009 取参数，
+# 从 convert_wind_speed_to_chinese 得到的 10 m 高度 10 分钟平均风速 U10 出发：
+#   平均风剖面 U(z) = U10 (z/10)^α，湍流强度 I(z) = I10 (z/10)^(-α)，σu = I(z) U(z)
+#   Davenport 脉动风速谱 S(f) = σu² · (2/3) x² / (f (1+x²)^(4/3))，x = 1200 f / U10
+#   Davenport 相干函数 Coh_ij(f) = exp(-f √(cy²Δy² + cz²Δz²) / ((U_i + U_j)/2))
+# 互谱矩阵 S(f) = D C(f) D（D 为各点 √S_j），其 Cholesky 分解 H = D L(f)，L 只取决于测点几何与平均风速。
+# L 在一组对数分布的频率节点上分解并缓存，节点之间线性插值（逐行归一化，保证各点方差不变）；
+# 各频率分量 X_j(f) = √(2 S_j Δf) Σ_m L_jm(f) e^{iφ_m(f)} 由批量矩阵乘法得到，再对全部测点一次 irfft 合成时程。
+#
+# 用法:
+#   from wind_simulation import simulate_wind
+#   res = simulate_wind(25.0, heights=[10, 20, 40, 80], terrain='B', duration=600, fs=10, seed=1)
+#   res['time'], res['total']  # (测点数, 步数)
+
+import os
+
+import numpy as np
+
+from spectrum_core import convert_wind_speed_to_chinese, SpectrumCache
+
+# GB50009-2012 地面粗糙度类别：(风剖面指数 α, 10 m 高度名义湍流强度 I10)
+TERRAIN_PARAMETERS = {
+    'A': (0.12, 0.12),
+    'B': (0.15, 0.14),
+    'C': (0.22, 0.23),
+    'D': (0.30, 0.39),
+}
+
+# Cholesky 因子缓存，键为 (测点, 平均风速, 衰减系数, 频率节点) 的字节串
+_factor_cache = SpectrumCache(maxsize=8)
+
+
+def mean_wind_profile(U10, z, terrain='B'):
+    """平均风速剖面 U(z) = U10 (z/10)^α"""
+    alpha = TERRAIN_PARAMETERS[terrain][0]
+    return U10 * (np.asarray(z, dtype=float) / 10.0) ** alpha
+
+
+def turbulence_intensity(z, terrain='B'):
+    """顺风向湍流强度 I(z) = I10 (z/10)^(-α)"""
+    alpha, I10 = TERRAIN_PARAMETERS[terrain]
+    return I10 * (np.asarray(z, dtype=float) / 10.0) ** (-alpha)
+
+
+def davenport_spectrum(f, sigma, U10):
+    """Davenport 单边功率谱 ((m/s)²/Hz)，f 与 sigma 可广播"""
+    f = np.asarray(f, dtype=float)
+    x = 1200.0 * f / U10
+    return np.asarray(sigma, dtype=float) ** 2 * (2.0 / 3.0) * x ** 2 / (f * (1 + x ** 2) ** (4.0 / 3.0))
+
+
+def davenport_coherence(f, points, mean_speeds, cy=16.0, cz=10.0):
+    """Davenport 相干函数矩阵，形状 (len(f), 测点数, 测点数)；points 为 (测点数, 2) 的 (y, z) 坐标 (m)"""
+    points = np.asarray(points, dtype=float)
+    U = np.asarray(mean_speeds, dtype=float)
+    dy = points[:, 0, np.newaxis] - points[np.newaxis, :, 0]
+    dz = points[:, 1, np.newaxis] - points[np.newaxis, :, 1]
+    decay = np.sqrt((cy * dy) ** 2 + (cz * dz) ** 2) / (0.5 * (U[:, np.newaxis] + U[np.newaxis, :]))
+    return np.exp(-np.asarray(f, dtype=float)[:, np.newaxis, np.newaxis] * decay)
+
+
+def coherence_factors(nodes, points, mean_speeds, cy=16.0, cz=10.0):
+    """
+    各频率节点上相干矩阵的 Cholesky 下三角因子，形状 (节点数, 测点数, 测点数)，结果缓存
+
+    低频时相干矩阵接近全 1 的奇异矩阵，对角线加 1e-10 保证可分解
+    """
+    nodes = np.ascontiguousarray(nodes, dtype=float)
+    points = np.ascontiguousarray(points, dtype=float)
+    U = np.ascontiguousarray(mean_speeds, dtype=float)
+    key = (nodes.tobytes(), points.tobytes(), U.tobytes(), float(cy), float(cz))
+
+    def compute():
+        C = davenport_coherence(nodes, points, U, cy, cz)
+        C += 1e-10 * np.eye(len(points))
+        return np.linalg.cholesky(C)
+    return _factor_cache.get_or_compute(key, compute)
+
+
+def _as_points(heights, points):
+    if points is None:
+        heights = np.atleast_1d(np.asarray(heights, dtype=float))
+        return np.column_stack([np.zeros_like(heights), heights])
+    points = np.asarray(points, dtype=float)
+    if points.ndim != 2 or points.shape[1] != 2:
+        raise ValueError("points 应为 (测点数, 2) 的 (y, z) 坐标数组")
+    return points
+
+
+def simulate_wind(U10, heights=None, points=None, terrain='B', duration=600.0, fs=10.0,
+                  n_nodes=64, cy=16.0, cz=10.0, seed=None):
+    """
+    模拟多点空间相关的顺风向脉动风速时程
+
+    参数:
+        U10: 10 m 高度 10 分钟平均风速 (m/s)，可取 convert_wind_speed_to_chinese 的 'wind_speed_50y_10m_10min'
+        heights: 测点高度 (m)，测点沿竖向排列时使用；或给定 points
+        points: (测点数, 2) 的 (y, z) 坐标 (m)
+        terrain: 地面粗糙度类别 'A' / 'B' / 'C' / 'D'
+        duration, fs: 模拟时长 (s) 与采样频率 (Hz)
+        n_nodes: Cholesky 分解的频率节点数（对数分布，节点间线性插值）
+        cy, cz: Davenport 相干函数的水平、竖向衰减系数
+        seed: 随机种子
+
+    返回:
+        dict: time, points, mean (各点平均风速), sigma, fluctuating / total (测点数, 步数),
+              freqs, target_psd (测点数, 频率数), process
+    """
+    points = _as_points(heights, points)
+    z = points[:, 1]
+    if np.any(z <= 0):
+        raise ValueError("测点高度必须大于 0")
+    n_points = len(points)
+    N = int(round(duration * fs))
+    N -= N % 2
+    df = fs / N
+
+    U = mean_wind_profile(U10, z, terrain)
+    sigma = turbulence_intensity(z, terrain) * U
+
+    # 频率 l·Δf，l = 1 .. N/2-1（不含直流与 Nyquist 分量）
+    freqs = df * np.arange(1, N // 2)
+    psd = davenport_spectrum(freqs[np.newaxis, :], sigma[:, np.newaxis], U10)
+    amplitude = np.sqrt(2.0 * psd * df)
+
+    nodes = np.geomspace(freqs[0], freqs[-1], max(2, min(n_nodes, len(freqs))))
+    L = coherence_factors(nodes, points, U, cy, cz)
+    # 相邻节点因子逐行点积，用于插值后逐行归一化：|(1-t)a + tb|² = (1-t)² + t² + 2t(1-t)a·b
+    row_dot = np.einsum('kij,kij->ki', L[:-1], L[1:])
+
+    rng = np.random.default_rng(seed)
+    phases = np.exp(1j * rng.uniform(0, 2 * np.pi, size=(n_points, len(freqs))))
+
+    spectrum = np.zeros((n_points, N // 2 + 1), dtype=complex)
+    X = spectrum[:, 1:N // 2]
+    bins = np.clip(np.searchsorted(nodes, freqs, side='right') - 1, 0, len(nodes) - 2)
+    t = (freqs - nodes[bins]) / (nodes[bins + 1] - nodes[bins])
+    edges = np.searchsorted(bins, np.arange(len(nodes)))
+    for k in range(len(nodes) - 1):
+        sel = slice(edges[k], edges[k + 1])
+        if sel.start == sel.stop:
+            continue
+        tk = t[sel]
+        E = phases[:, sel]
+        norm = np.sqrt((1 - tk) ** 2 + tk ** 2 + 2 * tk * (1 - tk) * row_dot[k][:, np.newaxis])
+        X[:, sel] = ((L[k] @ E) * (1 - tk) + (L[k + 1] @ E) * tk) / norm
+    X *= amplitude * (N / 2)
+    fluctuating = np.fft.irfft(spectrum, n=N, axis=-1)
+
+    process = ["=== 脉动风速模拟 (GB50009, 谱表示法) ===",
+               f"10m 高度 10 分钟平均风速 U10: {U10:.2f} m/s",
+               f"地面粗糙度类别: {terrain} (α = {TERRAIN_PARAMETERS[terrain][0]}, I10 = {TERRAIN_PARAMETERS[terrain][1]})",
+               f"测点数: {n_points}，高度 {z.min():.1f} ~ {z.max():.1f} m",
+               f"模拟时长: {N / fs:.1f} s，采样频率: {fs} Hz，频率分量: {len(freqs)}",
+               f"Cholesky 频率节点: {len(nodes)}，相干衰减系数 cy = {cy}, cz = {cz}"]
+    for i in (0, n_points - 1) if n_points > 1 else (0,):
+        process.append(f"z = {z[i]:.1f} m: 平均风速 {U[i]:.2f} m/s，σu = {sigma[i]:.3f} m/s，"
+                       f"模拟标准差 {fluctuating[i].std():.3f} m/s")
+
+    return {
+        'time': np.arange(N) / fs,
+        'points': points,
+        'mean': U,
+        'sigma': sigma,
+        'fluctuating': fluctuating,
+        'total': fluctuating + U[:, np.newaxis],
+        'freqs': freqs,
+        'target_psd': psd,
+        'process': process,
+    }
+
+
+def simulate_from_asce(wind_speed, input_unit='mph', input_height=10, input_time='3s', return_period='700y',
+                       **kwargs):
+    """先按 convert_wind_speed_to_chinese 换算 U10，再调用 simulate_wind（其余参数同 simulate_wind）"""
+    conversion = convert_wind_speed_to_chinese(wind_speed, input_unit, input_height, input_time, return_period)
+    result = simulate_wind(conversion['wind_speed_50y_10m_10min'], **kwargs)
+    result['process'] = conversion['process'] + result['process']
+    return result
+
+
+def welch_psd(signal, fs, nperseg=2048):
+    """
+    Welch 法单边功率谱（Hann 窗，50% 重叠，与 C# CalculateWelchPSD 相同的归一化），signal 可为 (测点数, 步数)
+
+    返回:
+        (freqs, psd)
+    """
+    signal = np.asarray(signal, dtype=float)
+    nperseg = min(nperseg, signal.shape[-1])
+    step = nperseg // 2
+    window = 0.5 * (1 - np.cos(2 * np.pi * np.arange(nperseg) / (nperseg - 1)))
+    starts = np.arange(0, signal.shape[-1] - nperseg + 1, step)
+    segments = np.stack([signal[..., s:s + nperseg] for s in starts], axis=-2) * window
+    power = (np.abs(np.fft.rfft(segments, axis=-1)) ** 2).mean(axis=-2)
+    psd = power * 2.0 / (fs * (window ** 2).sum())
+    psd[..., 0] /= 2
+    psd[..., -1] /= 2
+    return np.fft.rfftfreq(nperseg, 1.0 / fs), psd
+
+
+def save_wind_csv(time, total, fluctuating, directory, points=None):
+    """按 C# SaveWindToCsv 的列格式（单位 m/s）每个测点保存一个 Wind_Simulation_001.csv ...，返回文件路径列表"""
+    os.makedirs(directory, exist_ok=True)
+    total = np.atleast_2d(total)
+    fluctuating = np.atleast_2d(fluctuating)
+    paths = []
+    for i in range(len(total)):
+        path = os.path.join(directory, f"Wind_Simulation_{i + 1:03d}.csv")
+        header = "Time(s),Total_Wind(m/s),Fluctuating_Wind(m/s)"
+        if points is not None:
+            header = f"# y={points[i][0]:g} m, z={points[i][1]:g} m\n" + header
+        np.savetxt(path, np.column_stack([time, total[i], fluctuating[i]]), fmt='%.6f', delimiter=',',
+                   header=header, comments='')
+        paths.append(path)
+    return paths